@@ -1,74 +1,95 @@
 import os
+from merge_engine import merge_into
+from run_files import (BINARY, RECORD_SIZE, TEXT, NumberWriter, RunReader, iter_chunks,
+                       iter_number_blocks, move_run)
 
-def split_file(input_file, temp1, temp2, run_size):
-    with open(input_file, 'r') as infile, \
-         open(temp1, 'w') as out1, \
-         open(temp2, 'w') as out2:
-        toggle = True
-        while True:
-            lines = []
-            for _ in range(run_size):
-                line = infile.readline()
-                if not line:
-                    break
-                lines.append(line)
-            if not lines:
-                break
-            if toggle:
-                out1.writelines(lines)
-            else:
-                out2.writelines(lines)
-            toggle = not toggle
+def create_runs(input_file, output_file, block_size, input_format=TEXT):
+    # Fase inicial: se leen bloques de block_size números, se ordenan en
+    # memoria y se escriben uno tras otro en output_file, que queda formado
+    # por corridas de block_size registros (la última puede ser menor).
+    # Devuelve el número de registros escritos.
+    with NumberWriter(output_file, BINARY) as writer:
+        for chunk in iter_chunks(iter_number_blocks(input_file, input_format), block_size):
+            chunk.sort()
+            writer.write_many(chunk)
+    return writer.count
 
-def merge_files(temp1, temp2, output_file, run_size):
-    with open(temp1, 'r') as in1, \
-         open(temp2, 'r') as in2, \
-         open(output_file, 'w') as out:
-        while True:
-            run1 = []
-            run2 = []
-            for _ in range(run_size):
-                line = in1.readline()
-                if not line:
+def split_file(input_file, temp_files, run_size):
+    # Reparte las corridas de run_size registros entre los archivos temporales
+    # por turnos. Los archivos de trabajo son corridas binarias (ver run_files.py)
+    outs = [open(path, 'wb') for path in temp_files]
+    try:
+        with RunReader(input_file) as reader:
+            turn = 0
+            while True:
+                written = 0
+                for block in reader.next_run(run_size):
+                    block.tofile(outs[turn])
+                    written += len(block)
+                if not written:
                     break
-                run1.append(int(line.strip()))
-            for _ in range(run_size):
-                line = in2.readline()
-                if not line:
+                turn = (turn + 1) % len(outs)
+    finally:
+        for out in outs:
+            out.close()
+
+def merge_files(temp_files, output_file, run_size):
+    # En cada ronda se fusiona la siguiente corrida de cada archivo temporal,
+    # hasta agotarlos. Devuelve el número de registros escritos.
+    readers = [RunReader(path) for path in temp_files]
+    total = 0
+    try:
+        with NumberWriter(output_file, BINARY) as out:
+            while True:
+                written = merge_into([reader.next_run(run_size) for reader in readers], out)
+                if not written:
                     break
-                run2.append(int(line.strip()))
-            if not run1 and not run2:
-                break
-            i = j = 0
-            while i < len(run1) and j < len(run2):
-                if run1[i] <= run2[j]:
-                    out.write(f"{run1[i]}\n")
-                    i += 1
-                else:
-                    out.write(f"{run2[j]}\n")
-                    j += 1
-            while i < len(run1):
-                out.write(f"{run1[i]}\n")
-                i += 1
-            while j < len(run2):
-                out.write(f"{run2[j]}\n")
-                j += 1
+                total += written
+    finally:
+        for reader in readers:
+            reader.close()
+    return total
 
-def straight_merge_sort(input_file, output_file):
-    n = sum(1 for _ in open(input_file))
-    run_size = 1
-    temp1 = 'temp1.txt'
-    temp2 = 'temp2.txt'
+def straight_merge_sort(input_file, output_file, input_format=TEXT, output_format=TEXT,
+                        block_size=100000, num_ways=2, temp_dir='.'):
+    # El texto sólo se interpreta una vez: la fase inicial ordena en memoria
+    # bloques de block_size números y los escribe en binario, y la mezcla
+    # directa empieza con corridas de ese tamaño. Cada pasada reparte las
+    # corridas entre num_ways archivos temporales y las fusiona de num_ways
+    # en num_ways, sin tocar input_file. Los temporales se crean en temp_dir.
+    # Devuelve una lista con las estadísticas (bytes leídos y escritos) de cada pasada.
+    if num_ways < 2:
+        raise ValueError("num_ways debe ser al menos 2")
+    work_a = os.path.join(temp_dir, 'temp_work_a.bin')
+    work_b = os.path.join(temp_dir, 'temp_work_b.bin')
+    temp_files = [os.path.join(temp_dir, f'temp{i + 1}.bin') for i in range(num_ways)]
+    n = create_runs(input_file, work_a, block_size, input_format)
+    pass_stats = [{'pass': 0, 'run_size': min(block_size, n),
+                   'bytes_read': os.path.getsize(input_file), 'bytes_written': n * RECORD_SIZE}]
+    run_size = block_size
+    src, dst = work_a, work_b
     while run_size < n:
-        split_file(input_file, temp1, temp2, run_size)
-        merge_files(temp1, temp2, output_file, run_size)
-        input_file, output_file = output_file, input_file
-        run_size *= 2
-    if input_file != output_file:
-        os.replace(input_file, output_file)
-    os.remove(temp1)
-    os.remove(temp2)
+        split_file(src, temp_files, run_size)
+        merge_files(temp_files, dst, run_size)
+        src, dst = dst, src
+        run_size *= num_ways
+        # Cada pasada lee y escribe todos los registros dos veces (reparto y fusión)
+        pass_stats.append({'pass': len(pass_stats), 'run_size': min(run_size, n),
+                           'bytes_read': 2 * n * RECORD_SIZE, 'bytes_written': 2 * n * RECORD_SIZE})
+    move_run(src, output_file, output_format)
+    for f in [dst] + temp_files:
+        if os.path.exists(f):
+            os.remove(f)
+    for stats in pass_stats:
+        print(f"Pasada {stats['pass']}: corridas de {stats['run_size']} registros, "
+              f"{stats['bytes_read']} bytes leídos, {stats['bytes_written']} bytes escritos")
+    print(f"Pasadas de mezcla: {len(pass_stats) - 1}")
+    return pass_stats
 
 # Ejemplo de uso:
 # Supón que tienes un archivo 'datos.txt' con un número por línea.
-# straight_merge_sort('datos.txt', 'ordenado.txt')
\ No newline at end of file
+# straight_merge_sort('datos.txt', 'ordenado.txt')
+# Con bloques iniciales de 1 000 000 de números y fusión de 8 vías:
+# straight_merge_sort('datos.txt', 'ordenado.txt', block_size=1000000, num_ways=8)
+# Con entrada/salida binaria (enteros de 64 bits empaquetados):
+# straight_merge_sort('datos.bin', 'ordenado.bin', input_format='binary', output_format='binary')
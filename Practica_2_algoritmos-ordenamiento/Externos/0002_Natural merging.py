@@ -1,75 +1,94 @@
 import os
+from itertools import compress, islice
+from operator import gt
+from merge_engine import merge_into
+from run_files import (BINARY, TEXT, NumberWriter, RunReader, convert, find_unsorted,
+                       iter_run_blocks, move_run)
 
-def split_runs(input_file, temp1, temp2):
-    with open(input_file, 'r') as infile, \
-         open(temp1, 'w') as out1, \
-         open(temp2, 'w') as out2:
-        last = None
-        toggle = True
-        for line in infile:
-            num = int(line.strip())
-            if last is not None and num < last:
-                toggle = not toggle
-            if toggle:
-                out1.write(f"{num}\n")
-            else:
-                out2.write(f"{num}\n")
-            last = num
+def split_runs(input_file, temp_files):
+    # Reparte las corridas naturales de input_file entre los archivos
+    # temporales por turnos y devuelve, por archivo, la longitud de cada
+    # corrida escrita en él. Los archivos de trabajo son corridas binarias
+    # (ver run_files.py).
+    writers = [NumberWriter(path, BINARY) for path in temp_files]
+    run_lengths = [[] for _ in temp_files]
+    current = 0
+    length = 0
+    last = None
+    try:
+        for block in iter_run_blocks(input_file):
+            # Posiciones del bloque donde empieza una nueva corrida (un descenso)
+            starts = list(compress(range(1, len(block)), map(gt, block, islice(block, 1, None))))
+            if last is not None and block[0] < last:
+                starts.insert(0, 0)
+            prev = 0
+            for start in starts:
+                writers[current].write_many(block[prev:start])
+                length += start - prev
+                run_lengths[current].append(length)
+                current = (current + 1) % len(writers)
+                length = 0
+                prev = start
+            writers[current].write_many(block[prev:])
+            length += len(block) - prev
+            last = block[-1]
+        if length:
+            run_lengths[current].append(length)
+    finally:
+        for writer in writers:
+            writer.close()
+    return run_lengths
 
-def merge_runs(temp1, temp2, output_file):
-    with open(temp1, 'r') as in1, \
-         open(temp2, 'r') as in2, \
-         open(output_file, 'w') as out:
-        def next_num(f):
-            line = f.readline()
-            return int(line.strip()) if line else None
+def merge_runs(temp_files, run_lengths, output_file):
+    # En cada ronda se fusiona la siguiente corrida de cada archivo temporal.
+    # Devuelve el número de corridas escritas en output_file.
+    rounds = max(map(len, run_lengths), default=0)
+    readers = [RunReader(path) for path in temp_files]
+    try:
+        with NumberWriter(output_file, BINARY) as out:
+            for r in range(rounds):
+                merge_into([reader.next_run(lengths[r])
+                            for reader, lengths in zip(readers, run_lengths) if r < len(lengths)], out)
+    finally:
+        for reader in readers:
+            reader.close()
+    return rounds
 
-        n1, n2 = next_num(in1), next_num(in2)
-        last1, last2 = None, None
-        while n1 is not None or n2 is not None:
-            run1, run2 = True, True
-            while run1 or run2:
-                if (n1 is not None and (n2 is None or n1 <= n2)) and run1:
-                    out.write(f"{n1}\n")
-                    last1 = n1
-                    n1 = next_num(in1)
-                    if n1 is not None and last1 > n1:
-                        run1 = False
-                elif n2 is not None and run2:
-                    out.write(f"{n2}\n")
-                    last2 = n2
-                    n2 = next_num(in2)
-                    if n2 is not None and last2 > n2:
-                        run2 = False
-                else:
-                    break
+def is_sorted(input_file, fmt=TEXT):
+    # Recorre el archivo con mmap por bloques grandes (ver mmap_scan.py)
+    return find_unsorted(input_file, fmt) is None
 
-def is_sorted(input_file):
-    with open(input_file, 'r') as f:
-        last = None
-        for line in f:
-            num = int(line.strip())
-            if last is not None and num < last:
-                return False
-            last = num
-    return True
-
-def natural_merge_sort(input_file, output_file):
-    temp1 = 'temp1.txt'
-    temp2 = 'temp2.txt'
-    src = input_file
-    dst = output_file
+def natural_merge_sort(input_file, output_file, input_format=TEXT, output_format=TEXT,
+                       num_ways=2, temp_dir='.'):
+    # La entrada se convierte una sola vez a binario; las pasadas alternan
+    # entre dos archivos de trabajo sin sobrescribir input_file. Con num_ways
+    # archivos temporales cada pasada fusiona num_ways corridas a la vez, y el
+    # número de corridas contado en split/merge decide cuándo terminar.
+    # Los temporales se crean en temp_dir.
+    # Devuelve el número de pasadas de fusión realizadas.
+    if num_ways < 2:
+        raise ValueError("num_ways debe ser al menos 2")
+    temp_files = [os.path.join(temp_dir, f'temp{i + 1}.bin') for i in range(num_ways)]
+    src = os.path.join(temp_dir, 'temp_work_a.bin')
+    dst = os.path.join(temp_dir, 'temp_work_b.bin')
+    convert(input_file, src, input_format, BINARY)
+    passes = 0
     while True:
-        split_runs(src, temp1, temp2)
-        merge_runs(temp1, temp2, dst)
-        if is_sorted(dst):
-            break
+        run_lengths = split_runs(src, temp_files)
+        if sum(map(len, run_lengths)) <= 1:
+            break  # src ya es una sola corrida
+        passes += 1
+        runs = merge_runs(temp_files, run_lengths, dst)
         src, dst = dst, src
-    os.remove(temp1)
-    os.remove(temp2)
-    if dst != output_file:
-        os.replace(dst, output_file)
+        if runs == 1:
+            break
+    for path in temp_files + [dst]:
+        if os.path.exists(path):
+            os.remove(path)
+    move_run(src, output_file, output_format)
+    return passes
 
 # Ejemplo de uso:
 # Crear un archivo de entrada con números desordenados, uno por línea.
-# natural_merge_sort('entrada.txt', 'salida.txt')
\ No newline at end of file
+# natural_merge_sort('entrada.txt', 'salida.txt')
+# natural_merge_sort('entrada.txt', 'salida.txt', num_ways=8)  # Fusión natural de 8 vías
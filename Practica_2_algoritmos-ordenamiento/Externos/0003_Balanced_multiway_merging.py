@@ -1,48 +1,133 @@
 import os
-import heapq
+from itertools import chain, islice
+from aggregation import check_mode, combine_runs, merge_combined, write_combined_output
+from checkpoint import Checkpoint, input_identity
+from merge_engine import merge_into
+from merge_plan import estimate_records, plan_merge
+from parallel_merge import merge_groups, partitioned_merge, whole_run
+from parallel_runs import generate_runs_parallel
+from run_codecs import get_codec
+from run_generation import CHUNK, get_strategy
+from run_files import (BINARY, TEXT, RUN_SUFFIX, NumberWriter, check_format, count_records,
+                       find_unsorted, iter_chunks, iter_number_blocks, iter_run, iter_run_blocks, move_run,
+                       write_numbers, write_run)
+from test_data import write_numbers_file
 
-def balanced_multiway_merge_sort(input_file_path, output_file_path, num_ways=4, chunk_size=10000):
+def balanced_multiway_merge_sort(input_file_path, output_file_path, num_ways=4, chunk_size=10000,
+                                 input_format=TEXT, output_format=TEXT,
+                                 memory_budget=None, max_open_files=None, workers=None,
+                                 merge_workers=None, run_strategy=CHUNK, temp_dir='.',
+                                 resume=False, codec=None, aggregate=None, limit=None):
     
     print(f"Iniciando Balanced Multiway Merging para '{input_file_path}'...")
+    check_format(input_format)
+    check_format(output_format)
+    get_strategy(run_strategy)
+    # Compresión opcional de los runs temporales (ver run_codecs.py). Los
+    # procesos paralelos leen los runs por desplazamientos de registro, que
+    # sólo existen en los runs sin comprimir.
+    run_codec = get_codec(codec)
+    if run_codec is not None and ((workers or 1) > 1 or (merge_workers or 1) > 1):
+        raise ValueError("Los runs comprimidos no admiten workers ni merge_workers")
+    # aggregate='unique' o 'count' combina los valores repetidos al crear los
+    # runs y en cada fusión (ver aggregation.py)
+    check_mode(aggregate)
+    if aggregate is not None and (run_strategy != CHUNK or (workers or 1) > 1 or (merge_workers or 1) > 1):
+        raise ValueError("aggregate sólo admite runs 'chunk' sin workers ni merge_workers")
+    # Con limit sólo se escriben los primeros limit registros de la salida: los
+    # primeros limit de la fusión están entre los primeros limit de cada run,
+    # así que cada run y cada fusión se cortan ahí y la fusión final se
+    # detiene en cuanto los emite
+    if limit is not None and (limit < 0 or aggregate is not None or (merge_workers or 1) > 1):
+        raise ValueError("limit debe ser >= 0 y no admite aggregate ni merge_workers")
+    read_block = write_block = None  # Tamaño de bloque configurado en buffered_io
+    if memory_budget is not None:
+        # Con un presupuesto de memoria (bytes), num_ways y chunk_size los elige
+        # el planificador para hacer el menor número de pasadas (ver merge_plan.py)
+        try:
+            records = estimate_records(input_file_path, input_format)
+        except FileNotFoundError:
+            print(f"Error: El archivo de entrada '{input_file_path}' no fue encontrado.")
+            return
+        plan = plan_merge(memory_budget, records, max_open_files,
+                          workers=workers or 1, merge_workers=merge_workers or 1)
+        print(plan)
+        num_ways = plan.fan_in
+        chunk_size = plan.chunk_size
+        read_block = plan.read_block_records
+        write_block = plan.write_block_records
     print(f"Número de caminos (num_ways): {num_ways}")
     print(f"Tamaño del chunk (chunk_size): {chunk_size}")
 
+    # Manifiesto de avance en temp_dir: con resume=True se continúa desde la
+    # última pasada terminada de una ejecución interrumpida (ver checkpoint.py)
+    try:
+        job = {'input': input_identity(input_file_path), 'input_format': input_format,
+               'num_ways': num_ways, 'chunk_size': chunk_size, 'run_strategy': run_strategy,
+               'workers': workers, 'codec': codec, 'aggregate': aggregate,
+               'limit': limit}
+    except FileNotFoundError:
+        print(f"Error: El archivo de entrada '{input_file_path}' no fue encontrado.")
+        return
+    checkpoint = Checkpoint(temp_dir, job)
+    state = checkpoint.load() if resume else None
+    if state is not None:
+        print(f"\nReanudando tras la pasada #{state['pass']} con {len(state['files'])} archivos")
+        return _merge_passes(state['files'], state['pass'], state['stats'], output_file_path,
+                             num_ways, output_format, merge_workers, read_block, write_block,
+                             temp_dir, checkpoint, run_codec, aggregate, limit)
+    checkpoint.clear()
+
     # --- Fase 1: Creación de "runs" iniciales (archivos intermedios ordenados) ---
     print("\nFase 1: Creando runs iniciales...")
     temp_run_files = []
+    phase_stats = []
     try:
-        with open(input_file_path, 'r') as infile:
-            chunk = []
-            run_count = 0
-            for line in infile:
-                try:
-                    num = int(line.strip())
-                    chunk.append(num)
-                except ValueError:
-                    print(f"Advertencia: Saltando línea no numérica: '{line.strip()}'")
-                    continue
-
-                if len(chunk) >= chunk_size:
+        if workers is not None and workers > 1:
+            # Runs generados en paralelo por rangos de bytes de la entrada
+            # (ver parallel_runs.py); las líneas no válidas se saltan sin aviso.
+            if not os.path.exists(input_file_path):
+                raise FileNotFoundError(input_file_path)
+            print(f"Generando runs con {workers} procesos...")
+            temp_run_files = generate_runs_parallel(input_file_path, input_format, chunk_size,
+                                                    os.path.join(temp_dir, "temp_run_"), workers,
+                                                    run_strategy)
+            records = sum(count_records(f) for f in temp_run_files)
+            print(f"Creados {len(temp_run_files)} runs iniciales")
+        else:
+            # Los runs temporales se guardan en binario (ver run_files.py);
+            # la entrada se lee con mmap por bloques grandes y sólo aquí se
+            # interpreta el texto.
+            blocks = iter_number_blocks(
+                input_file_path, input_format,
+                lambda text: print(f"Advertencia: Saltando línea no válida: '{text}'"))
+            if run_strategy != CHUNK:
+                # Otras estrategias de generación de corridas (ver run_generation.py)
+                temp_run_files = get_strategy(run_strategy)(
+                    chain.from_iterable(blocks), chunk_size,
+                    lambda run_id: os.path.join(temp_dir, f"temp_run_{run_id}{RUN_SUFFIX}"), run_codec)
+                records = sum(count_records(f, run_codec) for f in temp_run_files)
+                print(f"Creados {len(temp_run_files)} runs iniciales ({run_strategy})")
+            elif aggregate is not None:
+                # Cada run reúne hasta chunk_size valores distintos; 'records'
+                # cuenta valores distintos (o pares valor-cantidad), no registros de entrada
+                temp_run_files, read, records = combine_runs(
+                    blocks, chunk_size, aggregate,
+                    lambda run_id: os.path.join(temp_dir, f"temp_run_{run_id}{RUN_SUFFIX}"), run_codec)
+                print(f"Creados {len(temp_run_files)} runs iniciales ({aggregate}): "
+                      f"{read} registros de entrada combinados en {records}")
+            else:
+                records = 0
+                for run_count, chunk in enumerate(iter_chunks(blocks, chunk_size)):
                     chunk.sort()  # Ordenamiento interno del chunk
-                    temp_run_file_path = f"temp_run_{run_count}.txt"
-                    with open(temp_run_file_path, 'w') as temp_file:
-                        for item in chunk:
-                            temp_file.write(f"{item}\n")
+                    if limit is not None:
+                        del chunk[limit:]
+                    records += len(chunk)
+                    temp_run_file_path = os.path.join(temp_dir, f"temp_run_{run_count}{RUN_SUFFIX}")
+                    write_run(temp_run_file_path, chunk, run_codec)
                     temp_run_files.append(temp_run_file_path)
-                    chunk = []
-                    run_count += 1
                     print(f"Creado run inicial: {temp_run_file_path}")
 
-            # Escribir el último chunk si no está vacío
-            if chunk:
-                chunk.sort()
-                temp_run_file_path = f"temp_run_{run_count}.txt"
-                with open(temp_run_file_path, 'w') as temp_file:
-                    for item in chunk:
-                        temp_file.write(f"{item}\n")
-                temp_run_files.append(temp_run_file_path)
-                print(f"Creado run inicial: {temp_run_file_path}")
-
     except FileNotFoundError:
         print(f"Error: El archivo de entrada '{input_file_path}' no fue encontrado.")
         return
@@ -57,75 +142,124 @@ def balanced_multiway_merge_sort(input_file_path, output_file_path, num_ways=4,
     if not temp_run_files:
         print("El archivo de entrada está vacío o no contiene números válidos. No hay nada que ordenar.")
         # Crear un archivo de salida vacío si no hay datos.
-        open(output_file_path, 'w').close()
-        return
+        open(output_file_path, 'wb').close()
+        return phase_stats
+
+    # 'bytes': tamaño en disco de los runs escritos en la fase (con codec, comprimidos)
+    phase_stats.append({'phase': 0, 'merges': 0, 'read': 0, 'written': records,
+                        'bytes': _total_bytes(temp_run_files)})
+    checkpoint.save(temp_run_files, {'pass': 0, 'files': temp_run_files, 'stats': phase_stats})
+    return _merge_passes(temp_run_files, 0, phase_stats, output_file_path, num_ways, output_format,
+                         merge_workers, read_block, write_block, temp_dir, checkpoint, run_codec,
+                         aggregate, limit)
+
 
+def _merge_passes(current_files, pass_num, phase_stats, output_file_path, num_ways, output_format,
+                  merge_workers, read_block, write_block, temp_dir, checkpoint, codec=None,
+                  aggregate=None, limit=None):
+    """
+    Fases 2 y 3: fusiona los runs de num_ways en num_ways hasta que queda uno
+    y lo mueve a output_file_path. Al terminar cada pasada se registra en el
+    manifiesto; si una pasada falla se conservan los runs de la anterior.
+    """
     # --- Fase 2: Fusión de runs (pasadas múltiples) ---
     print("\nFase 2: Fusionando runs...")
-    current_files = temp_run_files
-    pass_num = 0
+    parallel_merge = merge_workers is not None and merge_workers > 1
 
     while len(current_files) > 1:
         pass_num += 1
         print(f"\nIniciando pasada de fusión #{pass_num} con {len(current_files)} archivos...")
         next_pass_files = []
+        pass_records = 0
 
-        for i in range(0, len(current_files), num_ways):
-            files_to_merge = current_files[i : i + num_ways]
-            if not files_to_merge:
-                continue
-
-            output_temp_file_path = f"temp_merge_pass_{pass_num}_part_{i // num_ways}.txt"
-            print(f"  Fusionando: {files_to_merge} -> {output_temp_file_path}")
-
+        if parallel_merge and len(current_files) <= num_ways:
+            # Fusión final dividida por rangos de claves entre procesos, que
+            # escriben directamente su tramo del archivo de salida
+            print(f"  Fusión final particionada entre {merge_workers} procesos -> {output_file_path}")
             try:
-                # Abrir archivos de entrada para la fusión
-                input_file_handlers = []
-                for f_path in files_to_merge:
-                    input_file_handlers.append(open(f_path, 'r'))
-
-                # Usar un min-heap para la fusión K-way
-                # Cada elemento en el heap es una tupla: (valor, índice_del_archivo, línea_completa)
-                min_heap = []
-                for idx, fh in enumerate(input_file_handlers):
-                    line = fh.readline()
-                    if line:
-                        try:
-                            value = int(line.strip())
-                            heapq.heappush(min_heap, (value, idx, line))
-                        except ValueError:
-                            print(f"Advertencia: Saltando línea no numérica en archivo intermedio: '{line.strip()}'")
-
-
-                with open(output_temp_file_path, 'w') as outfile:
-                    while min_heap:
-                        min_val, source_idx, original_line = heapq.heappop(min_heap)
-                        outfile.write(original_line) # Escribimos la línea original para mantener formato
-
-                        # Leer el siguiente elemento del archivo del que sacamos el mínimo
-                        next_line = input_file_handlers[source_idx].readline()
-                        if next_line:
-                            try:
-                                next_val = int(next_line.strip())
-                                heapq.heappush(min_heap, (next_val, source_idx, next_line))
-                            except ValueError:
-                                print(f"Advertencia: Saltando línea no numérica en archivo intermedio: '{next_line.strip()}'")
+                pass_records = partitioned_merge([whole_run(f) for f in current_files], output_file_path,
+                                                 merge_workers, output_format, read_block, write_block)
+            except Exception as e:
+                print(f"Ocurrió un error inesperado durante la fusión en la pasada {pass_num}: {e}")
+                _print_resume_hint(temp_dir)
+                return
+            phase_stats.append({'phase': pass_num, 'merges': 1,
+                                'read': pass_records, 'written': pass_records, 'bytes': 0})
+            print(f"  Pasada #{pass_num}: {pass_records} registros leídos, {pass_records} escritos")
+            for f in current_files:
+                os.remove(f)
+            current_files = []
+            checkpoint.clear()
+            break
 
+        if parallel_merge:
+            # Las fusiones de los grupos de esta pasada son independientes
+            groups = []
+            for i in range(0, len(current_files), num_ways):
+                output_temp_file_path = os.path.join(
+                    temp_dir, f"temp_merge_pass_{pass_num}_part_{i // num_ways}{RUN_SUFFIX}")
+                groups.append(([whole_run(f) for f in current_files[i : i + num_ways]],
+                               output_temp_file_path, None))
                 next_pass_files.append(output_temp_file_path)
-
+            print(f"  Fusionando {len(groups)} grupos con {merge_workers} procesos...")
+            try:
+                pass_records = sum(merge_groups(groups, merge_workers, BINARY, read_block, write_block))
             except Exception as e:
                 print(f"Ocurrió un error inesperado durante la fusión en la pasada {pass_num}: {e}")
-                # Cerrar todos los manejadores de archivos y limpiar
-                for fh in input_file_handlers:
-                    fh.close()
-                for f in current_files + next_pass_files:
-                    if os.path.exists(f):
-                        os.remove(f)
+                _remove_files(next_pass_files)
+                _print_resume_hint(temp_dir)
                 return
-            finally:
-                # Asegurarse de cerrar todos los manejadores de archivos abiertos
-                for fh in input_file_handlers:
-                    fh.close()
+        else:
+            for i in range(0, len(current_files), num_ways):
+                files_to_merge = current_files[i : i + num_ways]
+                if not files_to_merge:
+                    continue
+
+                output_temp_file_path = os.path.join(
+                    temp_dir, f"temp_merge_pass_{pass_num}_part_{i // num_ways}{RUN_SUFFIX}")
+                print(f"  Fusionando: {files_to_merge} -> {output_temp_file_path}")
+
+                input_file_handlers = []
+                try:
+                    with NumberWriter(output_temp_file_path, BINARY, write_block, codec) as outfile:
+                        if aggregate is not None:
+                            # Fusión que vuelve a combinar los repetidos entre runs
+                            merged = merge_combined(files_to_merge, outfile, aggregate, read_block, codec)
+                        else:
+                            # Abrir los runs de entrada para la fusión (lectura por bloques)
+                            for f_path in files_to_merge:
+                                input_file_handlers.append(iter_run_blocks(f_path, read_block, codec))
+
+                            # Fusión K-way por bloques (ver merge_engine.py)
+                            merged = merge_into(input_file_handlers, outfile, limit)
+
+                    next_pass_files.append(output_temp_file_path)
+                    pass_records += merged
+
+                except Exception as e:
+                    print(f"Ocurrió un error inesperado durante la fusión en la pasada {pass_num}: {e}")
+                    # Cerrar todos los manejadores de archivos y borrar sólo la
+                    # salida incompleta: los runs de la pasada anterior siguen
+                    # registrados en el manifiesto
+                    for fh in input_file_handlers:
+                        fh.close()
+                    _remove_files(next_pass_files + [output_temp_file_path])
+                    _print_resume_hint(temp_dir)
+                    return
+                finally:
+                    # Asegurarse de cerrar todos los manejadores de archivos abiertos
+                    for fh in input_file_handlers:
+                        fh.close()
+
+        # Cada pasada lee todo lo que escribió la anterior (con limit, como mucho);
+        # con aggregate o limit escribe menos
+        pass_read = phase_stats[-1]['written']
+        phase_stats.append({'phase': pass_num, 'merges': len(next_pass_files),
+                            'read': pass_read, 'written': pass_records,
+                            'bytes': _total_bytes(next_pass_files)})
+        print(f"  Pasada #{pass_num}: {pass_read} registros leídos, {pass_records} escritos")
+        checkpoint.save(next_pass_files, {'pass': pass_num, 'files': next_pass_files, 'stats': phase_stats},
+                        current_files)
 
         # Eliminar los archivos de la pasada anterior
         print(f"  Eliminando archivos temporales de la pasada anterior ({len(current_files)} archivos)...")
@@ -138,44 +272,66 @@ def balanced_multiway_merge_sort(input_file_path, output_file_path, num_ways=4,
     if current_files:
         final_sorted_file = current_files[0]
         try:
-            os.rename(final_sorted_file, output_file_path)
-            print(f"\nOrdenamiento completado. Resultado guardado en '{output_file_path}'")
+            if limit is not None and count_records(final_sorted_file, codec) > limit:
+                # Un único run inicial (sin fusión que lo recortara) más largo que limit
+                write_numbers(output_file_path, islice(iter_run(final_sorted_file, codec=codec), limit),
+                              output_format)
+                os.remove(final_sorted_file)
+            elif aggregate is not None:
+                write_combined_output(final_sorted_file, output_file_path, aggregate, output_format, codec)
+            else:
+                move_run(final_sorted_file, output_file_path, output_format, codec)
         except OSError as e:
             print(f"Error al renombrar el archivo final de '{final_sorted_file}' a '{output_file_path}': {e}")
             print(f"El archivo ordenado final se encuentra en: '{final_sorted_file}'")
-    else:
+            return phase_stats
+        checkpoint.clear()
+    elif not parallel_merge:  # Con fusión particionada la salida ya está escrita
         print("\n¡Algo salió mal! No se generó ningún archivo de salida final.")
+        return phase_stats
+    print(f"\nOrdenamiento completado. Resultado guardado en '{output_file_path}'")
+    total_read = sum(stats['read'] for stats in phase_stats)
+    total_written = sum(stats['written'] for stats in phase_stats)
+    print(f"Total de E/S: {total_read} registros leídos y {total_written} escritos "
+          f"en {pass_num} pasadas de fusión")
+    return phase_stats
+
+
+def _total_bytes(paths):
+    return sum(os.path.getsize(f) for f in paths)
 
+def _remove_files(paths):
+    for f in paths:
+        if os.path.exists(f):
+            os.remove(f)
 
-def create_large_test_file(filename="large_numbers.txt", num_elements=1000000, max_value=10000000):
+def _print_resume_hint(temp_dir):
+    print(f"Los runs de la última pasada terminada se conservan en '{temp_dir}'; "
+          f"vuelva a ejecutar con resume=True para continuar desde ahí.")
+
+def create_large_test_file(filename="large_numbers.txt", num_elements=1000000, max_value=10000000, seed=None):
     """
-    Crea un archivo de texto grande con números enteros aleatorios para pruebas.
+    Crea un archivo de texto grande con números enteros aleatorios (entre 1 y
+    max_value) para pruebas, por bloques vectorizados (ver test_data.py).
     """
-    import random
     print(f"Creando archivo de prueba: '{filename}' con {num_elements} números...")
-    with open(filename, 'w') as f:
-        for _ in range(num_elements):
-            f.write(f"{random.randint(1, max_value)}\n")
+    write_numbers_file(filename, num_elements, 'uniform', seed, low=1, high=max_value + 1)
     print("Archivo de prueba creado exitosamente.")
 
-def verify_sorted_file(filepath):
+def verify_sorted_file(filepath, fmt=TEXT):
     """
     Verifica si un archivo de números está ordenado de forma ascendente.
     """
     print(f"\nVerificando archivo: '{filepath}'...")
     try:
-        with open(filepath, 'r') as f:
-            prev_num = float('-inf')
-            for line_num, line in enumerate(f, 1):
-                try:
-                    current_num = int(line.strip())
-                    if current_num < prev_num:
-                        print(f"¡Error de ordenamiento en la línea {line_num}! {current_num} < {prev_num}")
-                        return False
-                    prev_num = current_num
-                except ValueError:
-                    print(f"Advertencia: Línea no numérica en el archivo de verificación: '{line.strip()}'")
-                    continue
+        # El archivo se recorre con mmap por bloques grandes (ver mmap_scan.py)
+        unsorted = find_unsorted(
+            filepath, fmt,
+            lambda text: print(f"Advertencia: Línea no válida en el archivo de verificación: '{text}'"))
+        if unsorted is not None:
+            position, prev_num, current_num = unsorted
+            print(f"¡Error de ordenamiento en el número {position}! {current_num} < {prev_num}")
+            return False
         print("El archivo está correctamente ordenado.")
         return True
     except FileNotFoundError:
@@ -198,6 +354,9 @@ if __name__ == "__main__":
     # Ejecutar el algoritmo de ordenamiento
     balanced_multiway_merge_sort(input_file, output_file, num_ways=8, chunk_size=50000)
 
+    # Misma ordenación con el plan calculado a partir de un presupuesto de 16 MB
+    balanced_multiway_merge_sort(input_file, output_file, memory_budget=16 * 1024 * 1024)
+
     # Verificar el archivo de salida
     verify_sorted_file(output_file)
 
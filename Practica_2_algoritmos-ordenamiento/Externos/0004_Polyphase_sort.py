@@ -1,196 +1,209 @@
 import os
-import heapq
+from collections import deque
+from merge_engine import merge_into
+from run_codecs import get_codec
+from run_files import (BINARY, TEXT, RUN_SUFFIX, NumberWriter, check_format, find_unsorted, iter_blocks,
+                       iter_chunks, iter_number_blocks, move_run)
+from test_data import write_numbers_file
 
-def balanced_multiway_merge_sort(input_file_path, output_file_path, num_ways=4, chunk_size=10000):
+
+class Tape:
+    """
+    Una "cinta": archivo binario con corridas escritas una tras otra.
+
+    runs guarda la longitud (en registros) de cada corrida pendiente de leer,
+    en orden. Una longitud 0 representa una corrida ficticia (dummy).
     """
-    Implementa el algoritmo de ordenamiento externo Balanced Multiway Merging.
 
-    Este algoritmo divide el archivo de entrada en "chunks", los ordena internamente,
-    y luego fusiona esos chunks ordenados en múltiples pasadas hasta obtener un
-    único archivo ordenado.
+    def __init__(self, path):
+        self.path = path
+        self.runs = deque()
+        self.handle = None
+
+    def open_for_write(self):
+        self.close()
+        self.handle = open(self.path, 'wb')
+
+    def open_for_read(self):
+        self.close()
+        self.handle = open(self.path, 'rb')
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+
+
+def polyphase_merge_sort(input_file_path, output_file_path, num_tapes=3, chunk_size=10000,
+                         input_format=TEXT, output_format=TEXT, temp_dir='.', codec=None):
+    """
+    Implementa el algoritmo de ordenamiento externo Polyphase Merge (fusión polifásica).
+
+    Las corridas iniciales se reparten entre num_tapes - 1 cintas de entrada según
+    una distribución de Fibonacci generalizada, completada con corridas ficticias
+    (algoritmo D de Knuth). En cada fase se fusiona sobre la cinta vacía hasta que
+    se agota una de las cintas de entrada, que pasa a ser la salida de la fase
+    siguiente. A diferencia de la fusión balanceada, en cada fase sólo se copia
+    una fracción de los datos.
 
     Args:
         input_file_path (str): Ruta al archivo de entrada que contiene los números a ordenar.
         output_file_path (str): Ruta al archivo de salida donde se guardará el resultado ordenado.
-        num_ways (int): El número de "caminos" o archivos intermedios para la fusión.
-                        Un valor mayor puede reducir el número de pasadas, pero requiere más RAM.
-        chunk_size (int): El número de elementos a leer y ordenar internamente en cada "chunk".
+        num_tapes (int): Número total de cintas (al menos 3): num_tapes - 1 de entrada y una de salida.
+        chunk_size (int): El número de elementos a leer y ordenar internamente en cada corrida inicial.
                           Ajusta este valor según la memoria disponible.
+        input_format (str): 'text' (un número por línea) o 'binary' (enteros de 64 bits).
+        output_format (str): Formato del archivo de salida, 'text' o 'binary'.
+        temp_dir (str): Directorio donde se crean las cintas temporales.
+        codec (str): Compresión de las cintas ('zlib', 'lzma', 'bz2', 'delta'; ver
+                     run_codecs.py) o None para guardarlas sin comprimir.
+
+    Returns:
+        list: Una entrada por fase con las claves 'phase', 'merges', 'read' y 'written'
+              (registros leídos y escritos). La fase 0 es la distribución inicial.
     """
-
-    print(f"Iniciando Balanced Multiway Merging para '{input_file_path}'...")
-    print(f"Número de caminos (num_ways): {num_ways}")
+    if num_tapes < 3:
+        raise ValueError("La fusión polifásica necesita al menos 3 cintas")
+    check_format(input_format)
+    check_format(output_format)
+    tape_codec = get_codec(codec)
+
+    print(f"Iniciando Polyphase Merge para '{input_file_path}'...")
+    print(f"Número de cintas (num_tapes): {num_tapes}")
     print(f"Tamaño del chunk (chunk_size): {chunk_size}")
 
-    # --- Fase 1: Creación de "runs" iniciales (archivos intermedios ordenados) ---
-    print("\nFase 1: Creando runs iniciales...")
-    temp_run_files = []
-    try:
-        with open(input_file_path, 'r') as infile:
-            chunk = []
-            run_count = 0
-            for line in infile:
-                try:
-                    num = int(line.strip())
-                    chunk.append(num)
-                except ValueError:
-                    print(f"Advertencia: Saltando línea no numérica: '{line.strip()}'")
-                    continue
-
-                if len(chunk) >= chunk_size:
-                    chunk.sort()  # Ordenamiento interno del chunk
-                    temp_run_file_path = f"temp_run_{run_count}.txt"
-                    with open(temp_run_file_path, 'w') as temp_file:
-                        for item in chunk:
-                            temp_file.write(f"{item}\n")
-                    temp_run_files.append(temp_run_file_path)
-                    chunk = []
-                    run_count += 1
-                    print(f"Creado run inicial: {temp_run_file_path}")
-
-            # Escribir el último chunk si no está vacío
-            if chunk:
-                chunk.sort()
-                temp_run_file_path = f"temp_run_{run_count}.txt"
-                with open(temp_run_file_path, 'w') as temp_file:
-                    for item in chunk:
-                        temp_file.write(f"{item}\n")
-                temp_run_files.append(temp_run_file_path)
-                print(f"Creado run inicial: {temp_run_file_path}")
+    tapes = [Tape(os.path.join(temp_dir, f"temp_tape_{i}{RUN_SUFFIX}")) for i in range(num_tapes)]
+    num_inputs = num_tapes - 1
+    phase_stats = []
 
-    except FileNotFoundError:
-        print(f"Error: El archivo de entrada '{input_file_path}' no fue encontrado.")
-        return
-    except Exception as e:
-        print(f"Ocurrió un error inesperado durante la Fase 1: {e}")
-        # Limpiar archivos temporales en caso de error
-        for f in temp_run_files:
-            if os.path.exists(f):
-                os.remove(f)
-        return
-
-    if not temp_run_files:
-        print("El archivo de entrada está vacío o no contiene números válidos. No hay nada que ordenar.")
-        # Crear un archivo de salida vacío si no hay datos.
-        open(output_file_path, 'w').close()
-        return
-
-    # --- Fase 2: Fusión de runs (pasadas múltiples) ---
-    print("\nFase 2: Fusionando runs...")
-    current_files = temp_run_files
-    pass_num = 0
-
-    while len(current_files) > 1:
-        pass_num += 1
-        print(f"\nIniciando pasada de fusión #{pass_num} con {len(current_files)} archivos...")
-        next_pass_files = []
-
-        for i in range(0, len(current_files), num_ways):
-            files_to_merge = current_files[i : i + num_ways]
-            if not files_to_merge:
-                continue
-
-            output_temp_file_path = f"temp_merge_pass_{pass_num}_part_{i // num_ways}.txt"
-            print(f"  Fusionando: {files_to_merge} -> {output_temp_file_path}")
-
-            try:
-                # Abrir archivos de entrada para la fusión
-                input_file_handlers = []
-                for f_path in files_to_merge:
-                    input_file_handlers.append(open(f_path, 'r'))
-
-                # Usar un min-heap para la fusión K-way
-                # Cada elemento en el heap es una tupla: (valor, índice_del_archivo, línea_completa)
-                min_heap = []
-                for idx, fh in enumerate(input_file_handlers):
-                    line = fh.readline()
-                    if line:
-                        try:
-                            value = int(line.strip())
-                            heapq.heappush(min_heap, (value, idx, line))
-                        except ValueError:
-                            print(f"Advertencia: Saltando línea no numérica en archivo intermedio: '{line.strip()}'")
-
-
-                with open(output_temp_file_path, 'w') as outfile:
-                    while min_heap:
-                        min_val, source_idx, original_line = heapq.heappop(min_heap)
-                        outfile.write(original_line) # Escribimos la línea original para mantener formato
-
-                        # Leer el siguiente elemento del archivo del que sacamos el mínimo
-                        next_line = input_file_handlers[source_idx].readline()
-                        if next_line:
-                            try:
-                                next_val = int(next_line.strip())
-                                heapq.heappush(min_heap, (next_val, source_idx, next_line))
-                            except ValueError:
-                                print(f"Advertencia: Saltando línea no numérica en archivo intermedio: '{next_line.strip()}'")
-
-                next_pass_files.append(output_temp_file_path)
-
-            except Exception as e:
-                print(f"Ocurrió un error inesperado durante la fusión en la pasada {pass_num}: {e}")
-                # Cerrar todos los manejadores de archivos y limpiar
-                for fh in input_file_handlers:
-                    fh.close()
-                for f in current_files + next_pass_files:
-                    if os.path.exists(f):
-                        os.remove(f)
-                return
-            finally:
-                # Asegurarse de cerrar todos los manejadores de archivos abiertos
-                for fh in input_file_handlers:
-                    fh.close()
-
-        # Eliminar los archivos de la pasada anterior
-        print(f"  Eliminando archivos temporales de la pasada anterior ({len(current_files)} archivos)...")
-        for f in current_files:
-            if os.path.exists(f):
-                os.remove(f)
-        current_files = next_pass_files
-
-    # --- Fase 3: Renombrar el archivo final y limpiar ---
-    if current_files:
-        final_sorted_file = current_files[0]
-        try:
-            os.rename(final_sorted_file, output_file_path)
-            print(f"\nOrdenamiento completado. Resultado guardado en '{output_file_path}'")
-        except OSError as e:
-            print(f"Error al renombrar el archivo final de '{final_sorted_file}' a '{output_file_path}': {e}")
-            print(f"El archivo ordenado final se encuentra en: '{final_sorted_file}'")
-    else:
-        print("\n¡Algo salió mal! No se generó ningún archivo de salida final.")
-
-
-def create_large_test_file(filename="large_numbers.txt", num_elements=1000000, max_value=10000000):
+    try:
+        # --- Fase 1: Distribución de corridas iniciales (algoritmo D de Knuth) ---
+        # perfect[j] es el número de corridas que debe tener la cinta j en el nivel
+        # actual de la distribución perfecta; dummy[j] las que aún le faltan.
+        print("\nFase 1: Distribuyendo corridas iniciales...")
+        blocks = iter_number_blocks(
+            input_file_path, input_format,
+            lambda text: print(f"Advertencia: Saltando línea no válida: '{text}'"))
+
+        for tape in tapes[:num_inputs]:
+            tape.open_for_write()
+        perfect = [1] * num_inputs + [0]
+        dummy = [1] * num_inputs + [0]
+        level = 1
+        j = 0
+        real_runs = [[] for _ in range(num_inputs)]
+        written = 0
+
+        def distribute(chunk):
+            nonlocal j, level, written
+            if any(real_runs):
+                # D3: elegir la cinta que recibe la siguiente corrida
+                if dummy[j] < dummy[j + 1]:
+                    j += 1
+                elif dummy[j] == 0:
+                    # D4: subir un nivel en la distribución de Fibonacci generalizada
+                    level += 1
+                    first = perfect[0]
+                    for i in range(num_inputs):
+                        dummy[i] = first + perfect[i + 1] - perfect[i]
+                        perfect[i] = first + perfect[i + 1]
+                    j = 0
+                else:
+                    j = 0
+            # D2: escribir la corrida ordenada en la cinta j
+            chunk.sort()
+            with NumberWriter(tapes[j].handle, BINARY, codec=tape_codec) as writer:
+                writer.write_many(chunk)
+            real_runs[j].append(len(chunk))
+            dummy[j] -= 1
+            written += len(chunk)
+
+        for chunk in iter_chunks(blocks, chunk_size):
+            distribute(chunk)
+
+        if not any(real_runs):
+            print("El archivo de entrada está vacío o no contiene números válidos. No hay nada que ordenar.")
+            open(output_file_path, 'wb').close()
+            return phase_stats
+
+        # Las corridas ficticias se consideran al principio de cada cinta
+        for i in range(num_inputs):
+            tapes[i].runs = deque([0] * dummy[i] + real_runs[i])
+            tapes[i].open_for_read()
+        phase_stats.append({'phase': 0, 'merges': 0, 'read': 0, 'written': written})
+        print(f"  Nivel {level}: corridas reales por cinta {[len(r) for r in real_runs]}, "
+              f"ficticias {dummy[:num_inputs]}")
+
+        # --- Fase 2: Fusión polifásica ---
+        print("\nFase 2: Fusionando corridas...")
+        output_tape = tapes[num_inputs]
+        phase = 0
+        # Con una sola corrida real no hace falta fusionar (las ficticias no se copian)
+        single_run = sum(len(runs) for runs in real_runs) == 1
+        while not single_run and sum(len(tape.runs) for tape in tapes) > 1:
+            phase += 1
+            inputs = [tape for tape in tapes if tape is not output_tape]
+            merges = min(len(tape.runs) for tape in inputs)
+            output_tape.open_for_write()
+            read = written = 0
+            for _ in range(merges):
+                lengths = [tape.runs.popleft() for tape in inputs]
+                # Cada corrida ocupa tramas completas, así que con codec también
+                # se lee exactamente la corrida siguiente de cada cinta
+                sources = [iter_blocks(tape.handle, length, codec=tape_codec)
+                           for tape, length in zip(inputs, lengths) if length]
+                with NumberWriter(output_tape.handle, BINARY, codec=tape_codec) as writer:
+                    merge_into(sources, writer)
+                output_tape.runs.append(writer.count)
+                read += sum(lengths)
+                written += writer.count
+            output_tape.open_for_read()
+            phase_stats.append({'phase': phase, 'merges': merges, 'read': read, 'written': written})
+            print(f"  Fase #{phase}: {merges} fusiones -> {output_tape.path} "
+                  f"({read} registros leídos, {written} escritos)")
+            # La cinta de entrada que se agotó es la salida de la siguiente fase
+            output_tape = next(tape for tape in inputs if not tape.runs)
+
+        # --- Fase 3: El resultado es la única corrida real que queda ---
+        final_tape = next(tape for tape in tapes if any(tape.runs))
+        final_tape.close()
+        move_run(final_tape.path, output_file_path, output_format, tape_codec)
+        total_read = sum(stats['read'] for stats in phase_stats)
+        total_written = sum(stats['written'] for stats in phase_stats)
+        print(f"\nOrdenamiento completado. Resultado guardado en '{output_file_path}'")
+        print(f"Total de E/S: {total_read} registros leídos y {total_written} escritos "
+              f"en {phase} fases de fusión")
+        return phase_stats
+    finally:
+        for tape in tapes:
+            tape.close()
+            if os.path.exists(tape.path):
+                os.remove(tape.path)
+
+
+def create_large_test_file(filename="large_numbers.txt", num_elements=1000000, max_value=10000000, seed=None):
     """
-    Crea un archivo de texto grande con números enteros aleatorios para pruebas.
+    Crea un archivo de texto grande con números enteros aleatorios (entre 1 y
+    max_value) para pruebas, por bloques vectorizados (ver test_data.py).
     """
-    import random
     print(f"Creando archivo de prueba: '{filename}' con {num_elements} números...")
-    with open(filename, 'w') as f:
-        for _ in range(num_elements):
-            f.write(f"{random.randint(1, max_value)}\n")
+    write_numbers_file(filename, num_elements, 'uniform', seed, low=1, high=max_value + 1)
     print("Archivo de prueba creado exitosamente.")
 
-def verify_sorted_file(filepath):
+def verify_sorted_file(filepath, fmt=TEXT):
     """
     Verifica si un archivo de números está ordenado de forma ascendente.
     """
     print(f"\nVerificando archivo: '{filepath}'...")
     try:
-        with open(filepath, 'r') as f:
-            prev_num = float('-inf')
-            for line_num, line in enumerate(f, 1):
-                try:
-                    current_num = int(line.strip())
-                    if current_num < prev_num:
-                        print(f"¡Error de ordenamiento en la línea {line_num}! {current_num} < {prev_num}")
-                        return False
-                    prev_num = current_num
-                except ValueError:
-                    print(f"Advertencia: Línea no numérica en el archivo de verificación: '{line.strip()}'")
-                    continue
+        # El archivo se recorre con mmap por bloques grandes (ver mmap_scan.py)
+        unsorted = find_unsorted(
+            filepath, fmt,
+            lambda text: print(f"Advertencia: Línea no válida en el archivo de verificación: '{text}'"))
+        if unsorted is not None:
+            position, prev_num, current_num = unsorted
+            print(f"¡Error de ordenamiento en el número {position}! {current_num} < {prev_num}")
+            return False
         print("El archivo está correctamente ordenado.")
         return True
     except FileNotFoundError:
@@ -211,7 +224,7 @@ if __name__ == "__main__":
     create_large_test_file(input_file, test_num_elements, test_max_value)
 
     # Ejecutar el algoritmo de ordenamiento
-    balanced_multiway_merge_sort(input_file, output_file, num_ways=8, chunk_size=50000)
+    polyphase_merge_sort(input_file, output_file, num_tapes=4, chunk_size=50000)
 
     # Verificar el archivo de salida
     verify_sorted_file(output_file)
@@ -1,11 +1,26 @@
 import os
-import heapq
 import math
-from typing import List, IO
+import shutil
+from itertools import islice
+from typing import List, IO, Optional, Sequence
+from run_files import (BINARY, TEXT, RUN_SUFFIX, RECORD_SIZE, NumberWriter, check_format,
+                       count_records, iter_blocks, iter_numbers, iter_run, move_run, write_numbers)
+from checkpoint import Checkpoint, input_identity
+from merge_engine import merge_into
+from merge_plan import default_max_open_files, estimate_records, plan_merge
+from parallel_merge import merge_groups, partitioned_merge
+from parallel_runs import generate_runs_parallel
+from run_codecs import get_codec
+from run_generation import CHUNK, REPLACEMENT, RunStats, get_strategy
 
 class ExternalSort:
     def __init__(self, input_file: str, output_file: str, temp_dir: str = "temp_sort", 
-                 block_size: int = 1000, num_tapes: int = 3):
+                 block_size: int = 1000, num_tapes: int = 3,
+                 input_format: str = TEXT, output_format: str = TEXT,
+                 run_strategy: str = CHUNK, memory_budget: Optional[int] = None,
+                 max_open_files: Optional[int] = None, workers: Optional[int] = None,
+                 merge_workers: Optional[int] = None, resume: bool = False,
+                 codec: Optional[str] = None, limit: Optional[int] = None):
         """
         Inicializa el ordenador externo
         
@@ -15,23 +30,137 @@ class ExternalSort:
             temp_dir: Directorio para archivos temporales
             block_size: Número de elementos que caben en memoria
             num_tapes: Número de "cintas" (archivos) a usar para la distribución
+            input_format: 'text' (un número por línea) o 'binary' (enteros de 64 bits)
+            output_format: Formato del archivo de salida, 'text' o 'binary'
+            run_strategy: Generación de corridas iniciales: 'chunk' (bloques de
+                          block_size ordenados) o 'replacement' (selección por
+                          reemplazo, corridas de ~2 * block_size en promedio)
+            memory_budget: Memoria disponible en bytes, en total para todos los
+                           procesos. Si se indica, block_size y num_tapes los
+                           calcula el planificador (merge_plan.py) para hacer
+                           el menor número de pasadas de fusión
+            max_open_files: Límite de archivos abiertos para el planificador
+            workers: Procesos para generar las corridas iniciales en paralelo
+                     (None o 1 para hacerlo secuencialmente)
+            merge_workers: Procesos para las fusiones de cada fase; la fusión final
+                           se divide por rangos de claves entre ellos
+            resume: Continúa una ejecución interrumpida desde la última etapa
+                    registrada en el manifiesto de temp_dir (ver checkpoint.py)
+            codec: Compresión de corridas y cintas ('zlib', 'lzma', 'bz2', 'delta';
+                   ver run_codecs.py); no admite workers ni merge_workers
+            limit: Si se indica, sólo se escriben los limit primeros valores de la
+                   salida: cada fusión se detiene al escribir limit registros,
+                   porque los primeros limit de la salida están entre los primeros
+                   limit de cada corrida. No admite merge_workers
         """
+        check_format(input_format)
+        check_format(output_format)
+        self._generate = get_strategy(run_strategy)
+        self.codec = codec
+        self._codec = get_codec(codec)
+        if self._codec is not None and ((workers or 1) > 1 or (merge_workers or 1) > 1):
+            # Los procesos leen y escriben las cintas por desplazamientos de registro
+            raise ValueError("Las corridas comprimidas no admiten workers ni merge_workers")
+        if limit is not None and (limit < 0 or (merge_workers or 1) > 1):
+            raise ValueError("limit debe ser >= 0 y no admite merge_workers")
         self.input_file = input_file
         self.output_file = output_file
         self.temp_dir = temp_dir
         self.block_size = block_size
         self.num_tapes = num_tapes
+        self.input_format = input_format
+        self.output_format = output_format
+        self.run_strategy = run_strategy
+        self.run_stats = None
+        self.memory_budget = memory_budget
+        self.max_open_files = max_open_files
+        self.workers = workers
+        self.merge_workers = merge_workers
+        self.limit = limit
+        self.plan = None
+        self.read_block_records = None  # Tamaño de bloque configurado en buffered_io
+        self.write_block_records = None
         self.runs = []
+        self.tapes = []
+        self.tape_runs = []  # Longitud (en registros) de cada corrida en cada cinta
+        self.resume = resume
+        self.phase = 0
+        self.checkpoint = None
 
     def sort(self):
-        """Ejecuta el proceso completo de ordenamiento externo"""
-        try:
+        """
+        Ejecuta el proceso completo de ordenamiento externo. Cada etapa
+        terminada se registra en un manifiesto; si el proceso falla, los
+        archivos temporales se conservan para poder reanudar con resume=True.
+        """
+        if self.memory_budget is not None:
+            self._plan()
+        self.checkpoint = Checkpoint(self.temp_dir, self._job())
+        state = self.checkpoint.load() if self.resume else None
+        if state is None:
             self._prepare_temp_dir()
             self._generate_initial_runs()
-            self._distribute_runs()
-            self._merge_runs()
-        finally:
+            self._save_state('runs')
+        else:
+            self._restore_state(state)
+        if not self.tapes and not self.runs:
+            print("El archivo de entrada está vacío o no contiene números válidos. No hay nada que ordenar.")
+            # Crear un archivo de salida vacío si no hay datos.
+            open(self.output_file, 'wb').close()
             self._cleanup()
+            return
+        if not self.tapes:
+            runs = self.runs
+            self._distribute_runs()
+            self._save_state('tapes', runs)
+            for run_file in runs:
+                os.remove(run_file)
+        self._merge_runs()
+        self._cleanup()
+
+    def _job(self) -> dict:
+        """Parámetros que identifican el trabajo en el manifiesto"""
+        return {'input': input_identity(self.input_file), 'input_format': self.input_format,
+                'block_size': self.block_size, 'num_tapes': self.num_tapes,
+                'run_strategy': self.run_strategy, 'workers': self.workers, 'codec': self.codec,
+                'limit': self.limit}
+
+    def _save_state(self, stage: str, superseded: Sequence[str] = ()):
+        """
+        Registra en el manifiesto la etapa terminada con sus archivos (corridas
+        o cintas) y los de la etapa anterior que se borran a continuación
+        """
+        if stage == 'runs':
+            files = self.runs
+        else:
+            files = [tape for tape, runs in zip(self.tapes, self.tape_runs) if runs]
+        self.checkpoint.save(files, {'stage': stage, 'runs': self.runs, 'tapes': self.tapes,
+                                     'tape_runs': self.tape_runs, 'phase': self.phase,
+                                     'run_lengths': self.run_stats.lengths}, superseded)
+
+    def _restore_state(self, state: dict):
+        """Recupera la etapa registrada en el manifiesto"""
+        self.runs = state['runs']
+        self.tapes = state['tapes']
+        self.tape_runs = state['tape_runs']
+        self.phase = state['phase']
+        self.run_stats = RunStats(self.run_strategy, self.block_size, state['run_lengths'])
+        print(f"Reanudando desde la etapa '{state['stage']}' (fase {self.phase})")
+
+    def _plan(self):
+        """Elige block_size, num_tapes y los búferes según el presupuesto de memoria"""
+        max_open = self.max_open_files if self.max_open_files is not None else default_max_open_files()
+        # Durante una fase están abiertas las cintas de entrada y las de salida
+        self.plan = plan_merge(self.memory_budget,
+                               estimate_records(self.input_file, self.input_format),
+                               max(2, max_open // 2),
+                               2.0 if self.run_strategy == REPLACEMENT else 1.0,
+                               self.workers or 1, self.merge_workers or 1)
+        print(self.plan)
+        self.block_size = self.plan.chunk_size
+        self.num_tapes = self.plan.fan_in
+        self.read_block_records = self.plan.read_block_records
+        self.write_block_records = self.plan.write_block_records
 
     def _prepare_temp_dir(self):
         """Prepara el directorio temporal"""
@@ -43,35 +172,23 @@ class ExternalSort:
 
     def _generate_initial_runs(self):
         """
-        Genera las corridas iniciales mediante ordenamiento interno.
-        Cada corrida es del tamaño de block_size elementos.
+        Genera las corridas iniciales con la estrategia elegida (run_strategy)
+        y guarda sus estadísticas en self.run_stats.
         """
-        with open(self.input_file, 'r') as infile:
-            run_buffer = []
-            run_count = 0
-            
-            for line in infile:
-                num = line.strip()
-                if num:
-                    try:
-                        run_buffer.append(int(num))
-                        if len(run_buffer) >= self.block_size:
-                            self._save_run(run_buffer, run_count)
-                            run_count += 1
-                            run_buffer = []
-                    except ValueError:
-                        continue
-            
-            if run_buffer:
-                self._save_run(run_buffer, run_count)
+        if self.workers is not None and self.workers > 1:
+            # Cada proceso genera las corridas de un rango de bytes de la entrada
+            self.runs = generate_runs_parallel(self.input_file, self.input_format, self.block_size,
+                                               os.path.join(self.temp_dir, "run_"), self.workers,
+                                               self.run_strategy)
+        else:
+            # Las líneas no numéricas o fuera de rango se descartan al leer la entrada de texto
+            numbers = iter_numbers(self.input_file, self.input_format)
+            self.runs = self._generate(numbers, self.block_size, self._run_path, self._codec)
+        self.run_stats = RunStats.from_runs(self.run_strategy, self.block_size, self.runs, self._codec)
 
-    def _save_run(self, data: List[int], run_id: int):
-        """Guarda una corrida ordenada en un archivo temporal"""
-        data.sort()
-        run_file = os.path.join(self.temp_dir, f"run_{run_id}.txt")
-        with open(run_file, 'w') as f:
-            f.writelines(f"{num}\n" for num in data)
-        self.runs.append(run_file)
+    def _run_path(self, run_id: int) -> str:
+        """Ruta del archivo temporal binario de una corrida inicial"""
+        return os.path.join(self.temp_dir, f"run_{run_id}{RUN_SUFFIX}")
 
     def _distribute_runs(self):
         """
@@ -81,87 +198,140 @@ class ExternalSort:
         if not self.runs:
             raise ValueError("No hay corridas para distribuir")
         
-        # Crear las cintas (archivos temporales)
-        self.tapes = [os.path.join(self.temp_dir, f"tape_{i}.txt") for i in range(self.num_tapes)]
+        # Crear las cintas (archivos temporales), vacías aunque se repita la
+        # distribución al reanudar
+        tapes = self._tape_names(0)
+        tape_runs = [[] for _ in range(self.num_tapes)]
+        for tape in tapes:
+            open(tape, 'wb').close()
         
         # Distribuir corridas entre las cintas de forma balanceada
         for i, run_file in enumerate(self.runs):
             tape_idx = i % self.num_tapes
-            with open(run_file, 'r') as src, open(self.tapes[tape_idx], 'a') as dest:
-                dest.writelines(src.readlines())
-            
-            # Eliminar el archivo de corrida individual
-            os.remove(run_file)
+            with open(run_file, 'rb') as src, open(tapes[tape_idx], 'ab') as dest:
+                shutil.copyfileobj(src, dest)
+            # Se registra la longitud para conocer los límites de cada corrida en la cinta
+            tape_runs[tape_idx].append(count_records(run_file, self._codec))
         
-        self.runs = []  # Las corridas ahora están en las cintas
+        # Las corridas ahora están en las cintas; sort() elimina los archivos
+        # individuales una vez registrada la distribución en el manifiesto
+        self.tapes = tapes
+        self.tape_runs = tape_runs
+        self.runs = []
+
+    def _tape_names(self, phase: int) -> List[str]:
+        """Nombres de las cintas de una fase (distintos en cada fase)"""
+        return [os.path.join(self.temp_dir, f"tape_{phase}_{i}{RUN_SUFFIX}") for i in range(self.num_tapes)]
 
     def _merge_runs(self):
         """Fusiona las corridas de las cintas hasta obtener un solo archivo ordenado"""
-        while True:
-            # Determinar qué cintas tienen datos
-            active_tapes = [tape for tape in self.tapes if os.path.exists(tape) and os.path.getsize(tape) > 0]
-            
-            if len(active_tapes) <= 1:
-                break  # Solo queda una cinta con datos
-            
+        parallel = self.merge_workers is not None and self.merge_workers > 1
+        while sum(len(runs) for runs in self.tape_runs) > 1:
+            self.phase += 1
             # Crear un nuevo conjunto de cintas para la siguiente fase
-            new_tapes = [os.path.join(self.temp_dir, f"merge_{i}.txt") for i in range(self.num_tapes)]
-            output_tape_idx = 0
-            
-            # Procesar en grupos de (num_tapes-1) cintas
-            for i in range(0, len(active_tapes), self.num_tapes-1):
-                input_tapes = active_tapes[i:i+self.num_tapes-1]
-                if not input_tapes:
-                    continue
-                
-                # Fusionar el grupo actual
-                self._merge_to_tape(input_tapes, new_tapes[output_tape_idx])
-                output_tape_idx = (output_tape_idx + 1) % self.num_tapes
+            new_tapes = self._tape_names(self.phase)
+            if parallel and max(len(runs) for runs in self.tape_runs) == 1:
+                # Última fusión: cada proceso escribe un rango de claves de la salida
+                partitioned_merge(self._run_segments()[0], self.output_file, self.merge_workers,
+                                  self.output_format, self.read_block_records, self.write_block_records)
+                self._remove_tapes()
+                self.tape_runs = [[] for _ in range(self.num_tapes)]
+                return
+            if parallel:
+                new_tape_runs = self._merge_phase_parallel(new_tapes)
+            else:
+                new_tape_runs = self._merge_phase(new_tapes)
             
-            # Eliminar las cintas antiguas y actualizar a las nuevas
-            for tape in self.tapes:
+            # Registrar la fase, eliminar las cintas antiguas y actualizar a las nuevas
+            old_tapes = self.tapes
+            self.tapes = new_tapes
+            self.tape_runs = new_tape_runs
+            self._save_state('tapes', old_tapes)
+            for tape in old_tapes:
                 if os.path.exists(tape):
                     os.remove(tape)
-            
-            self.tapes = new_tapes
         
-        # El resultado final está en la primera cinta con datos
-        final_tape = next(tape for tape in self.tapes if os.path.exists(tape) and os.path.getsize(tape) > 0)
-        os.rename(final_tape, self.output_file)
+        # El resultado final está en la única cinta con datos
+        final_idx = next(i for i in range(self.num_tapes) if self.tape_runs[i])
+        final_tape = self.tapes[final_idx]
+        if self.limit is not None and self.tape_runs[final_idx][0] > self.limit:
+            # Una única corrida inicial (sin fusión que la recortara) más larga que limit
+            write_numbers(self.output_file, islice(iter_run(final_tape, codec=self._codec), self.limit),
+                          self.output_format)
+            os.remove(final_tape)
+        else:
+            move_run(final_tape, self.output_file, self.output_format, self._codec)
 
-    def _merge_to_tape(self, input_files: List[str], output_file: str):
+    def _merge_phase(self, new_tapes: List[str]) -> List[List[int]]:
         """
-        Fusiona múltiples archivos de entrada en un solo archivo de salida
-        usando un min-heap para la fusión multiway.
+        Fusiona la k-ésima corrida de cada cinta activa en una sola corrida, que
+        se reparte de forma circular entre las nuevas cintas. Devuelve las
+        longitudes de las corridas de cada nueva cinta.
         """
-        file_handles = [open(f, 'r') for f in input_files]
-        heap = []
-        
-        # Inicializar el heap con el primer elemento de cada archivo
-        for i, fh in enumerate(file_handles):
-            line = fh.readline()
-            if line:
-                try:
-                    heapq.heappush(heap, (int(line.strip()), i))
-                except ValueError:
-                    pass
-        
-        with open(output_file, 'w') as outfile:
-            while heap:
-                val, tape_idx = heapq.heappop(heap)
-                outfile.write(f"{val}\n")
-                
-                # Leer el siguiente elemento del archivo correspondiente
-                line = file_handles[tape_idx].readline()
-                if line:
-                    try:
-                        heapq.heappush(heap, (int(line.strip()), tape_idx))
-                    except ValueError:
-                        pass
-        
-        # Cerrar todos los archivos
-        for fh in file_handles:
-            fh.close()
+        new_tape_runs = [[] for _ in range(self.num_tapes)]
+        active = [i for i in range(self.num_tapes) if self.tape_runs[i]]
+        handles = [open(self.tapes[i], 'rb') for i in active]
+        outputs = [open(tape, 'wb') for tape in new_tapes]
+        try:
+            max_runs = max(len(self.tape_runs[i]) for i in active)
+            for k in range(max_runs):
+                sources = [iter_blocks(fh, self.tape_runs[i][k], self.read_block_records, self._codec)
+                           for fh, i in zip(handles, active) if k < len(self.tape_runs[i])]
+                output_tape_idx = k % self.num_tapes
+                written = self._merge_to_tape(sources, outputs[output_tape_idx])
+                new_tape_runs[output_tape_idx].append(written)
+        finally:
+            for fh in handles + outputs:
+                fh.close()
+        return new_tape_runs
+
+    def _merge_phase_parallel(self, new_tapes: List[str]) -> List[List[int]]:
+        """
+        Igual que _merge_phase, pero las fusiones de la fase se ejecutan en
+        procesos. La longitud de cada corrida de salida es la suma de sus
+        entradas, así que cada proceso escribe directamente en su posición
+        de la cinta de destino.
+        """
+        new_tape_runs = [[] for _ in range(self.num_tapes)]
+        groups = []
+        for k, segments in enumerate(self._run_segments()):
+            output_tape_idx = k % self.num_tapes
+            offset = sum(new_tape_runs[output_tape_idx])
+            new_tape_runs[output_tape_idx].append(sum(count for _, _, count in segments))
+            groups.append((segments, new_tapes[output_tape_idx], offset))
+        for tape, runs in zip(new_tapes, new_tape_runs):
+            with open(tape, 'wb') as f:
+                f.truncate(sum(runs) * RECORD_SIZE)
+        merge_groups(groups, self.merge_workers, BINARY, self.read_block_records, self.write_block_records)
+        return new_tape_runs
+
+    def _run_segments(self) -> List[List[tuple]]:
+        """Segmentos (cinta, registro inicial, registros) de la k-ésima corrida de cada cinta, para cada k"""
+        groups = []
+        for tape, runs in zip(self.tapes, self.tape_runs):
+            start = 0
+            for k, length in enumerate(runs):
+                if k == len(groups):
+                    groups.append([])
+                groups[k].append((tape, start, length))
+                start += length
+        return groups
+
+    def _remove_tapes(self):
+        """Elimina los archivos de las cintas actuales"""
+        for tape in self.tapes:
+            if os.path.exists(tape):
+                os.remove(tape)
+
+    def _merge_to_tape(self, sources: List, output: IO) -> int:
+        """
+        Fusiona varias corridas de entrada (iteradores de bloques) en una sola
+        corrida de la cinta de salida con el motor de fusión por bloques (con
+        limit, sólo sus primeros limit registros). Devuelve el número de
+        registros escritos.
+        """
+        with NumberWriter(output, BINARY, self.write_block_records, self._codec) as outfile:
+            return merge_into(sources, outfile, self.limit)
 
     def _cleanup(self):
         """Limpia archivos temporales"""
@@ -184,19 +354,20 @@ if __name__ == "__main__":
     
     # Generar datos de prueba si no existen
     if not os.path.exists(input_file):
-        import random
+        from test_data import write_numbers_file
         print("Generando archivo de entrada con datos aleatorios...")
-        with open(input_file, 'w') as f:
-            for _ in range(100000):  # 100,000 números aleatorios
-                f.write(f"{random.randint(1, 1000000)}\n")
+        # 100,000 números aleatorios entre 1 y 1,000,000, generados por bloques
+        write_numbers_file(input_file, 100000, 'uniform', seed=None, low=1, high=1000001)
     
     print("Iniciando ordenamiento externo...")
     sorter = ExternalSort(
         input_file=input_file,
         output_file=output_file,
         block_size=5000,  # Tamaño de bloque (elementos en memoria)
-        num_tapes=3       # Número de cintas para distribución
+        num_tapes=3,      # Número de cintas para distribución
+        run_strategy="replacement"  # Selección por reemplazo ('chunk' para bloques fijos)
     )
     sorter.sort()
+    print(sorter.run_stats)
     
     print(f"Ordenamiento completado. Resultado guardado en {output_file}")
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Eliminación de duplicados y conteo por valor durante el ordenamiento externo.
+
+En lugar de ordenar todo y recorrer después la salida, los duplicados se
+combinan en cuanto se encuentran (como un combiner de MapReduce):
+
+- Al generar las corridas iniciales se acumulan los valores distintos en
+  memoria (un set, o un Counter en modo 'count') y sólo se escribe una
+  corrida cuando hay chunk_size valores distintos. Una entrada con muchas
+  repeticiones produce pocas corridas, y mucho más cortas.
+- En cada fusión los valores iguales de distintas corridas se combinan de
+  nuevo, así que las pasadas siguientes leen y escriben menos registros.
+
+Modos:
+
+- 'unique': las corridas y la salida son los valores distintos, en orden.
+- 'count': las corridas guardan pares (valor, repeticiones) intercalados como
+  dos enteros de 64 bits. La salida de texto tiene una línea 'valor,cantidad'
+  por valor; la binaria, los pares intercalados.
+"""
+import heapq
+import os
+from array import array
+from collections import Counter
+from itertools import chain, groupby
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import buffered_io
+from merge_engine import merge_blocks
+from run_files import (BINARY, TEXT, TYPECODE, NumberWriter, check_format, iter_chunks,
+                       iter_run, iter_run_blocks, move_run)
+
+UNIQUE = 'unique'
+COUNT = 'count'
+MODES = (UNIQUE, COUNT)
+
+
+def check_mode(mode: Optional[str]):
+    """Valida el nombre de un modo de agregación (None para ordenar sin agregar)."""
+    if mode is not None and mode not in MODES:
+        raise ValueError(f"Modo de agregación desconocido '{mode}'. Use uno de: {', '.join(MODES)}")
+
+
+def _write_combined(path: str, combined, mode: str, codec) -> int:
+    """Escribe los valores distintos acumulados como corrida ordenada. Devuelve sus entradas."""
+    if mode == COUNT:
+        block = array(TYPECODE, chain.from_iterable(sorted(combined.items())))
+    else:
+        block = array(TYPECODE, sorted(combined))
+    with NumberWriter(path, BINARY, codec=codec) as writer:
+        writer.write_many(block)
+    return len(combined)
+
+
+def combine_runs(blocks: Iterable[Sequence[int]], max_keys: int, mode: str,
+                 run_path: Callable[[int], str], codec=None) -> Tuple[List[str], int, int]:
+    """
+    Genera corridas iniciales combinando los duplicados en memoria.
+
+    Args:
+        blocks: Bloques de enteros de la entrada
+        max_keys: Valores distintos que se acumulan antes de escribir una corrida
+        mode: 'unique' o 'count'
+        run_path: Función que da la ruta de la corrida número i
+        codec: Compresión de las corridas (ver run_codecs.py)
+
+    Returns:
+        (rutas de las corridas, registros leídos de la entrada, entradas escritas)
+    """
+    check_mode(mode)
+    runs = []
+    read = written = 0
+    combined = Counter() if mode == COUNT else set()
+    # Se agrega por trozos de max_keys para no pasarse mucho del límite con un bloque grande
+    for chunk in iter_chunks(blocks, max_keys):
+        read += len(chunk)
+        combined.update(chunk)
+        if len(combined) >= max_keys:
+            runs.append(run_path(len(runs)))
+            written += _write_combined(runs[-1], combined, mode, codec)
+            combined.clear()
+    if combined:
+        runs.append(run_path(len(runs)))
+        written += _write_combined(runs[-1], combined, mode, codec)
+    return runs, read, written
+
+
+def iter_counts(path: str, read_block: Optional[int] = None, codec=None) -> Iterator[Tuple[int, int]]:
+    """Itera sobre los pares (valor, repeticiones) de una corrida en modo 'count'."""
+    records = iter_run(path, read_block, codec)
+    return zip(records, records)
+
+
+def _unique_blocks(blocks: Iterable[Sequence[int]]) -> Iterator[List[int]]:
+    """Quita los repetidos de una secuencia ordenada de bloques, también entre bloques."""
+    last = None
+    for block in blocks:
+        values = [value for value, _ in groupby(block)]
+        if values and values[0] == last:
+            del values[0]
+        if values:
+            last = values[-1]
+            yield values
+
+
+def _sum_counts(pairs: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+    """Suma las repeticiones de pares consecutivos con el mismo valor."""
+    for value, group in groupby(pairs, key=itemgetter(0)):
+        yield value, sum(map(itemgetter(1), group))
+
+
+def merge_combined(paths: Sequence[str], writer: NumberWriter, mode: str,
+                   read_block: Optional[int] = None, codec=None) -> int:
+    """
+    Fusiona corridas combinadas en writer, volviendo a combinar los valores
+    repetidos entre corridas. Devuelve las entradas escritas (valores distintos).
+    """
+    check_mode(mode)
+    if mode == UNIQUE:
+        written = 0
+        for block in _unique_blocks(merge_blocks([iter_run_blocks(path, read_block, codec)
+                                                  for path in paths])):
+            writer.write_many(block)
+            written += len(block)
+        return written
+    before = writer.count
+    merged = heapq.merge(*(iter_counts(path, read_block, codec) for path in paths))
+    writer.write_many(chain.from_iterable(_sum_counts(merged)))
+    writer.flush()
+    return (writer.count - before) // 2
+
+
+def write_combined_output(src: str, dst: str, mode: str, fmt: str = TEXT, codec=None):
+    """
+    Mueve la corrida combinada final al destino. En modo 'count' con salida de
+    texto cada par se escribe como una línea 'valor,cantidad'.
+    """
+    check_mode(mode)
+    check_format(fmt)
+    if mode == UNIQUE or fmt == BINARY:
+        move_run(src, dst, fmt, codec)
+        return
+    with open(dst, 'w', buffering=buffered_io.settings.buffer_bytes) as out:
+        out.writelines(f"{value},{count}\n" for value, count in iter_counts(src, codec=codec))
+    os.remove(src)
@@ -0,0 +1,118 @@
+"""
+Manifiesto de avance para reanudar ordenamientos externos largos.
+
+Después de generar las corridas iniciales y al terminar cada pasada (o fase)
+de fusión, el ordenamiento guarda en su directorio temporal un manifiesto
+JSON con la etapa alcanzada, los archivos que la forman y los datos que
+necesita para continuar. Si el proceso muere, al volver a ejecutarlo con
+resume=True se continúa desde la última etapa terminada en lugar de empezar
+de cero.
+
+Cada archivo del manifiesto lleva su tamaño y su CRC-32: al reanudar se
+comprueban, y si alguno falta o está incompleto (una escritura cortada a
+medias) el manifiesto se descarta y el trabajo empieza desde el principio.
+El manifiesto sólo se acepta para el mismo trabajo: misma entrada (ruta,
+tamaño y fecha de modificación) y mismos parámetros.
+
+El manifiesto se escribe en un archivo aparte y se renombra encima del
+anterior, así que nunca queda a medio escribir. También lista los archivos
+de la etapa anterior que la nueva reemplaza: el ordenamiento los borra justo
+después de guardar, y si el proceso muere entre ambos pasos se borran al
+reanudar, para que no queden para siempre en el directorio del trabajo.
+"""
+import json
+import os
+import zlib
+from typing import List, Optional, Sequence
+
+import buffered_io
+
+MANIFEST_NAME = 'manifest.json'
+VERSION = 1
+
+
+def file_checksum(path: str) -> int:
+    """CRC-32 del contenido de un archivo."""
+    crc = 0
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(buffered_io.settings.buffer_bytes)
+            if not data:
+                return crc
+            crc = zlib.crc32(data, crc)
+
+
+def input_identity(path: str) -> dict:
+    """Datos que identifican una versión concreta del archivo de entrada."""
+    st = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+class Checkpoint:
+    """Manifiesto de avance de un trabajo, guardado en su directorio temporal."""
+
+    def __init__(self, directory: str, job: dict):
+        """
+        Args:
+            directory: Directorio temporal del trabajo
+            job: Parámetros que identifican el trabajo (entrada y opciones que
+                 cambian el contenido de los archivos temporales)
+        """
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.job = job
+
+    def load(self) -> Optional[dict]:
+        """
+        Devuelve el estado guardado si corresponde a este trabajo y todos sus
+        archivos están intactos, o None para empezar de cero.
+        """
+        try:
+            with open(self.path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != VERSION or manifest.get('job') != self.job:
+            print("El manifiesto pertenece a otro trabajo o a otra versión de la entrada; se empieza de cero.")
+            return None
+        for entry in manifest['files']:
+            path = entry['path']
+            if (not os.path.exists(path) or os.path.getsize(path) != entry['size']
+                    or file_checksum(path) != entry['crc32']):
+                print(f"El archivo temporal '{path}' falta o está dañado; se empieza de cero.")
+                return None
+        listed = {entry['path'] for entry in manifest['files']}
+        for path in manifest.get('superseded', []):
+            if path not in listed and os.path.exists(path):
+                os.remove(path)
+        return manifest['state']
+
+    def save(self, files: List[str], state: dict, superseded: Sequence[str] = ()):
+        """
+        Registra una etapa terminada.
+
+        Args:
+            files: Archivos temporales que forman la etapa (se guardan su tamaño y CRC-32)
+            state: Datos (serializables en JSON) necesarios para continuar
+            superseded: Archivos de la etapa anterior que ya no hacen falta; el
+                        llamador los borra después, y load() si quedaron
+        """
+        manifest = {
+            'version': VERSION,
+            'job': self.job,
+            'files': [{'path': path, 'size': os.path.getsize(path), 'crc32': file_checksum(path)}
+                      for path in files],
+            'state': state,
+            'superseded': list(superseded),
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Elimina el manifiesto (al terminar el trabajo o al empezarlo de cero)."""
+        for path in (self.path, self.path + '.tmp'):
+            if os.path.exists(path):
+                os.remove(path)
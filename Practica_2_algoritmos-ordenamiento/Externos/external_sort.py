@@ -0,0 +1,362 @@
+"""
+Punto de entrada único, como biblioteca y como programa, para los
+ordenamientos externos de esta carpeta.
+
+    external_sort('datos.txt', 'ordenado.txt', method='balanced', num_ways=8)
+
+    python external_sort.py datos.txt -o ordenado.txt --method polyphase
+    generar | python external_sort.py --memory 256M --temp-dir /mnt/nvme > ordenado.txt
+
+El método de fusión ('straight', 'natural', 'balanced', 'polyphase' o
+'distribution') elige cuál de los scripts 000N se usa, y run_strategy la
+generación de corridas iniciales ('chunk' o 'replacement') en los métodos que
+la admiten. Cada trabajo crea su propio directorio temporal privado (ver
+tempfile.mkdtemp) dentro de temp_dir, o del directorio temporal del sistema
+(TMPDIR), y lo borra al terminar, de modo que varios trabajos pueden correr
+a la vez en la misma carpeta. La entrada '-' se lee de stdin y la salida '-'
+se escribe en stdout; como los métodos recorren la entrada más de una vez,
+stdin se guarda primero en el directorio temporal.
+
+Con work_dir el trabajo usa ese directorio en lugar de uno temporal y no lo
+borra si falla: con resume=True una nueva ejecución continúa desde la última
+pasada terminada (métodos 'balanced' y 'distribution', ver checkpoint.py).
+
+Con keys (una o más columnas) la entrada se trata como registros CSV/TSV que
+se ordenan completos por esas columnas (ver record_sort.py); en ese modo sólo
+se admite el método 'balanced' y el formato de texto.
+
+Con codec las corridas temporales se comprimen (ver run_codecs.py) en los
+métodos 'balanced', 'polyphase' y 'distribution', sin procesos paralelos.
+
+Con aggregate='unique' la salida tiene cada valor una sola vez, y con
+aggregate='count' una línea 'valor,cantidad' por valor distinto; los
+repetidos se combinan ya al crear las corridas y en cada fusión (ver
+aggregation.py). Sólo con el método 'balanced'.
+
+Con limit=N sólo se escriben los N primeros valores de la salida ordenada
+(métodos 'balanced' y 'distribution'), o con largest=True los N mayores en
+orden descendente. Si N cabe en memoria (N <= chunk_size, o el chunk_size
+que el planificador elige con memory_budget) basta una lectura de la entrada
+con O(N) de memoria (ver top_k.py). Si no, el método corta cada fusión a N
+registros; con largest ordena la entrada completa y copia al revés los N
+últimos valores.
+"""
+import argparse
+import contextlib
+import importlib.util
+import os
+import re
+import shutil
+import sys
+import tempfile
+from typing import Optional, Sequence
+
+import buffered_io
+from aggregation import COUNT, UNIQUE, check_mode
+from record_sort import KeySpec, record_sort
+from run_codecs import CODECS, get_codec
+from merge_plan import estimate_records, plan_merge
+from run_files import BINARY, FORMATS, TEXT, check_format
+from run_generation import CHUNK, STRATEGIES, get_strategy
+from top_k import top_k, write_largest
+
+STRAIGHT = 'straight'
+NATURAL = 'natural'
+BALANCED = 'balanced'
+POLYPHASE = 'polyphase'
+DISTRIBUTION = 'distribution'
+
+# Script que implementa cada método
+METHOD_SCRIPTS = {
+    STRAIGHT: '0001_Straight merging.py',
+    NATURAL: '0002_Natural merging.py',
+    BALANCED: '0003_Balanced_multiway_merging.py',
+    POLYPHASE: '0004_Polyphase_sort.py',
+    DISTRIBUTION: '0005_Distribution_of_initial_runs.py',
+}
+METHODS = tuple(METHOD_SCRIPTS)
+
+# Métodos que admiten otras estrategias de corridas, presupuesto de memoria y procesos
+PLANNED_METHODS = (BALANCED, DISTRIBUTION)
+# Métodos que admiten corridas temporales comprimidas
+CODEC_METHODS = (BALANCED, POLYPHASE, DISTRIBUTION)
+# Métodos que admiten limit: cortan cada fusión a limit registros
+LIMIT_METHODS = (BALANCED, DISTRIBUTION)
+
+STDIO = '-'
+SIZE_SUFFIXES = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+_scripts = {}
+
+
+def load_script(filename: str):
+    """
+    Carga (una sola vez) un script de esta carpeta por nombre de archivo. Los
+    scripts numerados no pueden importarse con import porque su nombre no es
+    un identificador válido.
+    """
+    if filename not in _scripts:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        name = '_' + re.sub(r'\W', '_', os.path.splitext(filename)[0])
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _scripts[filename] = module
+    return _scripts[filename]
+
+
+def _run_method(method: str, input_path: str, output_path: str, job_dir: str, options: dict):
+    """Llama al ordenamiento del método elegido con las opciones que admite."""
+    script = load_script(METHOD_SCRIPTS[method])
+    common = dict(input_format=options['input_format'], output_format=options['output_format'])
+    if method in CODEC_METHODS:
+        common['codec'] = options['codec']
+    if options['aggregate'] is not None:
+        common['aggregate'] = options['aggregate']
+    if options['limit'] is not None:
+        common['limit'] = options['limit']
+    if method == STRAIGHT:
+        return script.straight_merge_sort(input_path, output_path, block_size=options['chunk_size'],
+                                          num_ways=options['num_ways'], temp_dir=job_dir, **common)
+    if method == NATURAL:
+        return script.natural_merge_sort(input_path, output_path, num_ways=options['num_ways'],
+                                         temp_dir=job_dir, **common)
+    if method == POLYPHASE:
+        # num_ways entradas más la cinta de salida
+        return script.polyphase_merge_sort(input_path, output_path, num_tapes=options['num_ways'] + 1,
+                                           chunk_size=options['chunk_size'], temp_dir=job_dir, **common)
+    planned = dict(memory_budget=options['memory_budget'], workers=options['workers'],
+                   merge_workers=options['merge_workers'], run_strategy=options['run_strategy'],
+                   resume=options['resume'])
+    if method == BALANCED:
+        return script.balanced_multiway_merge_sort(input_path, output_path, num_ways=options['num_ways'],
+                                                   chunk_size=options['chunk_size'], temp_dir=job_dir,
+                                                   **common, **planned)
+    sorter = script.ExternalSort(input_path, output_path, temp_dir=os.path.join(job_dir, 'tapes'),
+                                 block_size=options['chunk_size'], num_tapes=options['num_ways'],
+                                 **common, **planned)
+    sorter.sort()
+    return sorter.run_stats
+
+
+def external_sort(input_path: Optional[str], output_path: Optional[str], method: str = BALANCED,
+                  run_strategy: str = CHUNK, input_format: str = TEXT, output_format: str = TEXT,
+                  chunk_size: int = 100000, num_ways: int = 4, memory_budget: Optional[int] = None,
+                  workers: Optional[int] = None, merge_workers: Optional[int] = None,
+                  temp_dir: Optional[str] = None, verbose: bool = False,
+                  keys: Optional[Sequence[KeySpec]] = None, delimiter: str = ',', header: bool = False,
+                  work_dir: Optional[str] = None, resume: bool = False, codec: Optional[str] = None,
+                  aggregate: Optional[str] = None, limit: Optional[int] = None, largest: bool = False):
+    """
+    Ordena un archivo de enteros con el método externo elegido.
+
+    Args:
+        input_path: Archivo de entrada, o '-' / None para leer de stdin
+        output_path: Archivo de salida, o '-' / None para escribir en stdout
+        method: 'straight', 'natural', 'balanced', 'polyphase' o 'distribution'
+        run_strategy: 'chunk' o 'replacement' (sólo 'balanced' y 'distribution')
+        input_format, output_format: 'text' o 'binary'
+        chunk_size: Elementos que se ordenan en memoria por corrida inicial
+        num_ways: Archivos (o cintas) de entrada de cada fusión
+        memory_budget: Memoria en bytes para todo el ordenamiento (se reparte
+                       entre workers/merge_workers); el planificador elige
+                       chunk_size y num_ways (sólo 'balanced' y 'distribution')
+        workers, merge_workers: Procesos para generar corridas y para fusionar
+                                (sólo 'balanced' y 'distribution')
+        temp_dir: Volumen donde se crea el directorio temporal del trabajo
+                  (por defecto, el directorio temporal del sistema)
+        verbose: Muestra el progreso de los métodos en stderr
+        keys: Columnas de la clave para ordenar registros CSV/TSV completos
+        delimiter: Separador de columnas de los registros
+        header: Si la primera línea de los registros es una cabecera
+        work_dir: Directorio de trabajo fijo (se conserva si el trabajo falla)
+        resume: Continúa el trabajo interrumpido que quedó en work_dir
+        codec: Compresión de las corridas temporales: 'none', 'zlib', 'lzma',
+               'bz2' o 'delta' ('balanced', 'polyphase' y 'distribution', sin procesos)
+        aggregate: 'unique' para quitar los repetidos o 'count' para contarlos
+                   (sólo 'balanced', corridas 'chunk' y sin procesos)
+        limit: Escribe sólo los limit primeros valores de la salida ordenada
+        largest: Con limit, escribe los limit mayores en orden descendente
+
+    Returns:
+        Las estadísticas que devuelve el método elegido
+    """
+    if method not in METHOD_SCRIPTS:
+        raise ValueError(f"Método desconocido '{method}'. Use uno de: {', '.join(METHODS)}")
+    check_format(input_format)
+    check_format(output_format)
+    get_strategy(run_strategy)
+    if method not in PLANNED_METHODS:
+        if run_strategy != CHUNK or memory_budget is not None or workers or merge_workers:
+            raise ValueError(f"El método '{method}' no admite run_strategy, memory_budget ni "
+                             f"procesos; use uno de: {', '.join(PLANNED_METHODS)}")
+    if num_ways < 2:
+        raise ValueError("num_ways debe ser al menos 2")
+    if get_codec(codec) is not None and (method not in CODEC_METHODS or keys or workers or merge_workers):
+        raise ValueError("La compresión de corridas sólo se admite con los métodos "
+                         f"{', '.join(CODEC_METHODS)}, sin claves de columna ni procesos paralelos")
+    check_mode(aggregate)
+    if aggregate is not None and (method != BALANCED or keys or run_strategy != CHUNK
+                                  or workers or merge_workers):
+        raise ValueError("aggregate sólo se admite con el método 'balanced', corridas 'chunk' "
+                         "y sin claves de columna ni procesos paralelos")
+    if limit is not None and (limit < 0 or method not in LIMIT_METHODS or keys or aggregate or merge_workers):
+        raise ValueError(f"limit debe ser >= 0 y sólo se admite con los métodos {', '.join(LIMIT_METHODS)}, "
+                         "sin claves de columna, aggregate ni merge_workers")
+    if largest and limit is None:
+        raise ValueError("largest necesita limit")
+    if keys and (method != BALANCED or input_format != TEXT or output_format != TEXT
+                 or run_strategy != CHUNK or workers or merge_workers):
+        raise ValueError("El ordenamiento por columnas sólo admite el método 'balanced', "
+                         "formato de texto y corridas 'chunk' en un solo proceso")
+    from_stdin = input_path in (None, STDIO)
+    to_stdout = output_path in (None, STDIO)
+    if not from_stdin and not os.path.exists(input_path):
+        raise FileNotFoundError(f"No se encontró el archivo de entrada '{input_path}'")
+    if resume and (work_dir is None or from_stdin or keys or method not in PLANNED_METHODS):
+        raise ValueError("resume necesita work_dir, una entrada en archivo y el método "
+                         f"{' o '.join(repr(m) for m in PLANNED_METHODS)}")
+
+    options = dict(run_strategy=run_strategy, input_format=input_format, output_format=output_format,
+                   chunk_size=chunk_size, num_ways=num_ways, memory_budget=memory_budget,
+                   workers=workers, merge_workers=merge_workers, resume=resume, codec=codec,
+                   aggregate=aggregate, limit=limit)
+    if work_dir is not None:
+        os.makedirs(work_dir, exist_ok=True)
+        job_dir = work_dir
+    else:
+        job_dir = tempfile.mkdtemp(prefix='external_sort_', dir=temp_dir)
+    try:
+        if from_stdin:
+            input_path = os.path.join(job_dir, 'stdin')
+            with open(input_path, 'wb') as spool:
+                shutil.copyfileobj(sys.stdin.buffer, spool, buffered_io.settings.buffer_bytes)
+        sorted_path = os.path.join(job_dir, 'output') if to_stdout else output_path
+        # Los métodos informan su progreso con print(): nunca debe mezclarse con
+        # la salida ordenada cuando ésta va a stdout
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.redirect_stdout(sys.stderr if verbose else devnull):
+            if keys:
+                # Los registros sin clave válida se descartan con un aviso, como
+                # las líneas no válidas en los métodos de enteros
+                stats = record_sort(input_path, sorted_path, keys, delimiter, header, chunk_size,
+                                    num_ways, memory_budget, job_dir,
+                                    lambda line_num, text: print(
+                                        f"Advertencia: Saltando línea {line_num} sin clave válida: '{text}'"))
+            elif limit is not None and limit <= _memory_records(input_path, options):
+                # Los limit valores caben en memoria: una sola lectura con un top-K acotado
+                stats = top_k(input_path, sorted_path, limit, largest, input_format, output_format,
+                              lambda text: print(f"Advertencia: Saltando línea no válida: '{text}'"))
+            elif largest:
+                # Los limit mayores no caben en memoria: se ordena todo en binario
+                # y se copian al revés los últimos limit valores
+                ascending_path = os.path.join(job_dir, 'largest')
+                stats = _run_method(method, input_path, ascending_path, job_dir,
+                                    dict(options, limit=None, output_format=BINARY))
+                if stats is not None and os.path.exists(ascending_path):
+                    stats = write_largest(ascending_path, sorted_path, limit, output_format)
+                    os.remove(ascending_path)
+            else:
+                stats = _run_method(method, input_path, sorted_path, job_dir, options)
+        if stats is None or not os.path.exists(sorted_path):
+            raise RuntimeError(f"El método '{method}' no produjo el archivo de salida")
+        if to_stdout:
+            with open(sorted_path, 'rb') as result:
+                shutil.copyfileobj(result, sys.stdout.buffer, buffered_io.settings.buffer_bytes)
+            sys.stdout.buffer.flush()
+        return stats
+    finally:
+        if work_dir is None:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        else:
+            # En un directorio de trabajo fijo sólo se borran los archivos propios;
+            # los temporales de los métodos los gestiona su manifiesto
+            for path in (os.path.join(job_dir, name) for name in ('stdin', 'output', 'largest')):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def _memory_records(input_path: str, options: dict) -> int:
+    """
+    Registros que caben en memoria: chunk_size, o el que elige el planificador
+    si hay presupuesto de memoria (el mismo que usará el método).
+    """
+    if options['memory_budget'] is None:
+        return options['chunk_size']
+    records = estimate_records(input_path, options['input_format'])
+    return plan_merge(options['memory_budget'], records, workers=options['workers'] or 1,
+                      merge_workers=options['merge_workers'] or 1).chunk_size
+
+
+def parse_size(text: str) -> int:
+    """Convierte un tamaño como '512K', '64M' o '2G' a bytes."""
+    match = re.fullmatch(r'\s*(\d+)\s*([KMG]?)B?\s*', text.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Tamaño no válido: '{text}'")
+    return int(match.group(1)) * SIZE_SUFFIXES[match.group(2)]
+
+
+def parse_key(text: str) -> KeySpec:
+    """Convierte una opción --key en KeySpec con un error legible para argparse."""
+    try:
+        return KeySpec.parse(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Ordenamiento externo de enteros (uno por línea o binarios de 64 bits).")
+    parser.add_argument('input', nargs='?', default=STDIO, help="Archivo de entrada ('-' para stdin)")
+    parser.add_argument('-o', '--output', default=STDIO, help="Archivo de salida ('-' para stdout)")
+    parser.add_argument('-m', '--method', choices=METHODS, default=BALANCED, help="Método de fusión")
+    parser.add_argument('-r', '--runs', choices=tuple(STRATEGIES), default=CHUNK,
+                        help="Generación de corridas iniciales")
+    parser.add_argument('--input-format', choices=FORMATS, default=TEXT)
+    parser.add_argument('--output-format', choices=FORMATS, default=TEXT)
+    parser.add_argument('-c', '--chunk-size', type=int, default=100000,
+                        help="Elementos ordenados en memoria por corrida")
+    parser.add_argument('-k', '--ways', type=int, default=4, help="Grado de fusión (entradas por fusión)")
+    parser.add_argument('--memory', type=parse_size, help="Presupuesto de memoria total (para todos los procesos), p. ej. 256M")
+    parser.add_argument('-j', '--workers', type=int, help="Procesos para generar corridas")
+    parser.add_argument('--merge-workers', type=int, help="Procesos para fusionar")
+    parser.add_argument('-T', '--temp-dir', help="Volumen para los archivos temporales")
+    parser.add_argument('--codec', choices=tuple(CODECS), help="Compresión de las corridas temporales")
+    aggregate = parser.add_mutually_exclusive_group()
+    aggregate.add_argument('-u', '--unique', action='store_const', const=UNIQUE, dest='aggregate',
+                           help="Escribe cada valor una sola vez")
+    aggregate.add_argument('--count', action='store_const', const=COUNT, dest='aggregate',
+                           help="Escribe 'valor,cantidad' por cada valor distinto")
+    parser.add_argument('-n', '--limit', type=int, help="Escribe sólo los N primeros valores ordenados")
+    parser.add_argument('--largest', action='store_true',
+                        help="Con --limit, los N mayores valores en orden descendente")
+    parser.add_argument('--io-preset', choices=tuple(buffered_io.PRESETS), help="Perfil de disco")
+    parser.add_argument('--buffer-size', type=parse_size, help="Tamaño de los bloques de E/S")
+    parser.add_argument('-K', '--key', action='append', type=parse_key, dest='keys',
+                        help="Columna de la clave para registros CSV/TSV: 'columna[:str|int|float][:asc|desc]' "
+                             "(columnas desde 0; se puede repetir)")
+    parser.add_argument('-d', '--delimiter', default=',', help="Separador de columnas ('\\t' o 'tab' para TSV)")
+    parser.add_argument('--header', action='store_true', help="La primera línea es una cabecera")
+    parser.add_argument('-W', '--work-dir', help="Directorio de trabajo fijo, que se conserva si el trabajo falla")
+    parser.add_argument('--resume', action='store_true', help="Continúa el trabajo interrumpido en --work-dir")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Muestra el progreso en stderr")
+    args = parser.parse_args(argv)
+
+    buffered_io.configure(buffer_bytes=args.buffer_size, preset=args.io_preset)
+    delimiter = '\t' if args.delimiter in ('\\t', 'tab') else args.delimiter
+    try:
+        external_sort(args.input, args.output, method=args.method, run_strategy=args.runs,
+                      input_format=args.input_format, output_format=args.output_format,
+                      chunk_size=args.chunk_size, num_ways=args.ways, memory_budget=args.memory,
+                      workers=args.workers, merge_workers=args.merge_workers,
+                      temp_dir=args.temp_dir, verbose=args.verbose,
+                      keys=args.keys, delimiter=delimiter, header=args.header,
+                      work_dir=args.work_dir, resume=args.resume, codec=args.codec,
+                      aggregate=args.aggregate, limit=args.limit, largest=args.largest)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Motor de fusión K-way compartido por los ordenamientos externos multivía.
+
+En lugar de sacar y meter en un heap una tupla (valor, índice) por cada
+registro, las entradas se consumen por bloques ya ordenados. En cada ronda se
+toma como corte el menor de los últimos elementos de los bloques actuales:
+todo lo que sea <= corte puede emitirse ya, porque ninguna entrada tiene
+pendiente un valor menor (las entradas posteriores a la que fija el corte
+sólo emiten lo estrictamente menor, para que los empates salgan en el orden
+de las entradas). Los prefijos de cada bloque hasta el corte se
+localizan con bisect y se fusionan con list.sort(), que reconoce las corridas
+ya ordenadas y las mezcla en C con O(log K) comparaciones por registro.
+
+Cada ronda agota por completo al menos un bloque, así que el número de rondas
+está acotado por el número total de bloques leídos. Como los prefijos se
+concatenan en el orden de las entradas y list.sort() es estable, la fusión
+también lo es: ante valores iguales sale primero el de la entrada de menor
+índice.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, Optional, Sequence
+
+from run_files import NumberWriter
+
+
+def merge_blocks(sources: Iterable[Iterator[Sequence[int]]]) -> Iterator[Sequence[int]]:
+    """
+    Fusiona K entradas ordenadas, cada una dada como un iterador de bloques.
+
+    Args:
+        sources: Iteradores que producen bloques (array o list) ordenados; la
+                 concatenación de los bloques de cada iterador debe estar ordenada
+
+    Yields:
+        Bloques ordenados cuya concatenación es la fusión de todas las entradas
+    """
+    blocks = []
+    positions = []
+    feeds = []
+    for source in sources:
+        block = _next_block(source)
+        if block is not None:
+            blocks.append(block)
+            positions.append(0)
+            feeds.append(source)
+
+    while blocks:
+        if len(blocks) == 1:
+            # Una sola entrada: se copia el resto sin comparar
+            yield blocks[0][positions[0]:]
+            for block in feeds[0]:
+                if block:
+                    yield block
+            return
+
+        # La entrada de menor índice con el menor último elemento fija el corte
+        cut_idx = min(range(len(blocks)), key=lambda k: blocks[k][-1])
+        cut = blocks[cut_idx][-1]
+        out = []
+        alive = []
+        for i, block in enumerate(blocks):
+            start = positions[i]
+            if i <= cut_idx:
+                end = bisect_right(block, cut, start)
+            else:
+                end = bisect_left(block, cut, start)
+            if end > start:
+                out.extend(block[start:end])
+            if end < len(block):
+                positions[i] = end
+                alive.append(i)
+                continue
+            block = _next_block(feeds[i])
+            if block is not None:
+                blocks[i] = block
+                positions[i] = 0
+                alive.append(i)
+        if len(alive) < len(blocks):
+            blocks = [blocks[i] for i in alive]
+            positions = [positions[i] for i in alive]
+            feeds = [feeds[i] for i in alive]
+        out.sort()
+        yield out
+
+
+def merge_into(sources: Iterable[Iterator[Sequence[int]]], writer: NumberWriter,
+               limit: Optional[int] = None) -> int:
+    """
+    Fusiona las entradas (iteradores de bloques) y las escribe en writer.
+    Con limit se detiene en cuanto ha escrito esos registros, sin leer el
+    resto de las entradas. Devuelve los registros escritos.
+    """
+    written = 0
+    for block in merge_blocks(sources):
+        if limit is not None and written + len(block) >= limit:
+            writer.write_many(block[:limit - written])
+            return limit
+        writer.write_many(block)
+        written += len(block)
+    return written
+
+
+def _next_block(source: Iterator[Sequence[int]]):
+    """Siguiente bloque no vacío de una entrada, o None si se agotó."""
+    for block in source:
+        if block:
+            return block
+    return None
@@ -0,0 +1,148 @@
+"""
+Planificación de la fusión a partir de un presupuesto de memoria.
+
+En lugar de fijar a mano chunk_size/block_size y num_ways/num_tapes, el plan
+se calcula con el presupuesto de memoria en bytes y el límite de archivos
+abiertos: se elige el tamaño de las corridas iniciales que cabe en memoria,
+el mayor grado de fusión (fan-in) que permiten los archivos y los búferes de
+lectura, y con ello el menor número de pasadas posible; idealmente una sola
+fusión final.
+
+El presupuesto es el total del ordenamiento, no el de cada proceso: con
+workers procesos generando corridas a la vez, cada uno ordena corridas de
+chunk_size registros, así que chunk_size se calcula con memory_budget /
+workers; con merge_workers procesos fusionando a la vez, los búferes de
+lectura y escritura de cada uno se reparten memory_budget / merge_workers.
+"""
+import math
+import os
+from typing import Optional
+
+from run_files import BINARY, RECORD_SIZE, check_format
+
+# Bytes aproximados que ocupa en memoria un entero dentro de una lista de Python
+# (objeto int más el puntero de la lista). Se usa al ordenar corridas en memoria.
+SORT_RECORD_MEMORY = 40
+# Bytes por registro en vuelo durante la fusión: el bloque leído (array de 8
+# bytes por registro) más la lista de la ronda de fusión (ver merge_engine.py).
+MERGE_RECORD_MEMORY = RECORD_SIZE + SORT_RECORD_MEMORY
+# Límites del búfer de lectura por entrada, en registros
+MIN_READ_BLOCK_RECORDS = 4 * 1024
+MAX_READ_BLOCK_RECORDS = 1024 * 1024
+# Archivos que se reservan para la salida, la entrada y el propio intérprete
+RESERVED_FILES = 16
+DEFAULT_MAX_OPEN_FILES = 512
+TEXT_SAMPLE_BYTES = 64 * 1024
+
+
+def default_max_open_files() -> int:
+    """Límite de archivos abiertos del proceso (RLIMIT_NOFILE), menos una reserva."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return DEFAULT_MAX_OPEN_FILES
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return DEFAULT_MAX_OPEN_FILES * 8
+    return max(3, soft - RESERVED_FILES)
+
+
+def estimate_records(path: str, fmt: str) -> int:
+    """
+    Estima el número de registros de un archivo de entrada.
+    En binario es exacto; en texto se extrapola la longitud media de línea de
+    los primeros TEXT_SAMPLE_BYTES bytes.
+    """
+    check_format(fmt)
+    size = os.path.getsize(path)
+    if fmt == BINARY:
+        return size // RECORD_SIZE
+    with open(path, 'rb') as f:
+        sample = f.read(TEXT_SAMPLE_BYTES)
+    lines = sample.count(b'\n')
+    if not lines:
+        return 1 if size else 0
+    return math.ceil(size * lines / len(sample))
+
+
+class MergePlan:
+    """Parámetros elegidos para un ordenamiento externo."""
+
+    def __init__(self, memory_budget: int, max_open_files: int, records: int,
+                 chunk_size: int, fan_in: int, read_block_records: int,
+                 write_block_records: int, estimated_runs: int, passes: int,
+                 workers: int = 1, merge_workers: int = 1):
+        self.memory_budget = memory_budget
+        self.max_open_files = max_open_files
+        self.records = records
+        self.chunk_size = chunk_size
+        self.fan_in = fan_in
+        self.read_block_records = read_block_records
+        self.write_block_records = write_block_records
+        self.estimated_runs = estimated_runs
+        self.passes = passes
+        self.workers = workers
+        self.merge_workers = merge_workers
+
+    def __str__(self):
+        processes = ''
+        if self.workers > 1 or self.merge_workers > 1:
+            processes = (f"  Procesos: {self.workers} generando corridas, {self.merge_workers} fusionando "
+                         f"(el presupuesto se reparte entre ellos)\n")
+        return (f"Plan de fusión: memoria {self.memory_budget} bytes, hasta {self.max_open_files} archivos abiertos\n"
+                f"{processes}"
+                f"  Registros estimados: {self.records}\n"
+                f"  Corridas iniciales: {self.estimated_runs} de {self.chunk_size} registros\n"
+                f"  Grado de fusión (fan-in): {self.fan_in}, pasadas de fusión: {self.passes}\n"
+                f"  Búfer de lectura por entrada: {self.read_block_records} registros "
+                f"({self.read_block_records * RECORD_SIZE} bytes), "
+                f"búfer de escritura: {self.write_block_records} registros")
+
+
+def plan_merge(memory_budget: int, records: int, max_open_files: Optional[int] = None,
+               run_length_factor: float = 1.0, workers: int = 1, merge_workers: int = 1) -> MergePlan:
+    """
+    Calcula el plan de ordenamiento con menos pasadas de fusión.
+
+    Args:
+        memory_budget: Memoria disponible en bytes
+        records: Número (estimado) de registros a ordenar
+        max_open_files: Entradas que pueden estar abiertas a la vez durante una
+                        fusión (por defecto, según el límite del sistema)
+        run_length_factor: Longitud media de las corridas respecto a chunk_size
+                           (2.0 para selección por reemplazo)
+        workers: Procesos que generan corridas a la vez
+        merge_workers: Procesos que fusionan a la vez
+    """
+    if workers < 1 or merge_workers < 1:
+        raise ValueError("workers y merge_workers deben ser al menos 1")
+    if max_open_files is None:
+        max_open_files = default_max_open_files()
+    # Cada proceso de la generación tiene en memoria una corrida entera
+    chunk_size = max(1, memory_budget // (SORT_RECORD_MEMORY * workers))
+    # y cada proceso de la fusión sus búferes de lectura y escritura
+    merge_budget = memory_budget // merge_workers
+    runs = max(1, math.ceil(records / (chunk_size * run_length_factor)))
+
+    # Mayor fan-in posible: lo limitan los archivos abiertos y que cada
+    # entrada tenga al menos un búfer de lectura mínimo.
+    max_by_memory = merge_budget // (MIN_READ_BLOCK_RECORDS * MERGE_RECORD_MEMORY)
+    max_fan_in = max(2, min(max_open_files, max_by_memory))
+
+    if runs <= 1:
+        passes = 0
+        fan_in = 2
+    else:
+        passes = math.ceil(math.log(runs) / math.log(max_fan_in) - 1e-9)
+        # Con el número de pasadas fijado, el menor fan-in que lo consigue deja
+        # búferes de lectura más grandes
+        fan_in = max(2, math.ceil(runs ** (1 / passes) - 1e-9))
+        while fan_in ** passes < runs:
+            fan_in += 1
+        fan_in = min(fan_in, max_fan_in)
+
+    # Una parte de la memoria va al búfer de escritura (un bloque como los de lectura)
+    read_block = merge_budget // ((fan_in + 1) * MERGE_RECORD_MEMORY)
+    read_block = max(MIN_READ_BLOCK_RECORDS, min(MAX_READ_BLOCK_RECORDS, read_block))
+    return MergePlan(memory_budget, max_open_files, records, chunk_size, fan_in,
+                     read_block, read_block, runs, passes, workers, merge_workers)
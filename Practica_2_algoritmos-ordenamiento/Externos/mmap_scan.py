@@ -0,0 +1,139 @@
+"""
+Lectura de archivos de enteros mediante mmap, por rebanadas grandes.
+
+En lugar de iterar línea por línea con el TextIO de Python, el archivo se
+mapea en memoria y se interpreta por rebanadas de SLICE_BYTES bytes (cortadas
+siempre en un salto de línea). Cada rebanada se convierte de una vez: con
+NumPy, si está instalado, y si no con map(int, ...) sobre sus líneas. Sólo
+cuando una rebanada contiene líneas vacías, no numéricas o con enteros fuera
+del rango de 64 bits con signo (INT64_MIN..INT64_MAX, el de las corridas
+binarias) se recurre a interpretar línea por línea para poder saltarlas.
+
+Lo usan la lectura de la entrada (run_files.iter_text_numbers), la
+generación de corridas en paralelo y la verificación de archivos ordenados.
+"""
+import mmap
+import os
+from array import array
+from itertools import islice
+from operator import le
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+SLICE_BYTES = 8 * 1024 * 1024
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def _parse_lines(data: bytes, on_invalid: Optional[Callable[[str], None]]) -> list:
+    """
+    Interpreta una rebanada de texto con un entero por línea. Las líneas no
+    numéricas y los enteros fuera del rango de 64 bits se pasan a on_invalid
+    (si no es None) y se saltan.
+    """
+    lines = data.splitlines()
+    if np is not None:
+        try:
+            return np.array(lines).astype(np.int64).tolist()
+        except (ValueError, OverflowError, TypeError):
+            pass
+    else:
+        try:
+            values = list(map(int, lines))
+            if not values or (INT64_MIN <= min(values) and max(values) <= INT64_MAX):
+                return values
+        except ValueError:
+            pass
+    # Hay líneas vacías, no numéricas o fuera de rango: se interpretan una por una
+    values = []
+    for line in lines:
+        try:
+            value = int(line)
+        except ValueError:
+            text = line.strip()
+            if text and on_invalid is not None:
+                on_invalid(text.decode(errors='replace'))
+            continue
+        if INT64_MIN <= value <= INT64_MAX:
+            values.append(value)
+        elif on_invalid is not None:
+            on_invalid(f"{line.strip().decode(errors='replace')} (fuera del rango de enteros de 64 bits)")
+    return values
+
+
+def iter_text_blocks(path: str, start: int = 0, end: Optional[int] = None,
+                     on_invalid: Optional[Callable[[str], None]] = None,
+                     slice_bytes: int = SLICE_BYTES) -> Iterator[list]:
+    """
+    Itera por bloques (listas de int) sobre los enteros de un archivo de texto.
+
+    Args:
+        path: Archivo con un entero por línea
+        start, end: Rango de bytes a leer; start debe ser inicio de línea
+        on_invalid: Función a la que se pasan las líneas no numéricas o fuera
+                    del rango de 64 bits
+        slice_bytes: Tamaño aproximado de cada rebanada
+    """
+    size = os.path.getsize(path)
+    end = size if end is None else min(end, size)
+    if start >= end:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            cut = mm.find(b'\n', min(pos + slice_bytes, end) - 1, end)
+            cut = end if cut < 0 else cut + 1
+            values = _parse_lines(mm[pos:cut], on_invalid)
+            pos = cut
+            if values:
+                yield values
+
+
+def iter_binary_blocks(path: str, typecode: str, start: int = 0, end: Optional[int] = None,
+                       slice_bytes: int = SLICE_BYTES) -> Iterator[array]:
+    """Itera por bloques (array) sobre un archivo binario de registros de ancho fijo."""
+    itemsize = array(typecode).itemsize
+    size = os.path.getsize(path)
+    end = size if end is None else min(end, size)
+    end -= (end - start) % itemsize
+    if start >= end:
+        return
+    step = max(itemsize, slice_bytes - slice_bytes % itemsize)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for pos in range(start, end, step):
+            block = array(typecode)
+            block.frombytes(mm[pos:min(pos + step, end)])
+            yield block
+
+
+def first_unsorted(blocks: Iterator[Sequence[int]]) -> Optional[Tuple[int, int, int]]:
+    """
+    Busca el primer par de registros consecutivos fuera de orden.
+
+    Returns:
+        None si la secuencia está ordenada, o (posición, anterior, actual)
+        con la posición (desde 1) del primer registro menor que su anterior
+    """
+    prev = None
+    offset = 0
+    for block in blocks:
+        if not len(block):
+            continue
+        if prev is not None and block[0] < prev:
+            return offset + 1, prev, block[0]
+        if np is not None:
+            values = np.asarray(block)
+            bad = np.flatnonzero(values[1:] < values[:-1])
+            if bad.size:
+                i = int(bad[0]) + 1
+                return offset + i + 1, int(values[i - 1]), int(values[i])
+        elif not all(map(le, block, islice(block, 1, None))):
+            i = next(i for i in range(1, len(block)) if block[i] < block[i - 1])
+            return offset + i + 1, block[i - 1], block[i]
+        prev = block[-1]
+        offset += len(block)
+    return None
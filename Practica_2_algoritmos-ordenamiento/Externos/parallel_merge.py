@@ -0,0 +1,177 @@
+"""
+Fusiones en paralelo para las pasadas de los ordenamientos externos.
+
+Se trabaja con segmentos de corridas binarias: (ruta, registro_inicial,
+registros). Así sirven tanto los archivos de corrida completos de 0003 como
+las corridas que viven dentro de una cinta en 0005.
+
+- merge_groups: las fusiones independientes de una misma pasada se reparten
+  entre procesos. Cada grupo escribe en su archivo, o en una posición fija de
+  un archivo compartido (las cintas), ya que su longitud se conoce de antemano.
+- partitioned_merge: la fusión final se divide por rangos de claves. Se toman
+  muestras de las corridas para elegir P - 1 separadores; cada proceso fusiona
+  de todas las corridas sólo los registros de su rango y produce un tramo
+  disjunto de la salida. Los tramos se escriben en su posición (binario) o se
+  concatenan al final (texto).
+"""
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from merge_engine import merge_into
+from run_files import (BINARY, RECORD_SIZE, NumberWriter, check_format, count_records,
+                       default_block_records, iter_blocks, read_block)
+
+Segment = Tuple[str, int, int]  # (ruta, registro inicial, número de registros)
+SAMPLES_PER_PART = 32
+
+
+def whole_run(path: str) -> Segment:
+    """Segmento que abarca un archivo de corrida completo."""
+    return (path, 0, count_records(path))
+
+
+def _read_record(f, index: int) -> int:
+    f.seek(index * RECORD_SIZE)
+    return read_block(f, 1)[0]
+
+
+def _lower_bound(f, start: int, count: int, value: int) -> int:
+    """Primer índice (relativo al segmento) cuyo registro es >= value, por búsqueda binaria en disco."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _read_record(f, start + mid) < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _merge_task(args) -> int:
+    """Tarea de un proceso: fusiona segmentos en un archivo (o en una posición de él)."""
+    segments, output_path, output_offset, fmt, read_block_records, write_block_records = args
+    segments = [segment for segment in segments if segment[2]]
+    handles = [open(path, 'rb') for path, _, _ in segments]
+    try:
+        sources = []
+        for fh, (_, start, count) in zip(handles, segments):
+            fh.seek(start * RECORD_SIZE)
+            sources.append(iter_blocks(fh, count, read_block_records))
+        if output_offset is None:
+            with NumberWriter(output_path, fmt, write_block_records) as writer:
+                return merge_into(sources, writer)
+        # Escritura en una posición fija de un archivo ya creado
+        with open(output_path, 'r+b') as out:
+            out.seek(output_offset * RECORD_SIZE)
+            with NumberWriter(out, BINARY, write_block_records) as writer:
+                return merge_into(sources, writer)
+    finally:
+        for fh in handles:
+            fh.close()
+
+
+def merge_groups(groups: Sequence[Tuple[List[Segment], str, Optional[int]]], workers: int,
+                 fmt: str = BINARY, read_block_records: Optional[int] = None,
+                 write_block_records: Optional[int] = None) -> List[int]:
+    """
+    Ejecuta en paralelo fusiones independientes.
+
+    Args:
+        groups: Lista de (segmentos de entrada, archivo de salida, posición en
+                registros o None para crear el archivo)
+        workers: Número de procesos
+        fmt: Formato de salida de los grupos que crean su archivo
+
+    Returns:
+        Registros escritos por cada grupo, en el mismo orden
+    """
+    # Los tamaños de bloque se resuelven aquí para que los procesos usen la
+    # configuración de buffered_io del proceso principal
+    read_block_records = read_block_records or default_block_records()
+    write_block_records = write_block_records or default_block_records()
+    tasks = [(segments, path, offset, fmt, read_block_records, write_block_records)
+             for segments, path, offset in groups]
+    if workers <= 1 or len(tasks) <= 1:
+        return [_merge_task(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(_merge_task, tasks))
+
+
+def choose_splitters(segments: Sequence[Segment], parts: int) -> List[int]:
+    """
+    Elige parts - 1 separadores a partir de muestras equiespaciadas de cada
+    segmento, ponderadas por el tamaño del segmento.
+    """
+    samples = []
+    for path, start, count in segments:
+        if not count:
+            continue
+        taken = min(count, SAMPLES_PER_PART * parts)
+        with open(path, 'rb') as f:
+            for j in range(taken):
+                samples.append((_read_record(f, start + (2 * j + 1) * count // (2 * taken)), count / taken))
+    if not samples:
+        return []
+    samples.sort()
+    total = sum(weight for _, weight in samples)
+    splitters = []
+    acc = 0.0
+    target = 1
+    for value, weight in samples:
+        acc += weight
+        while target < parts and acc >= total * target / parts:
+            if not splitters or value > splitters[-1]:
+                splitters.append(value)
+            target += 1
+    return splitters
+
+
+def partition_segments(segments: Sequence[Segment], splitters: Sequence[int]) -> List[List[Segment]]:
+    """Corta cada segmento en len(splitters) + 1 tramos según los separadores."""
+    parts = [[] for _ in range(len(splitters) + 1)]
+    for path, start, count in segments:
+        with open(path, 'rb') as f:
+            cuts = [0] + [_lower_bound(f, start, count, value) for value in splitters] + [count]
+        for p in range(len(parts)):
+            if cuts[p + 1] > cuts[p]:
+                parts[p].append((path, start + cuts[p], cuts[p + 1] - cuts[p]))
+    return parts
+
+
+def partitioned_merge(segments: Sequence[Segment], output_path: str, workers: int, fmt: str = BINARY,
+                      read_block_records: Optional[int] = None,
+                      write_block_records: Optional[int] = None) -> int:
+    """
+    Fusión final dividida por rangos de claves entre `workers` procesos.
+    Devuelve el número de registros escritos en output_path.
+    """
+    check_format(fmt)
+    parts = partition_segments(segments, choose_splitters(segments, workers))
+    if fmt == BINARY:
+        # Cada tramo sabe de antemano en qué posición de la salida empieza
+        total = sum(count for part in parts for _, _, count in part)
+        with open(output_path, 'wb') as out:
+            out.truncate(total * RECORD_SIZE)
+        groups = []
+        offset = 0
+        for part in parts:
+            groups.append((part, output_path, offset))
+            offset += sum(count for _, _, count in part)
+        return sum(merge_groups(groups, workers, fmt, read_block_records, write_block_records))
+
+    # En texto la longitud de cada tramo no se conoce: se escriben aparte y se concatenan
+    part_paths = [f"{output_path}.part{p}" for p in range(len(parts))]
+    try:
+        written = merge_groups([(part, path, None) for part, path in zip(parts, part_paths)],
+                               workers, fmt, read_block_records, write_block_records)
+        with open(output_path, 'wb') as out:
+            for path in part_paths:
+                with open(path, 'rb') as src:
+                    shutil.copyfileobj(src, out)
+        return sum(written)
+    finally:
+        for path in part_paths:
+            if os.path.exists(path):
+                os.remove(path)
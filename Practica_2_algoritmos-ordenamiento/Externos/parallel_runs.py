@@ -0,0 +1,88 @@
+"""
+Generación de corridas iniciales en paralelo.
+
+El archivo de entrada se divide en rangos de bytes (alineados a inicio de
+línea en texto, o a registro en binario) y cada proceso del pool lee,
+interpreta y ordena su rango con la estrategia de generación de corridas
+elegida (ver run_generation.py); cada rango se lee con mmap por rebanadas
+(ver mmap_scan.py). Mientras un proceso ordena su bloque, los demás siguen
+leyendo e interpretando el suyo.
+
+Las corridas se devuelven en el orden de los rangos. Sus límites no son los
+mismos que en la ruta secuencial, pero contienen los mismos registros, así
+que el resultado de la fusión es idéntico.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from run_files import BINARY, RECORD_SIZE, RUN_SUFFIX, check_format, iter_number_blocks
+from run_generation import CHUNK, get_strategy
+
+
+def split_ranges(path: str, fmt: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide un archivo en hasta `parts` rangos de bytes [inicio, fin) que no
+    cortan ninguna línea (texto) ni ningún registro (binario).
+    """
+    check_format(fmt)
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            pos = size * i // parts
+            if pos <= bounds[-1]:
+                continue
+            if fmt == BINARY:
+                pos -= pos % RECORD_SIZE
+            else:
+                # El rango empieza en la línea siguiente a la posición aproximada
+                f.seek(pos - 1)
+                f.readline()
+                pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def iter_range_numbers(path: str, fmt: str, start: int, end: int) -> Iterator[int]:
+    """Itera sobre los enteros de un rango de bytes del archivo (las líneas no válidas se saltan)."""
+    for block in iter_number_blocks(path, fmt, None, start, end):
+        yield from block
+
+
+def _range_runs(args) -> List[str]:
+    """Tarea de un proceso del pool: genera las corridas de un rango."""
+    path, fmt, start, end, chunk_size, strategy, prefix = args
+    numbers = iter_range_numbers(path, fmt, start, end)
+    return get_strategy(strategy)(numbers, chunk_size, lambda run_id: f"{prefix}_{run_id}{RUN_SUFFIX}")
+
+
+def generate_runs_parallel(path: str, fmt: str, chunk_size: int, run_prefix: str,
+                           workers: int = None, strategy: str = CHUNK) -> List[str]:
+    """
+    Genera corridas iniciales de un archivo repartiendo rangos entre procesos.
+
+    Args:
+        path: Archivo de entrada
+        fmt: Formato de la entrada ('text' o 'binary')
+        chunk_size: Elementos en memoria por proceso
+        run_prefix: Prefijo de las rutas de las corridas (se le agrega el rango y el número)
+        workers: Número de procesos (por defecto, os.cpu_count())
+        strategy: Estrategia de generación de corridas ('chunk' o 'replacement')
+
+    Returns:
+        Rutas de las corridas generadas, en el orden de los rangos
+    """
+    get_strategy(strategy)  # Valida el nombre antes de lanzar los procesos
+    workers = workers or os.cpu_count() or 1
+    ranges = split_ranges(path, fmt, workers)
+    tasks = [(path, fmt, start, end, chunk_size, strategy, f"{run_prefix}{i}")
+             for i, (start, end) in enumerate(ranges)]
+    if len(tasks) <= 1:
+        return [run for task in tasks for run in _range_runs(task)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return [run for runs in pool.map(_range_runs, tasks) for run in runs]
@@ -0,0 +1,303 @@
+"""
+Ordenamiento externo de registros de texto (CSV/TSV) por una o varias columnas.
+
+Cada línea de la entrada es un registro que viaja completo por las corridas y
+se escribe tal cual en la salida; sólo la clave se interpreta. La clave se
+extrae una vez, al leer la entrada, y se codifica en bytes de modo que
+comparar las codificaciones con el orden de bytes (memcmp) equivale a
+comparar las claves:
+
+- 'int': 8 bytes big-endian con el bit de signo invertido (enteros de 64 bits).
+- 'float': los 8 bytes del double IEEE 754, con el bit de signo invertido en
+  los positivos y todos los bits invertidos en los negativos.
+- 'str': los bytes UTF-8 del campo, con \\x00 escapado como \\x00\\xff y
+  terminados en \\x00\\x00, para que un prefijo quede antes que el texto largo.
+- Descendente: se invierten todos los bytes de la codificación del campo.
+
+Una clave con varias columnas es la concatenación de sus campos, así que en
+la fusión cada comparación es una sola comparación de bytes.
+
+Las corridas temporales guardan pares (clave, registro) con una cabecera de
+dos longitudes de 32 bits. La generación de corridas usa list.sort() y la
+fusión heapq.merge() sobre corridas consecutivas, ambos estables: registros
+con la misma clave salen en el orden en que aparecían en la entrada.
+
+No se admiten campos entre comillas que contengan saltos de línea.
+"""
+import csv
+import heapq
+import os
+import struct
+from functools import partial
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import buffered_io
+
+STR = 'str'
+INT = 'int'
+FLOAT = 'float'
+KEY_TYPES = (STR, INT, FLOAT)
+ASC = 'asc'
+DESC = 'desc'
+
+RECORD_HEADER = struct.Struct('<II')  # Longitud de la clave y del registro
+RUN_SUFFIX = '.rec'
+# Bytes aproximados que ocupa en memoria un par (clave, registro) además de
+# su contenido: la tupla, los dos objetos bytes y el puntero de la lista
+RECORD_OVERHEAD = 150
+
+_INVERT = bytes(range(255, -1, -1))
+_SIGN = 1 << 63
+_MASK = (1 << 64) - 1
+_DOUBLE = struct.Struct('>d')
+_UINT64 = struct.Struct('>Q')
+
+Record = Tuple[bytes, bytes]  # (clave codificada, registro sin salto de línea)
+
+
+def _encode_int(field: bytes) -> bytes:
+    return (int(field) + _SIGN).to_bytes(8, 'big')
+
+
+def _encode_float(field: bytes) -> bytes:
+    bits = _UINT64.unpack(_DOUBLE.pack(float(field) + 0.0))[0]  # + 0.0 convierte -0.0 en 0.0
+    return _UINT64.pack(bits ^ _MASK if bits & _SIGN else bits | _SIGN)
+
+
+def _encode_str(field: bytes) -> bytes:
+    return field.replace(b'\x00', b'\x00\xff') + b'\x00\x00'
+
+
+_ENCODERS = {INT: _encode_int, FLOAT: _encode_float, STR: _encode_str}
+
+
+class KeySpec:
+    """Una columna de la clave: índice (desde 0), tipo y sentido."""
+
+    def __init__(self, column: int, type: str = STR, descending: bool = False):
+        if type not in KEY_TYPES:
+            raise ValueError(f"Tipo de clave desconocido '{type}'. Use uno de: {', '.join(KEY_TYPES)}")
+        if column < 0:
+            raise ValueError("El índice de columna debe ser >= 0")
+        self.column = column
+        self.type = type
+        self.descending = descending
+
+    @classmethod
+    def parse(cls, text: str) -> "KeySpec":
+        """Interpreta 'columna[:tipo][:asc|desc]', por ejemplo '2', '0:int' o '3:float:desc'."""
+        parts = text.split(':')
+        try:
+            column = int(parts[0])
+        except ValueError:
+            raise ValueError(f"Clave no válida '{text}': la columna debe ser un número") from None
+        key_type, descending = STR, False
+        for part in parts[1:]:
+            if part in KEY_TYPES:
+                key_type = part
+            elif part in (ASC, DESC):
+                descending = part == DESC
+            else:
+                raise ValueError(f"Clave no válida '{text}': '{part}' no es un tipo ni un sentido")
+        return cls(column, key_type, descending)
+
+    def __repr__(self):
+        return f"KeySpec({self.column}, '{self.type}', descending={self.descending})"
+
+
+class KeyExtractor:
+    """Calcula la clave codificada de una línea según las columnas pedidas."""
+
+    def __init__(self, keys: Sequence[KeySpec], delimiter: str = ','):
+        if not keys:
+            raise ValueError("Se necesita al menos una columna de clave")
+        self.keys = list(keys)
+        self.delimiter = delimiter
+        self._separator = delimiter.encode()
+        self._fields = [(key.column, _ENCODERS[key.type], key.descending) for key in self.keys]
+
+    def split(self, line: bytes) -> List[bytes]:
+        """Separa una línea en campos; sólo usa el módulo csv si hay comillas."""
+        if b'"' not in line:
+            return line.split(self._separator)
+        row = next(csv.reader([line.decode('utf-8')], delimiter=self.delimiter))
+        return [field.encode('utf-8') for field in row]
+
+    def __call__(self, line: bytes) -> bytes:
+        """
+        Devuelve la clave codificada de la línea. Lanza IndexError si falta
+        una columna y ValueError/OverflowError si un campo no es del tipo pedido.
+        """
+        fields = self.split(line.rstrip(b'\r'))
+        parts = []
+        for column, encode, descending in self._fields:
+            data = encode(fields[column])
+            parts.append(data.translate(_INVERT) if descending else data)
+        return b''.join(parts)
+
+
+def write_record_run(path: str, records: Iterable[Record]) -> int:
+    """Escribe pares (clave, registro) en una corrida temporal. Devuelve cuántos escribió."""
+    count = 0
+    pack = RECORD_HEADER.pack
+    with open(path, 'wb', buffering=buffered_io.settings.buffer_bytes) as f:
+        write = f.write
+        for key, record in records:
+            write(pack(len(key), len(record)))
+            write(key)
+            write(record)
+            count += 1
+    return count
+
+
+def _read_chunks(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        yield from iter(partial(f.read, buffered_io.settings.buffer_bytes), b'')
+
+
+def iter_record_run(path: str) -> Iterator[Record]:
+    """Itera sobre los pares (clave, registro) de una corrida temporal."""
+    unpack = RECORD_HEADER.unpack_from
+    header = RECORD_HEADER.size
+    buffer = b''
+    for chunk in buffered_io.read_ahead(_read_chunks(path)):
+        buffer += chunk
+        pos = 0
+        size = len(buffer)
+        while pos + header <= size:
+            key_len, record_len = unpack(buffer, pos)
+            start = pos + header
+            end = start + key_len + record_len
+            if end > size:
+                break
+            yield buffer[start:start + key_len], buffer[start + key_len:end]
+            pos = end
+        buffer = buffer[pos:]
+    if buffer:
+        raise ValueError(f"La corrida '{path}' está truncada")
+
+
+def merge_record_runs(runs: Sequence[str]) -> Iterator[Record]:
+    """Fusión estable: a igual clave sale primero el registro de la corrida anterior."""
+    return heapq.merge(*(iter_record_run(path) for path in runs), key=itemgetter(0))
+
+
+def _write_output(path: str, header: Optional[bytes], records: Iterable[Record]) -> int:
+    count = 0
+    with open(path, 'wb', buffering=buffered_io.settings.buffer_bytes) as out:
+        if header is not None:
+            out.write(header)
+        for _, record in records:
+            out.write(record)
+            out.write(b'\n')
+            count += 1
+    return count
+
+
+def record_sort(input_path: str, output_path: str, keys: Sequence[KeySpec], delimiter: str = ',',
+                header: bool = False, chunk_size: int = 100000, num_ways: int = 8,
+                memory_budget: Optional[int] = None, temp_dir: str = '.',
+                on_invalid: Optional[Callable[[int, str], None]] = None) -> dict:
+    """
+    Ordena las líneas de un archivo CSV/TSV por las columnas indicadas.
+
+    Args:
+        input_path: Archivo de entrada, un registro por línea
+        output_path: Archivo de salida con los mismos registros ordenados
+        keys: Columnas de la clave, de la más a la menos significativa
+        delimiter: Separador de columnas (',' para CSV, '\\t' para TSV)
+        header: Si la primera línea es una cabecera que se copia sin ordenar
+        chunk_size: Registros que se ordenan en memoria por corrida inicial
+        num_ways: Corridas que se fusionan a la vez
+        memory_budget: Si se indica, las corridas iniciales se cortan también
+                       al llegar a esta memoria aproximada (bytes)
+        temp_dir: Directorio de las corridas temporales
+        on_invalid: Función que recibe (número de línea, línea) de los registros
+                    sin clave válida, que se descartan; si es None se lanza ValueError
+
+    Returns:
+        Diccionario con 'records', 'runs' (corridas iniciales) y 'passes'
+        (pasadas de fusión, contando la final)
+    """
+    if num_ways < 2:
+        raise ValueError("num_ways debe ser al menos 2")
+    extractor = KeyExtractor(keys, delimiter)
+    runs = []
+    created = []
+    stats = {'records': 0, 'runs': 0, 'passes': 0}
+
+    def write_chunk(chunk):
+        chunk.sort(key=itemgetter(0))  # Estable: conserva el orden de entrada a igual clave
+        path = os.path.join(temp_dir, f"record_run_0_{len(runs)}{RUN_SUFFIX}")
+        created.append(path)
+        write_record_run(path, chunk)
+        runs.append(path)
+
+    try:
+        # --- Fase 1: corridas iniciales ordenadas por la clave codificada ---
+        header_line = None
+        with open(input_path, 'rb', buffering=buffered_io.settings.buffer_bytes) as f:
+            if header:
+                header_line = f.readline()
+                if header_line and not header_line.endswith(b'\n'):
+                    header_line += b'\n'
+            chunk = []
+            chunk_bytes = 0
+            for line_num, line in enumerate(f, 2 if header else 1):
+                record = line[:-1] if line.endswith(b'\n') else line
+                if not record.strip():
+                    continue
+                try:
+                    key = extractor(record)
+                except (IndexError, ValueError, OverflowError) as e:
+                    text = record.decode(errors='replace')
+                    if on_invalid is None:
+                        raise ValueError(f"Línea {line_num} sin clave válida ({e}): '{text}'") from None
+                    on_invalid(line_num, text)
+                    continue
+                chunk.append((key, record))
+                chunk_bytes += len(key) + len(record) + RECORD_OVERHEAD
+                if len(chunk) >= chunk_size or (memory_budget is not None and chunk_bytes >= memory_budget):
+                    stats['records'] += len(chunk)
+                    write_chunk(chunk)
+                    chunk = []
+                    chunk_bytes = 0
+            if chunk:
+                stats['records'] += len(chunk)
+                write_chunk(chunk)
+        stats['runs'] = len(runs)
+
+        # --- Fase 2: fusión de num_ways corridas consecutivas por pasada ---
+        while len(runs) > num_ways:
+            stats['passes'] += 1
+            next_runs = []
+            for i in range(0, len(runs), num_ways):
+                group = runs[i:i + num_ways]
+                if len(group) == 1:
+                    next_runs.append(group[0])
+                    continue
+                path = os.path.join(temp_dir, f"record_run_{stats['passes']}_{len(next_runs)}{RUN_SUFFIX}")
+                created.append(path)
+                write_record_run(path, merge_record_runs(group))
+                next_runs.append(path)
+                for run in group:
+                    os.remove(run)
+            runs = next_runs
+
+        # --- Fase 3: la última fusión escribe directamente la salida ---
+        if runs:
+            stats['passes'] += 1
+        _write_output(output_path, header_line, merge_record_runs(runs))
+        return stats
+    finally:
+        for path in created:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# Ejemplo de uso:
+# Ordenar ventas.csv por la columna 2 (entera, descendente) y luego por la 0 (texto):
+# record_sort('ventas.csv', 'ordenado.csv', [KeySpec(2, INT, descending=True), KeySpec(0)], header=True)
+# Un TSV por la columna 1 como número real:
+# record_sort('datos.tsv', 'ordenado.tsv', [KeySpec.parse('1:float')], delimiter='\t')
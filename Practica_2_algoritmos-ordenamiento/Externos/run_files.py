@@ -0,0 +1,388 @@
+"""
+Formato de archivos de corridas (runs) compartido por los ordenamientos externos.
+
+Las corridas temporales se guardan en binario de ancho fijo: cada registro es
+un entero con signo de 64 bits empaquetado con ``array('q')`` en el orden de
+bytes nativo de la máquina. Así cada pasada de fusión lee y escribe bloques
+completos con ``fromfile``/``tofile`` en lugar de formatear y volver a
+interpretar una línea de texto por número.
+
+El texto (un entero por línea) sólo se usa en los extremos: al leer el
+archivo de entrada y al escribir el archivo de salida, y ambos pueden
+elegirse también en binario con ``input_format``/``output_format``. Como las
+corridas son de 64 bits, la entrada de texto sólo admite enteros entre
+-2**63 y 2**63 - 1: las líneas con valores fuera de ese rango se tratan como
+no válidas (se pasan a on_invalid y se saltan), igual que las no numéricas.
+
+Las lecturas por bloques y NumberWriter pasan por buffered_io.py (lectura
+anticipada y escritura diferida en hilos); cuando no se indica block_records
+se usa el tamaño de bloque configurado allí. La entrada se lee con mmap por
+rebanadas grandes (mmap_scan.py).
+
+Opcionalmente las corridas se comprimen con un codec (run_codecs.py): cada
+bloque que se vuelca se guarda como una trama con una cabecera (registros,
+bytes codificados) seguida de los datos codificados. Las funciones que
+aceptan ``codec`` leen o escriben ese formato; con ``codec=None`` las
+corridas son registros de ancho fijo sin cabecera.
+"""
+import os
+import shutil
+import struct
+from array import array
+from itertools import islice
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+
+import buffered_io
+import mmap_scan
+
+TYPECODE = 'q'
+RECORD_SIZE = array(TYPECODE).itemsize
+
+TEXT = 'text'
+BINARY = 'binary'
+FORMATS = (TEXT, BINARY)
+RUN_SUFFIX = '.bin'
+FRAME_HEADER = struct.Struct('<II')  # Registros y bytes codificados de una trama
+
+
+def check_format(fmt: str):
+    """Valida el nombre de un formato de entrada/salida."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido '{fmt}'. Use uno de: {', '.join(FORMATS)}")
+
+
+def count_records(path: str, codec=None) -> int:
+    """Número de registros de un archivo de corrida binario (comprimido con codec, si se indica)."""
+    if codec is None:
+        return os.path.getsize(path) // RECORD_SIZE
+    total = 0
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(FRAME_HEADER.size)
+            if not header:
+                return total
+            records, size = FRAME_HEADER.unpack(header)
+            total += records
+            f.seek(size, os.SEEK_CUR)
+
+
+def default_block_records() -> int:
+    """Registros por bloque según el tamaño de búfer configurado en buffered_io."""
+    return buffered_io.block_records(RECORD_SIZE)
+
+
+def read_block(f: BinaryIO, max_records: int) -> array:
+    """
+    Lee hasta max_records registros de un archivo binario abierto.
+    Devuelve un array vacío al llegar al final del archivo.
+    """
+    block = array(TYPECODE)
+    try:
+        block.fromfile(f, max_records)
+    except EOFError:
+        pass  # fromfile conserva los registros leídos antes del final
+    return block
+
+
+def encode_frame(codec, block: array) -> bytes:
+    """Codifica un bloque como trama: cabecera seguida de los datos comprimidos."""
+    data = codec.encode(block)
+    return FRAME_HEADER.pack(len(block), len(data)) + data
+
+
+def _read_frames(f: BinaryIO, count: Optional[int], codec) -> Iterator[array]:
+    remaining = count
+    while remaining is None or remaining > 0:
+        header = f.read(FRAME_HEADER.size)
+        if not header:
+            return
+        if len(header) < FRAME_HEADER.size:
+            raise ValueError(f"Trama truncada en '{getattr(f, 'name', f)}'")
+        records, size = FRAME_HEADER.unpack(header)
+        block = codec.decode(f.read(size))
+        if len(block) != records or (remaining is not None and records > remaining):
+            raise ValueError(f"Trama dañada o desalineada en '{getattr(f, 'name', f)}'")
+        if remaining is not None:
+            remaining -= records
+        yield block
+
+
+def _read_blocks(f: BinaryIO, count: Optional[int], block_records: int, codec=None) -> Iterator[array]:
+    if codec is not None:
+        yield from _read_frames(f, count, codec)
+        return
+    remaining = count
+    while remaining is None or remaining > 0:
+        size = block_records if remaining is None else min(block_records, remaining)
+        block = read_block(f, size)
+        if not block:
+            return
+        if remaining is not None:
+            remaining -= len(block)
+        yield block
+
+
+def iter_blocks(f: BinaryIO, count: Optional[int] = None,
+                block_records: Optional[int] = None, codec=None) -> Iterator[array]:
+    """
+    Itera por bloques sobre un archivo binario abierto, con lectura anticipada.
+
+    Args:
+        f: Archivo abierto en modo 'rb'
+        count: Número de registros a leer (None para leer hasta el final)
+        block_records: Registros por bloque (None para el tamaño configurado;
+                       con codec los bloques son las tramas escritas)
+        codec: Codec de las tramas (None si el archivo no está comprimido)
+    """
+    return buffered_io.read_ahead(_read_blocks(f, count, block_records or default_block_records(), codec))
+
+
+def iter_records(f: BinaryIO, count: Optional[int] = None,
+                 block_records: Optional[int] = None) -> Iterator[int]:
+    """Itera registro por registro sobre un archivo binario abierto."""
+    for block in iter_blocks(f, count, block_records):
+        yield from block
+
+
+def _run_blocks(path: str, block_records: int, codec) -> Iterator[array]:
+    with open(path, 'rb') as f:
+        yield from _read_blocks(f, None, block_records, codec)
+
+
+def iter_run_blocks(path: str, block_records: Optional[int] = None, codec=None) -> Iterator[array]:
+    """Itera por bloques sobre todos los registros de un archivo de corrida binario."""
+    return buffered_io.read_ahead(_run_blocks(path, block_records or default_block_records(), codec))
+
+
+def iter_run(path: str, block_records: Optional[int] = None, codec=None) -> Iterator[int]:
+    """Itera sobre todos los registros de un archivo de corrida binario."""
+    for block in iter_run_blocks(path, block_records, codec):
+        yield from block
+
+
+def iter_number_blocks(path: str, fmt: str = TEXT,
+                       on_invalid: Optional[Callable[[str], None]] = None,
+                       start: int = 0, end: Optional[int] = None) -> Iterator[list]:
+    """
+    Itera por bloques grandes sobre los enteros de un archivo (o de un rango
+    de bytes [start, end) de él) leyéndolo con mmap (ver mmap_scan.py).
+    En texto las líneas vacías se ignoran y las no numéricas o fuera del
+    rango de 64 bits se pasan a on_invalid.
+    """
+    check_format(fmt)
+    if fmt == BINARY:
+        return mmap_scan.iter_binary_blocks(path, TYPECODE, start, end)
+    return mmap_scan.iter_text_blocks(path, start, end, on_invalid)
+
+
+def iter_chunks(blocks: Iterable[Iterable[int]], size: int) -> Iterator[list]:
+    """Reagrupa una secuencia de bloques en listas de `size` elementos (la última puede ser menor)."""
+    chunk = []
+    for block in blocks:
+        chunk.extend(block)
+        if len(chunk) >= size:
+            for i in range(0, len(chunk) - size + 1, size):
+                yield chunk[i:i + size]
+            chunk = chunk[len(chunk) - len(chunk) % size:]
+    if chunk:
+        yield chunk
+
+
+
+class RunReader:
+    """
+    Lee una tras otra corridas de longitud conocida de un archivo binario.
+
+    Todo el archivo pasa por una sola lectura anticipada, de modo que leer
+    muchas corridas cortas no crea un hilo ni hace una lectura por corrida.
+    Cada iterador devuelto por next_run() debe consumirse antes de pedir el
+    siguiente.
+    """
+
+    def __init__(self, path: str, block_records: Optional[int] = None, codec=None):
+        self._blocks = iter_run_blocks(path, block_records, codec)
+        self._block = array(TYPECODE)
+        self._pos = 0
+
+    def next_run(self, length: int) -> Iterator[array]:
+        """Itera por bloques sobre los siguientes `length` registros."""
+        while length > 0:
+            if self._pos >= len(self._block):
+                self._block = next(self._blocks, array(TYPECODE))
+                self._pos = 0
+                if not self._block:
+                    return
+            take = min(length, len(self._block) - self._pos)
+            yield self._block[self._pos:self._pos + take]
+            self._pos += take
+            length -= take
+
+    def close(self):
+        self._blocks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_text_numbers(path: str, on_invalid: Optional[Callable[[str], None]] = None) -> Iterator[int]:
+    """
+    Itera sobre los enteros de un archivo de texto con un número por línea.
+    Las líneas vacías se ignoran; las no numéricas o fuera de rango se pasan a on_invalid.
+    """
+    for block in iter_number_blocks(path, TEXT, on_invalid):
+        yield from block
+
+
+def iter_numbers(path: str, fmt: str = TEXT,
+                 on_invalid: Optional[Callable[[str], None]] = None) -> Iterator[int]:
+    """Itera sobre los enteros de un archivo en el formato indicado."""
+    check_format(fmt)
+    if fmt == BINARY:
+        return iter_run(path)
+    return iter_text_numbers(path, on_invalid)
+
+
+def find_unsorted(path: str, fmt: str = TEXT, on_invalid: Optional[Callable[[str], None]] = None):
+    """
+    Comprueba que un archivo esté en orden ascendente recorriéndolo por bloques.
+    Las líneas no numéricas o fuera de rango se pasan a on_invalid.
+
+    Returns:
+        None si está ordenado, o (posición, anterior, actual) del primer
+        registro menor que su anterior (posición desde 1, sin contar líneas
+        vacías ni no válidas)
+    """
+    return mmap_scan.first_unsorted(iter_number_blocks(path, fmt, on_invalid))
+
+
+class NumberWriter:
+    """
+    Escritor con búfer de enteros en formato binario o de texto.
+
+    Acumula los valores en memoria y los vuelca por bloques, de modo que las
+    fusiones pueden llamar a write() por registro sin hacer una llamada al
+    sistema por cada número. Los bloques se escriben desde un hilo auxiliar
+    (buffered_io.WriteBehind) salvo que la escritura diferida esté desactivada.
+    """
+
+    def __init__(self, target, fmt: str = BINARY, block_records: Optional[int] = None, codec=None):
+        """
+        Args:
+            target: Ruta del archivo a crear, o un archivo binario ya abierto (por
+                    ejemplo una cinta a la que se agregan corridas), que no se cierra al final
+            fmt: 'binary' o 'text'
+            block_records: Registros acumulados antes de volcar a disco
+                           (None para el tamaño configurado)
+            codec: Si se indica, cada bloque binario se escribe como trama comprimida
+        """
+        check_format(fmt)
+        if codec is not None and fmt != BINARY:
+            raise ValueError("Sólo las corridas binarias pueden comprimirse")
+        self.fmt = fmt
+        self.codec = codec
+        self.block_records = block_records or default_block_records()
+        self.count = 0
+        self._buffer = array(TYPECODE)
+        self._owns_file = isinstance(target, (str, os.PathLike))
+        self._file = open(target, 'wb') if self._owns_file else target
+        self._closed = False
+        self._behind = buffered_io.WriteBehind(self._file) if buffered_io.settings.write_behind else None
+
+    def write(self, value: int):
+        self._buffer.append(value)
+        if len(self._buffer) >= self.block_records:
+            self.flush()
+
+    def write_many(self, values: Iterable[int]):
+        if isinstance(values, (array, list)):
+            self._buffer.extend(values)
+            if len(self._buffer) >= self.block_records:
+                self.flush()
+            return
+        values = iter(values)
+        while True:
+            # Se consume el iterable por bloques para no cargarlo completo en memoria
+            before = len(self._buffer)
+            self._buffer.extend(islice(values, self.block_records - before))
+            if len(self._buffer) == before:
+                return
+            if len(self._buffer) >= self.block_records:
+                self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.codec is not None:
+            data = encode_frame(self.codec, self._buffer)
+        elif self.fmt == BINARY:
+            data = self._buffer.tobytes()
+        else:
+            data = ('\n'.join(map(str, self._buffer)) + '\n').encode('ascii')
+        if self._behind is not None:
+            self._behind.submit(data)
+        else:
+            self._file.write(data)
+        self.count += len(self._buffer)
+        self._buffer = array(TYPECODE)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.flush()
+        finally:
+            try:
+                if self._behind is not None:
+                    self._behind.close()
+            finally:
+                if self._owns_file:
+                    self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_run(path: str, values: Iterable[int], codec=None) -> int:
+    """Guarda una secuencia de enteros como corrida binaria. Devuelve el número de registros."""
+    if codec is not None:
+        with NumberWriter(path, BINARY, codec=codec) as writer:
+            writer.write_many(values)
+        return writer.count
+    block = values if isinstance(values, array) else array(TYPECODE, values)
+    with open(path, 'wb') as f:
+        block.tofile(f)
+    return len(block)
+
+
+def write_numbers(path: str, values: Iterable[int], fmt: str = TEXT) -> int:
+    """Escribe enteros en el formato indicado. Devuelve el número de registros."""
+    with NumberWriter(path, fmt) as writer:
+        writer.write_many(values)
+    return writer.count
+
+
+def convert(src: str, dst: str, src_format: str, dst_format: str,
+            on_invalid: Optional[Callable[[str], None]] = None) -> int:
+    """Convierte un archivo de enteros entre formatos. Devuelve el número de registros."""
+    return write_numbers(dst, iter_numbers(src, src_format, on_invalid), dst_format)
+
+
+def move_run(src: str, dst: str, dst_format: str = BINARY, codec=None):
+    """
+    Mueve una corrida binaria al destino en el formato pedido. En binario sin
+    comprimir se renombra, o se copia si el destino está en otro volumen; una
+    corrida comprimida se descomprime al escribir el destino.
+    """
+    check_format(dst_format)
+    if dst_format == BINARY and codec is None:
+        shutil.move(src, dst)
+    else:
+        write_numbers(dst, iter_run(src, codec=codec), dst_format)
+        os.remove(src)
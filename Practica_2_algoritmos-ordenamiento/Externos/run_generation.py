@@ -0,0 +1,165 @@
+"""
+Estrategias de generación de corridas iniciales para los ordenamientos externos.
+
+Cada estrategia recibe un iterable de enteros, el número de elementos que
+caben en memoria (block_size) y una función que da la ruta de la corrida
+número i; escribe las corridas en binario (ver run_files.py), comprimidas
+si se pasa un codec, y devuelve la lista de rutas creadas.
+
+- 'chunk': lee block_size elementos, los ordena y los guarda. Todas las
+  corridas miden block_size (salvo la última).
+- 'radix': como 'chunk', pero cada bloque se ordena con el Radix Sort LSD
+  vectorizado de Internos/0007_RadixSort.py (con NumPy; sin él, con sort()).
+- 'replacement': selección por reemplazo sobre un min-heap. Las corridas
+  miden en promedio 2 * block_size con datos aleatorios y una entrada ya
+  casi ordenada produce una sola corrida.
+"""
+import heapq
+import importlib.util
+import os
+from array import array
+from itertools import islice
+from typing import Callable, Iterable, List
+
+from run_files import BINARY, TYPECODE, NumberWriter, count_records, write_run
+
+CHUNK = 'chunk'
+RADIX = 'radix'
+REPLACEMENT = 'replacement'
+
+RADIX_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'Internos', '0007_RadixSort.py')
+_radix_module = None
+
+
+def chunk_sort_runs(numbers: Iterable[int], block_size: int,
+                    run_path: Callable[[int], str], codec=None) -> List[str]:
+    """Genera corridas de block_size elementos ordenando cada bloque en memoria."""
+    runs = []
+    numbers = iter(numbers)
+    while True:
+        chunk = list(islice(numbers, block_size))
+        if not chunk:
+            break
+        chunk.sort()
+        path = run_path(len(runs))
+        write_run(path, chunk, codec)
+        runs.append(path)
+    return runs
+
+
+def _radix():
+    """Carga (una sola vez) Internos/0007_RadixSort.py, que no es importable por su nombre."""
+    global _radix_module
+    if _radix_module is None:
+        spec = importlib.util.spec_from_file_location('_radix_sort', RADIX_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _radix_module = module
+    return _radix_module
+
+
+def radix_sort_runs(numbers: Iterable[int], block_size: int,
+                    run_path: Callable[[int], str], codec=None) -> List[str]:
+    """Genera corridas de block_size elementos ordenando cada bloque con Radix Sort."""
+    sort_block = _radix().sort_int64_block
+    runs = []
+    numbers = iter(numbers)
+    while True:
+        chunk = array(TYPECODE, islice(numbers, block_size))
+        if not chunk:
+            break
+        path = run_path(len(runs))
+        write_run(path, sort_block(chunk), codec)
+        runs.append(path)
+    return runs
+
+
+def replacement_selection_runs(numbers: Iterable[int], block_size: int,
+                               run_path: Callable[[int], str], codec=None) -> List[str]:
+    """
+    Genera corridas por selección por reemplazo.
+
+    El heap guarda pares (número_de_corrida, valor). Se emite siempre el
+    mínimo; el elemento que entra en su lugar pertenece a la corrida actual
+    si es mayor o igual al último emitido, o a la siguiente en caso contrario.
+    Cuando el mínimo del heap pasa a la siguiente corrida, la actual termina.
+    """
+    numbers = iter(numbers)
+    heap = [(0, value) for value in islice(numbers, block_size)]
+    if not heap:
+        return []
+    heapq.heapify(heap)
+
+    runs = [run_path(0)]
+    current = 0
+    writer = NumberWriter(runs[0], BINARY, codec=codec)
+    try:
+        while heap:
+            run, value = heap[0]
+            if run != current:
+                writer.close()
+                current = run
+                runs.append(run_path(len(runs)))
+                writer = NumberWriter(runs[-1], BINARY, codec=codec)
+            writer.write(value)
+
+            incoming = next(numbers, None)
+            if incoming is None:
+                heapq.heappop(heap)
+            elif incoming >= value:
+                heapq.heapreplace(heap, (run, incoming))
+            else:
+                heapq.heapreplace(heap, (run + 1, incoming))
+    finally:
+        writer.close()
+    return runs
+
+
+STRATEGIES = {
+    CHUNK: chunk_sort_runs,
+    RADIX: radix_sort_runs,
+    REPLACEMENT: replacement_selection_runs,
+}
+
+
+def get_strategy(name: str) -> Callable[[Iterable[int], int, Callable[[int], str]], List[str]]:
+    """Devuelve la función de generación de corridas con ese nombre."""
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Estrategia de corridas desconocida '{name}'. "
+                         f"Use una de: {', '.join(STRATEGIES)}") from None
+
+
+class RunStats:
+    """Estadísticas de las corridas iniciales generadas."""
+
+    def __init__(self, strategy: str, block_size: int, lengths: List[int]):
+        self.strategy = strategy
+        self.block_size = block_size
+        self.lengths = lengths
+
+    @classmethod
+    def from_runs(cls, strategy: str, block_size: int, runs: List[str], codec=None) -> "RunStats":
+        return cls(strategy, block_size, [count_records(path, codec) for path in runs])
+
+    @property
+    def num_runs(self) -> int:
+        return len(self.lengths)
+
+    @property
+    def records(self) -> int:
+        return sum(self.lengths)
+
+    @property
+    def average_length(self) -> float:
+        return self.records / self.num_runs if self.lengths else 0.0
+
+    def __str__(self):
+        if not self.lengths:
+            return f"Estrategia '{self.strategy}': no se generaron corridas"
+        return (f"Estrategia '{self.strategy}': {self.num_runs} corridas, {self.records} registros, "
+                f"longitud promedio {self.average_length:.1f} "
+                f"({self.average_length / self.block_size:.2f}x block_size), "
+                f"mínima {min(self.lengths)}, máxima {max(self.lengths)}")
@@ -0,0 +1,327 @@
+"""
+Generación rápida y reproducible de archivos de prueba.
+
+    write_numbers_file('entrada.bin', 500_000_000, 'zipf', seed=7, fmt='binary')
+    write_records_file('registros.csv', 10_000_000, ['zipf', 'str', 'float'], seed=7)
+
+    python test_data.py entrada.txt -n 100M --distribution sorted_prefix --seed 7
+    python test_data.py registros.csv -n 10M --columns zipf,str,uniform,float --header
+
+Los datos se construyen por bloques de block_records valores: con NumPy, si
+está instalado, cada bloque se genera con operaciones vectorizadas y se
+escribe de una vez (tofile en binario, un solo join en texto), de modo que
+un archivo de varios GB se crea en una fracción del tiempo del ordenamiento.
+Sin NumPy se usa el módulo random bloque a bloque, mucho más lento.
+
+La misma semilla, los mismos parámetros y la misma biblioteca (NumPy o
+random) dan siempre los mismos datos; NumPy y random dan datos distintos
+entre sí.
+
+Distribuciones de los enteros (DISTRIBUTIONS):
+
+- 'uniform': uniformes en [low, high).
+- 'sorted', 'reverse': ordenados ascendente o descendentemente, con saltos
+  aleatorios entre valores consecutivos.
+- 'sorted_prefix': los primeros sorted_fraction * n valores ya ordenados y
+  el resto uniformes (archivos a los que se agregaron datos nuevos).
+- 'sawtooth': teeth corridas ascendentes iguales.
+- 'few_unique': muchos repetidos, distinct valores distintos.
+- 'zipf': claves con distribución de Zipf (exponente zipf_exponent), pocas
+  muy frecuentes y una cola larga que se pliega sobre [low, high).
+- 'organ_pipe': ascendente hasta la mitad y descendente después.
+"""
+import argparse
+import math
+import random
+import re
+import string
+from array import array
+from itertools import accumulate
+from typing import Iterator, List, Optional, Sequence
+
+from run_files import FORMATS, TEXT, TYPECODE, check_format
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+DEFAULT_BLOCK_RECORDS = 1 << 20
+DISTRIBUTIONS = ('uniform', 'sorted', 'reverse', 'sorted_prefix', 'sawtooth', 'few_unique', 'zipf',
+                 'organ_pipe')
+STR_COLUMN = 'str'
+FLOAT_COLUMN = 'float'
+WORD_LENGTH = 8
+LETTERS = string.ascii_lowercase
+COUNT_SUFFIXES = {'': 1, 'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9}
+
+# Parámetros de las distribuciones y su valor por defecto
+DEFAULTS = {
+    'low': 0,
+    'high': 10 ** 9,
+    'distinct': 16,
+    'zipf_exponent': 1.1,
+    'sorted_fraction': 0.5,
+    'teeth': 8,
+}
+
+
+def _params(overrides: dict) -> dict:
+    unknown = set(overrides) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    params = {**DEFAULTS, **overrides}
+    if params['high'] <= params['low']:
+        raise ValueError("high debe ser mayor que low")
+    if params['distinct'] < 1 or params['teeth'] < 1:
+        raise ValueError("distinct y teeth deben ser al menos 1")
+    if params['zipf_exponent'] <= 1:
+        raise ValueError("zipf_exponent debe ser mayor que 1")
+    if not 0 <= params['sorted_fraction'] <= 1:
+        raise ValueError("sorted_fraction debe estar entre 0 y 1")
+    return params
+
+
+def _check_distribution(distribution: str):
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Distribución desconocida '{distribution}'. Use una de: {', '.join(DISTRIBUTIONS)}")
+
+
+def _step(n: int, p: dict) -> int:
+    """Salto máximo entre valores consecutivos de una secuencia ordenada que recorre [low, high)."""
+    return max(1, 2 * (p['high'] - p['low']) // max(n, 1))
+
+
+def _numpy_block(rng, distribution: str, start: int, count: int, n: int, p: dict, state: dict):
+    """Valores start .. start + count - 1 de la secuencia, como arreglo int64 de NumPy."""
+    low, high = p['low'], p['high']
+    if distribution == 'uniform':
+        return rng.integers(low, high, count, dtype=np.int64)
+    if distribution in ('sorted', 'reverse', 'sorted_prefix'):
+        ordered = count
+        if distribution == 'sorted_prefix':
+            ordered = max(0, min(count, int(n * p['sorted_fraction']) - start))
+        # Suma acumulada de saltos aleatorios, que sigue desde el último valor del bloque anterior
+        steps = rng.integers(0, _step(n, p) + 1, ordered, dtype=np.int64)
+        block = np.cumsum(steps) + state.get('last', low)
+        np.minimum(block, high - 1, out=block)
+        if ordered:
+            state['last'] = int(block[-1])
+        if distribution == 'reverse':
+            block = high - 1 - (block - low)
+        if ordered < count:
+            block = np.concatenate((block, rng.integers(low, high, count - ordered, dtype=np.int64)))
+        return block
+    index = np.arange(start, start + count, dtype=np.int64)
+    if distribution == 'sawtooth':
+        return low + index % -(-n // p['teeth'])
+    if distribution == 'organ_pipe':
+        return low + np.minimum(index, n - 1 - index)
+    if distribution == 'few_unique':
+        return low + rng.integers(0, p['distinct'], count, dtype=np.int64)
+    # zipf: NumPy da valores >= 1 sin cota superior; la cola se pliega sobre [low, high)
+    keys = rng.zipf(p['zipf_exponent'], count)
+    return low + (keys - 1) % (high - low)
+
+
+def _zipf_value(rng: random.Random, a: float) -> int:
+    """Un valor de Zipf(a) >= 1, por rechazo (Devroye), como numpy.random.zipf."""
+    b = 2.0 ** (a - 1)
+    while True:
+        u = 1.0 - rng.random()
+        v = rng.random()
+        x = math.floor(u ** (-1.0 / (a - 1)))
+        if x < 1 or x > 1 << 62:
+            continue
+        t = (1.0 + 1.0 / x) ** (a - 1)
+        if v * x * (t - 1) / (b - 1) <= t / b:
+            return x
+
+
+def _python_block(rng: random.Random, distribution: str, start: int, count: int, n: int, p: dict,
+                  state: dict) -> List[int]:
+    """Lo mismo que _numpy_block con el módulo random, como lista."""
+    low, high = p['low'], p['high']
+    if distribution == 'uniform':
+        return [rng.randrange(low, high) for _ in range(count)]
+    if distribution in ('sorted', 'reverse', 'sorted_prefix'):
+        ordered = count
+        if distribution == 'sorted_prefix':
+            ordered = max(0, min(count, int(n * p['sorted_fraction']) - start))
+        step = _step(n, p)
+        block = [min(value, high - 1) for value in
+                 accumulate((rng.randint(0, step) for _ in range(ordered)), initial=state.get('last', low))][1:]
+        if ordered:
+            state['last'] = block[-1]
+        if distribution == 'reverse':
+            block = [high - 1 - (value - low) for value in block]
+        return block + [rng.randrange(low, high) for _ in range(count - ordered)]
+    if distribution == 'sawtooth':
+        tooth = -(-n // p['teeth'])
+        return [low + i % tooth for i in range(start, start + count)]
+    if distribution == 'organ_pipe':
+        return [low + min(i, n - 1 - i) for i in range(start, start + count)]
+    if distribution == 'few_unique':
+        return [low + rng.randrange(p['distinct']) for _ in range(count)]
+    return [low + (_zipf_value(rng, p['zipf_exponent']) - 1) % (high - low) for _ in range(count)]
+
+
+def _rng(seed: Optional[int]):
+    return np.random.default_rng(seed) if np is not None else random.Random(seed)
+
+
+def iter_blocks(distribution: str, n: int, seed: Optional[int] = 0,
+                block_records: int = DEFAULT_BLOCK_RECORDS, **params) -> Iterator:
+    """
+    Genera n enteros de la distribución pedida, por bloques.
+
+    Args:
+        distribution: Una de DISTRIBUTIONS
+        n: Número total de valores
+        seed: Semilla (None para datos distintos en cada llamada)
+        block_records: Valores por bloque
+        params: low, high, distinct, zipf_exponent, sorted_fraction o teeth
+                (ver DEFAULTS)
+
+    Returns:
+        Iterador de bloques: arreglos int64 de NumPy o, sin NumPy, array('q')
+    """
+    _check_distribution(distribution)
+    p = _params(params)
+    if p['low'] < -2 ** 63 or p['high'] > 2 ** 63:
+        raise ValueError("Los valores deben caber en enteros de 64 bits")
+    rng = _rng(seed)
+    state = {}
+    for start in range(0, n, block_records):
+        count = min(block_records, n - start)
+        if np is not None:
+            yield _numpy_block(rng, distribution, start, count, n, p, state)
+        else:
+            yield array(TYPECODE, _python_block(rng, distribution, start, count, n, p, state))
+
+
+def generate(distribution: str, n: int, seed: Optional[int] = 0, **params) -> List[int]:
+    """Los n enteros de iter_blocks en una lista (para datos que caben en memoria)."""
+    values = []
+    for block in iter_blocks(distribution, n, seed, **params):
+        values.extend(block.tolist())
+    return values
+
+
+def write_numbers_file(path: str, n: int, distribution: str = 'uniform', seed: Optional[int] = 0,
+                       fmt: str = TEXT, block_records: int = DEFAULT_BLOCK_RECORDS, **params) -> int:
+    """
+    Escribe n enteros de la distribución pedida en path, un número por línea
+    ('text') o como enteros de 64 bits ('binary', el formato de run_files.py).
+
+    Returns:
+        El número de valores escritos
+    """
+    check_format(fmt)
+    with open(path, 'wb') as f:
+        for block in iter_blocks(distribution, n, seed, block_records, **params):
+            if fmt == TEXT:
+                f.write('\n'.join(map(str, block.tolist())).encode())
+                f.write(b'\n')
+            else:
+                block.tofile(f)
+    return n
+
+
+def _word_column(rng, count: int) -> List[str]:
+    """count palabras aleatorias de WORD_LENGTH letras minúsculas."""
+    if np is not None:
+        codes = rng.integers(ord('a'), ord('z') + 1, (count, WORD_LENGTH), dtype=np.uint8)
+        return codes.view(f'S{WORD_LENGTH}').ravel().astype(f'U{WORD_LENGTH}').tolist()
+    return [''.join(rng.choices(LETTERS, k=WORD_LENGTH)) for _ in range(count)]
+
+
+def _float_column(rng, count: int, p: dict) -> List[str]:
+    """count reales uniformes en [low, high), con seis decimales."""
+    if np is not None:
+        values = (rng.random(count) * (p['high'] - p['low']) + p['low']).tolist()
+    else:
+        values = [rng.uniform(p['low'], p['high']) for _ in range(count)]
+    return [f"{value:.6f}" for value in values]
+
+
+def write_records_file(path: str, n: int, columns: Sequence[str], seed: Optional[int] = 0,
+                       delimiter: str = ',', header: bool = False,
+                       block_records: int = DEFAULT_BLOCK_RECORDS, **params) -> int:
+    """
+    Escribe n registros CSV/TSV para record_sort.py, con una columna por
+    elemento de columns: el nombre de una distribución (enteros), 'str'
+    (palabras aleatorias) o 'float' (reales uniformes). Cada columna entera
+    sigue su propia secuencia, derivada de seed y de su posición.
+
+    Returns:
+        El número de registros escritos
+    """
+    for column in columns:
+        if column not in (STR_COLUMN, FLOAT_COLUMN):
+            _check_distribution(column)
+    if not columns:
+        raise ValueError("Hace falta al menos una columna")
+    p = _params(params)
+    # Una secuencia independiente por columna entera, reproducible a partir de seed
+    integer_blocks = {i: iter_blocks(column, n, None if seed is None else seed * 1000003 + i,
+                                     block_records, **params)
+                      for i, column in enumerate(columns) if column not in (STR_COLUMN, FLOAT_COLUMN)}
+    rng = _rng(None if seed is None else seed * 1000003 + len(columns))
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if header:
+            f.write(delimiter.join(f"c{i}_{column}" for i, column in enumerate(columns)) + '\n')
+        for start in range(0, n, block_records):
+            count = min(block_records, n - start)
+            cells = []
+            for i, column in enumerate(columns):
+                if column == STR_COLUMN:
+                    cells.append(_word_column(rng, count))
+                elif column == FLOAT_COLUMN:
+                    cells.append(_float_column(rng, count, p))
+                else:
+                    cells.append(map(str, next(integer_blocks[i]).tolist()))
+            f.write('\n'.join(map(delimiter.join, zip(*cells))))
+            f.write('\n')
+    return n
+
+
+def parse_count(text: str) -> int:
+    """Convierte una cantidad como '500000', '10K', '100M' o '2G' (potencias de 1000) a entero."""
+    match = re.fullmatch(r'\s*(\d+)\s*([KMG]?)\s*', text.upper())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Cantidad no válida: '{text}'")
+    return int(match.group(1)) * COUNT_SUFFIXES[match.group(2)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Genera archivos de prueba para los ordenamientos externos.")
+    parser.add_argument('output', help="Archivo a crear")
+    parser.add_argument('-n', '--count', type=parse_count, required=True,
+                        help="Número de valores o registros (admite sufijos K, M y G)")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='uniform')
+    parser.add_argument('--columns', help="Registros CSV: columnas separadas por comas (distribuciones, "
+                                          f"'{STR_COLUMN}' o '{FLOAT_COLUMN}')")
+    parser.add_argument('--format', choices=FORMATS, default=TEXT, help="Formato de los enteros")
+    parser.add_argument('--delimiter', default=',', help="Separador de columnas de los registros")
+    parser.add_argument('--header', action='store_true', help="Escribe una cabecera en los registros")
+    parser.add_argument('--seed', type=int, default=0)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    try:
+        n = args.count
+        params = {name: getattr(args, name) for name in DEFAULTS}
+        if args.columns:
+            write_records_file(args.output, n, args.columns.split(','), args.seed, args.delimiter,
+                               args.header, **params)
+        else:
+            write_numbers_file(args.output, n, args.distribution, args.seed, args.format, **params)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+"""
+Consultas top-K: los K menores (o mayores) valores de un archivo sin ordenarlo.
+
+La entrada se recorre una sola vez por bloques (ver mmap_scan.py) y en
+memoria sólo se guardan los K mejores valores vistos hasta el momento, en una
+lista ordenada. Su último elemento es el umbral: de cada bloque se filtran
+primero, con una comprensión de listas, los valores que lo mejoran, y sólo
+esos candidatos se agregan y se vuelve a recortar la lista a K. Con datos
+aleatorios el umbral se estabiliza enseguida y casi ningún valor pasa el
+filtro, así que el costo es una comparación por registro.
+
+La memoria es O(K) más un bloque de lectura. Para K mayores que la memoria
+disponible, balanced_multiway_merge_sort (0003) y ExternalSort (0005)
+aceptan limit=K y recortan cada fusión a K registros; los K mayores se
+sacan del final de la corrida ordenada completa con write_largest().
+"""
+import os
+from array import array
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+from run_files import (RECORD_SIZE, TEXT, NumberWriter, default_block_records, iter_number_blocks,
+                       read_block)
+
+
+def select_top(blocks: Iterable[Sequence[int]], k: int, largest: bool = False) -> List[int]:
+    """
+    Los k menores valores de una secuencia de bloques, en orden ascendente
+    (o los k mayores, en orden descendente, si largest=True).
+    """
+    best = []
+    if k <= 0:
+        return best
+    for block in blocks:
+        if len(best) == k:
+            bound = best[-1]
+            if largest:
+                block = [value for value in block if value > bound]
+            else:
+                block = [value for value in block if value < bound]
+            if not block:
+                continue
+        best.extend(block)
+        best.sort(reverse=largest)
+        del best[k:]
+    return best
+
+
+def top_k(input_path: str, output_path: str, k: int, largest: bool = False,
+          input_format: str = TEXT, output_format: str = TEXT,
+          on_invalid: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Escribe en output_path los k menores valores de input_path en orden
+    ascendente, o los k mayores en orden descendente.
+
+    Args:
+        input_path: Archivo de enteros
+        output_path: Archivo de salida
+        k: Número de valores pedidos
+        largest: Si se piden los mayores en lugar de los menores
+        input_format, output_format: 'text' o 'binary'
+        on_invalid: Función que recibe las líneas no válidas de la entrada
+
+    Returns:
+        Diccionario con 'read' (registros de la entrada) y 'written'
+    """
+    read = 0
+
+    def counted(blocks):
+        nonlocal read
+        for block in blocks:
+            read += len(block)
+            yield block
+
+    best = select_top(counted(iter_number_blocks(input_path, input_format, on_invalid)), k, largest)
+    with NumberWriter(output_path, output_format) as writer:
+        writer.write_many(best)
+    return {'read': read, 'written': writer.count}
+
+
+def iter_tail_reversed(path: str, k: int, block_records: Optional[int] = None) -> Iterator[array]:
+    """
+    Itera por bloques, del último al primero, sobre los últimos k registros de
+    una corrida binaria sin comprimir; cada bloque viene invertido.
+    """
+    block_records = block_records or default_block_records()
+    end = os.path.getsize(path) // RECORD_SIZE
+    start = max(0, end - k)
+    with open(path, 'rb') as f:
+        while end > start:
+            lo = max(start, end - block_records)
+            f.seek(lo * RECORD_SIZE)
+            block = read_block(f, end - lo)
+            block.reverse()
+            yield block
+            end = lo
+
+
+def write_largest(sorted_path: str, output_path: str, k: int, output_format: str = TEXT) -> dict:
+    """
+    Escribe en output_path, en orden descendente, los k mayores valores de una
+    corrida binaria ordenada de forma ascendente (sin comprimir).
+
+    Returns:
+        Diccionario con 'read' y 'written' (registros copiados)
+    """
+    with NumberWriter(output_path, output_format) as writer:
+        for block in iter_tail_reversed(sorted_path, k):
+            writer.write_many(block)
+    return {'read': writer.count, 'written': writer.count}
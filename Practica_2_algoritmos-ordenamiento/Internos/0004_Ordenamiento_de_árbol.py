@@ -1,35 +1,234 @@
+from bisect import bisect_left, bisect_right, insort  # Búsqueda binaria en C sobre listas ordenadas
+from itertools import chain  # Recorrido de las hojas sin recursión
+
+DEFAULT_LOAD = 1000  # Elementos por hoja del contenedor ordenado (entre LOAD // 2 y 2 * LOAD)
+
 class Node:  # Define la clase Node para los nodos del árbol binario
+    __slots__ = ('key', 'left', 'right')  # Sin diccionario por nodo: menos memoria y acceso más rápido
+
     def __init__(self, key):  # Inicializa un nodo con una clave
         self.key = key  # Asigna el valor de la clave al nodo
         self.left = None  # Inicializa el hijo izquierdo como None
         self.right = None  # Inicializa el hijo derecho como None
 
-def insert(root, key):  # Inserta una clave en el árbol binario de búsqueda
+def insert(root, key):  # Inserta una clave en el árbol binario de búsqueda (sin balancear)
+    node = Node(key)  # Nuevo nodo con la clave
     if root is None:  # Si el árbol está vacío
-        return Node(key)  # Crea y retorna un nuevo nodo
-    if key < root.key:  # Si la clave es menor que la clave del nodo actual
-        root.left = insert(root.left, key)  # Inserta en el subárbol izquierdo
-    else:  # Si la clave es mayor o igual
-        root.right = insert(root.right, key)  # Inserta en el subárbol derecho
-    return root  # Retorna la raíz actualizada
-
-def inorder_traversal(root, result):  # Realiza un recorrido inorden del árbol
-    if root:  # Si el nodo no es None
-        inorder_traversal(root.left, result)  # Recorre el subárbol izquierdo
-        result.append(root.key)  # Agrega la clave del nodo a la lista resultado
-        inorder_traversal(root.right, result)  # Recorre el subárbol derecho
-
-def tree_sort(arr):  # Ordena una lista usando ordenamiento de árbol
-    root = None  # Inicializa la raíz del árbol como None
-    for key in arr:  # Recorre cada elemento de la lista
-        root = insert(root, key)  # Inserta el elemento en el árbol
-    result = []  # Inicializa la lista para el resultado ordenado
-    inorder_traversal(root, result)  # Realiza el recorrido inorden para ordenar
-    return result  # Retorna la lista ordenada
+        return node  # El nuevo nodo es la raíz
+    current = root  # Descender desde la raíz, sin recursión
+    while True:  # Hasta encontrar un hueco
+        if key < current.key:  # Si la clave es menor que la clave del nodo actual
+            if current.left is None:  # Hueco a la izquierda
+                current.left = node  # Colgar el nuevo nodo
+                return root  # Retorna la raíz sin cambios
+            current = current.left  # Seguir por el subárbol izquierdo
+        else:  # Si la clave es mayor o igual
+            if current.right is None:  # Hueco a la derecha
+                current.right = node  # Colgar el nuevo nodo
+                return root  # Retorna la raíz sin cambios
+            current = current.right  # Seguir por el subárbol derecho
+
+def inorder_traversal(root, result):  # Realiza un recorrido inorden del árbol con una pila explícita
+    stack = []  # Nodos cuyo subárbol izquierdo se está recorriendo
+    node = root  # Empezar por la raíz
+    while stack or node is not None:  # Mientras queden nodos por visitar
+        while node is not None:  # Bajar todo lo posible por la izquierda
+            stack.append(node)  # Recordar el nodo para visitarlo después
+            node = node.left  # Subárbol izquierdo
+        node = stack.pop()  # Nodo con el subárbol izquierdo ya recorrido
+        result.append(node.key)  # Agrega la clave del nodo a la lista resultado
+        node = node.right  # Recorre el subárbol derecho
+
+class SortedList:  # Contenedor ordenado: un árbol B de dos niveles sobre listas planas
+    """
+    Secuencia que se mantiene ordenada al insertar y borrar.
+
+    Los elementos viven en hojas (listas ordenadas de entre load // 2 y
+    2 * load elementos) y un índice guarda la clave máxima de cada hoja: una
+    búsqueda es un bisect en el índice y otro en la hoja, ambos en C, y una
+    inserción sólo desplaza los elementos de una hoja. Con key= se ordena por
+    key(elemento); a igual clave se conserva el orden de llegada.
+    """
+    __slots__ = ('_lists', '_keys', '_maxes', '_key', '_len', '_load')  # Sin diccionario por instancia
+
+    def __init__(self, iterable=(), key=None, load=DEFAULT_LOAD):  # Crea el contenedor con una carga inicial
+        self._key = key  # Función de clave (None para comparar los elementos)
+        self._load = load  # Tamaño de referencia de las hojas
+        self._bulk_load(sorted(iterable, key=key))  # Carga masiva de los elementos ya ordenados
+
+    @classmethod
+    def from_sorted(cls, iterable, key=None, load=DEFAULT_LOAD):  # Carga masiva en O(n) de datos ya ordenados
+        values = list(iterable)  # Elementos en el orden recibido
+        container = cls(key=key, load=load)  # Contenedor vacío
+        keys = values if key is None else [key(value) for value in values]  # Claves de los elementos
+        if any(keys[i + 1] < keys[i] for i in range(len(keys) - 1)):  # Comprobar el orden en una pasada
+            raise ValueError("from_sorted necesita los elementos en orden ascendente")  # No estaban ordenados
+        container._bulk_load(values, keys)  # Repartir en hojas sin ordenar
+        return container  # Contenedor listo
+
+    def _bulk_load(self, values, keys=None):  # Reparte elementos ordenados en hojas de load elementos
+        load = self._load  # Tamaño de cada hoja
+        self._lists = [values[i:i + load] for i in range(0, len(values), load)]  # Hojas de elementos
+        if self._key is None:  # Sin key, las claves son los propios elementos
+            self._keys = self._lists  # Mismas hojas
+        else:  # Con key, hojas de claves paralelas
+            keys = keys if keys is not None else [self._key(value) for value in values]  # Claves una vez
+            self._keys = [keys[i:i + load] for i in range(0, len(keys), load)]  # Hojas de claves
+        self._maxes = [leaf[-1] for leaf in self._keys]  # Índice: clave máxima de cada hoja
+        self._len = len(values)  # Número de elementos
+
+    def __len__(self):  # Número de elementos
+        return self._len  # Contador mantenido en cada operación
+
+    def __iter__(self):  # Recorrido en orden, sin recursión
+        return chain.from_iterable(self._lists)  # Hoja tras hoja
+
+    def __reversed__(self):  # Recorrido en orden inverso
+        return chain.from_iterable(reversed(leaf) for leaf in reversed(self._lists))  # Hojas al revés
+
+    def __repr__(self):  # Representación legible
+        return f"SortedList({list(self)!r})"  # Elementos en orden
+
+    def __getitem__(self, index):  # Elemento por posición (o una rebanada como lista)
+        if isinstance(index, slice):  # Rebanada
+            return list(self)[index]  # Lista con los elementos pedidos
+        if index < 0:  # Índices negativos desde el final
+            index += self._len  # Posición equivalente
+        if not 0 <= index < self._len:  # Fuera de rango
+            raise IndexError("índice fuera de rango")  # Error como en las listas
+        for leaf in self._lists:  # Saltar hojas completas
+            if index < len(leaf):  # El elemento está en esta hoja
+                return leaf[index]  # Elemento pedido
+            index -= len(leaf)  # Descontar la hoja
+
+    def _key_of(self, value):  # Clave de un elemento
+        return value if self._key is None else self._key(value)  # El propio elemento o key(elemento)
+
+    def add(self, value):  # Inserta un elemento en su lugar (tras los de igual clave)
+        key = self._key_of(value)  # Clave del elemento
+        if not self._maxes:  # Contenedor vacío: primera hoja
+            self._lists.append([value])  # Hoja con el elemento
+            if self._key is not None:  # Con key, hoja de claves paralela
+                self._keys.append([key])  # Hoja con la clave
+            self._maxes.append(key)  # Índice de la hoja
+        else:  # Buscar la hoja en el índice
+            i = bisect_right(self._maxes, key)  # Primera hoja cuya máxima supera la clave
+            if i == len(self._maxes):  # Mayor o igual que todo: al final de la última hoja
+                i -= 1  # Última hoja
+                self._lists[i].append(value)  # Agregar al final
+                if self._key is not None:  # Con key, también la clave
+                    self._keys[i].append(key)  # Agregar la clave
+                self._maxes[i] = key  # Nueva máxima de la hoja
+            elif self._key is None:  # Sin key, inserción directa en la hoja
+                insort(self._lists[i], value)  # Tras los iguales (estable)
+            else:  # Con key, posición por la hoja de claves
+                j = bisect_right(self._keys[i], key)  # Tras las claves iguales (estable)
+                self._keys[i].insert(j, key)  # Insertar la clave
+                self._lists[i].insert(j, value)  # Insertar el elemento
+            self._split(i)  # Partir la hoja si creció demasiado
+        self._len += 1  # Un elemento más
+
+    def update(self, iterable):  # Inserta muchos elementos
+        values = list(iterable)  # Elementos nuevos
+        if len(values) * 8 >= self._len:  # Muchos en proporción: recargar todo es más rápido
+            merged = list(self) + values  # Elementos actuales (en orden) y los nuevos
+            merged.sort(key=self._key)  # Estable: los actuales van antes que los nuevos de igual clave
+            self._bulk_load(merged)  # Volver a repartir en hojas
+        else:  # Pocos: inserción uno a uno
+            for value in values:  # Cada elemento nuevo
+                self.add(value)  # Insertar en su lugar
+
+    def _split(self, i):  # Parte la hoja i en dos si superó 2 * load elementos
+        load = self._load  # Tamaño de referencia
+        if len(self._lists[i]) <= 2 * load:  # Tamaño aceptable
+            return  # Nada que hacer
+        self._lists.insert(i + 1, self._lists[i][load:])  # Segunda mitad como hoja nueva
+        del self._lists[i][load:]  # Recortar la primera mitad
+        if self._key is not None:  # Con key, partir también las claves
+            self._keys.insert(i + 1, self._keys[i][load:])  # Segunda mitad de las claves
+            del self._keys[i][load:]  # Recortar la primera mitad
+        self._maxes[i] = self._keys[i][-1]  # Nueva máxima de la primera mitad
+        self._maxes.insert(i + 1, self._keys[i + 1][-1])  # Máxima de la hoja nueva
+
+    def _find(self, value):  # Posición (hoja, índice) de un elemento igual a value, o None
+        key = self._key_of(value)  # Clave a buscar
+        i = bisect_left(self._maxes, key)  # Primera hoja que puede contenerla
+        while i < len(self._maxes):  # Los iguales pueden seguir en las hojas siguientes
+            keys = self._keys[i]  # Claves de la hoja
+            j = bisect_left(keys, key)  # Primera clave igual o mayor
+            while j < len(keys) and not key < keys[j]:  # Recorrer las claves iguales
+                if self._lists[i][j] == value:  # Elemento encontrado
+                    return i, j  # Posición
+                j += 1  # Siguiente con la misma clave
+            if j < len(keys):  # Se llegó a una clave mayor: no está
+                return None  # No encontrado
+            i += 1  # Seguir en la siguiente hoja
+        return None  # No encontrado
+
+    def __contains__(self, value):  # Pertenencia en O(log n)
+        return self._find(value) is not None  # Está si se encuentra su posición
+
+    def discard(self, value):  # Borra un elemento igual a value, si existe
+        position = self._find(value)  # Buscar su posición
+        if position is None:  # No está
+            return False  # No se borró nada
+        i, j = position  # Hoja e índice
+        del self._lists[i][j]  # Borrar el elemento
+        if self._key is not None:  # Con key, borrar también su clave
+            del self._keys[i][j]  # Borrar la clave
+        self._len -= 1  # Un elemento menos
+        if not self._lists[i]:  # Hoja vacía: se elimina
+            del self._lists[i]  # Quitar la hoja
+            if self._key is not None:  # Y su hoja de claves
+                del self._keys[i]  # Quitar las claves
+            del self._maxes[i]  # Y su entrada del índice
+        else:  # La hoja sigue
+            self._maxes[i] = self._keys[i][-1]  # Actualizar su máxima
+            if len(self._lists[i]) < self._load // 2 and len(self._lists) > 1:  # Hoja demasiado pequeña
+                self._join(i - 1 if i > 0 else 0)  # Unirla con una vecina
+        return True  # Se borró
+
+    def remove(self, value):  # Borra un elemento igual a value; ValueError si no existe
+        if not self.discard(value):  # No estaba
+            raise ValueError(f"{value!r} no está en el contenedor")  # Error como list.remove
+
+    def _join(self, i):  # Une las hojas i e i + 1 (y vuelve a partir si hace falta)
+        self._lists[i].extend(self._lists.pop(i + 1))  # Unir los elementos
+        if self._key is not None:  # Con key, unir también las claves
+            self._keys[i].extend(self._keys.pop(i + 1))  # Unir las claves
+        del self._maxes[i + 1]  # Quitar la entrada de la hoja unida
+        self._maxes[i] = self._keys[i][-1]  # Máxima de la hoja resultante
+        self._split(i)  # Partir si quedó demasiado grande
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):  # Recorre las claves entre minimum y maximum
+        low = bisect_left if inclusive[0] else bisect_right  # Con el mínimo incluido o excluido
+        high = bisect_right if inclusive[1] else bisect_left  # Con el máximo incluido o excluido
+        i = 0 if minimum is None else low(self._maxes, minimum)  # Primera hoja del rango
+        start = 0 if minimum is None or i == len(self._maxes) else low(self._keys[i], minimum)  # Posición en esa hoja
+        while i < len(self._lists):  # Hoja a hoja, sin recursión
+            keys = self._keys[i]  # Claves de la hoja
+            end = len(keys) if maximum is None else high(keys, maximum)  # Fin del rango en esta hoja
+            yield from self._lists[i][start:end]  # Elementos del rango
+            if end < len(keys):  # El rango termina en esta hoja
+                return  # Fin del recorrido
+            i += 1  # Siguiente hoja
+            start = 0  # Las hojas siguientes empiezan desde el principio
+
+def tree_sort(arr, key=None):  # Ordena una lista insertando sus elementos en el contenedor balanceado
+    tree = SortedList(key=key)  # Contenedor vacío: cada inserción cuesta O(log n)
+    for item in arr:  # Recorre cada elemento de la lista
+        tree.add(item)  # Inserta el elemento en su lugar (estable a igual clave)
+    return list(tree)  # Retorna la lista ordenada
 
 # Ejemplo de uso    #Punto de entrada del script
 if __name__ == "__main__":  # Verifica si el script se ejecuta directamente
     datos = [5, 3, 7, 2, 4, 6, 8]  # Lista de datos a ordenar
     print("Lista original:", datos)  # Imprime la lista original
     ordenada = tree_sort(datos)  # Ordena la lista usando tree_sort
-    print("Lista ordenada:", ordenada)  # Imprime la lista ordenada
\ No newline at end of file
+    print("Lista ordenada:", ordenada)  # Imprime la lista ordenada
+    vista = SortedList.from_sorted(ordenada)  # Vista ordenada cargada de una vez
+    vista.add(5)  # Llega un nuevo dato
+    vista.remove(2)  # Se retira otro
+    print("Vista ordenada:", list(vista), "entre 4 y 6:", list(vista.irange(4, 6)))  # Recorrido por rango
+# El contenedor SortedList mantiene los datos ordenados en hojas de tamaño acotado con un índice de
+# máximos, de modo que insertar, borrar y buscar cuestan O(log n) sin importar el orden de llegada.
@@ -1,33 +1,127 @@
-def quicksort(arr): # Implementa el algoritmo de ordenamiento QuickSort de manera recursiva.
-    """Ordena una lista usando el algoritmo QuickSort."""
-    # Si la lista tiene 0 o 1 elementos, ya está ordenada.
-    # Si la lista está vacía o tiene un solo elemento, retorna la lista tal cual.
-    # Selecciona un pivote y divide la lista en tres partes: menores, iguales y mayores que el pivote.
-    # Si la lista tiene un solo elemento o está vacía, retorna la lista sin cambios.
-    if len(arr) <= 1:   # Verifica si la lista tiene un solo elemento o está vacía.
-        return arr  # Retorna la lista tal cual si tiene 0 o 1 elementos.
-    # Selecciona el pivote como el elemento del medio de la lista.
-    # Selecciona el elemento del medio como pivote.
-    pivot = arr[len(arr) // 2]  # Selecciona el pivote como el elemento del medio de la lista.
-    # Divide la lista en tres partes: menores, iguales y mayores que el pivote.
-    # Crea una lista de elementos menores que el pivote.
-    # Crea una lista de elementos iguales al pivote.
-    # Crea una lista de elementos mayores que el pivote.
-    # Divide la lista en tres partes: menores, iguales y mayores que el pivote.
-    left = [x for x in arr if x < pivot]    # Crea una lista de elementos menores que el pivote.
-    middle = [x for x in arr if x == pivot] # Crea una lista de elementos iguales al pivote.
-    right = [x for x in arr if x > pivot]   # Crea una lista de elementos mayores que el pivote.
-    return quicksort(left) + middle + quicksort(right)  # Retorna la lista ordenada concatenando las listas menores, iguales y mayores que el pivote.
+INSERTION_CUTOFF = 16  # Rangos de este tamaño o menores se ordenan por inserción
+NINTHER_THRESHOLD = 128     # A partir de este tamaño el pivote es la mediana de nueve (ninther)
+
+def _swap(keys, items, i, j):  # Intercambia dos posiciones de las claves (y de los elementos, si van aparte)
+    keys[i], keys[j] = keys[j], keys[i]     # Intercambiar las claves
+    if items is not None:   # Con key= los elementos se mueven junto con sus claves
+        items[i], items[j] = items[j], items[i]     # Intercambiar los elementos
+
+def _insertion_sort(keys, items, lo, hi):   # Ordenamiento por inserción del rango [lo, hi)
+    for i in range(lo + 1, hi):     # Recorre el rango desde el segundo elemento
+        key = keys[i]   # Clave a insertar
+        item = items[i] if items is not None else None  # Elemento que la acompaña
+        j = i - 1   # Índice anterior
+        while j >= lo and key < keys[j]:    # Desplazar las claves mayores una posición adelante
+            keys[j + 1] = keys[j]   # Mover la clave
+            if items is not None:   # Y su elemento
+                items[j + 1] = items[j]     # Mover el elemento
+            j -= 1  # Comparar con la anterior
+        keys[j + 1] = key   # Insertar la clave en su lugar
+        if items is not None:   # Y su elemento
+            items[j + 1] = item     # Insertar el elemento
+
+def _median_of_three(keys, a, b, c):    # Índice de la mediana de tres posiciones (sólo usa <)
+    if keys[a] < keys[b]:   # a < b
+        if keys[b] < keys[c]:   # a < b < c
+            return b    # La mediana es b
+        return c if keys[a] < keys[c] else a    # c <= b: la mediana es el mayor entre a y c
+    if keys[a] < keys[c]:   # b <= a < c
+        return a    # La mediana es a
+    return c if keys[b] < keys[c] else b    # c <= a: la mediana es el mayor entre b y c
+
+def _choose_pivot(keys, lo, hi):    # Índice del pivote: mediana de tres, o ninther en rangos grandes
+    mid = (lo + hi) // 2    # Centro del rango
+    last = hi - 1   # Último índice del rango
+    if hi - lo < NINTHER_THRESHOLD:     # Rangos medianos: mediana del primero, el central y el último
+        return _median_of_three(keys, lo, mid, last)    # Pivote
+    step = (hi - lo) // 8   # Separación entre las muestras
+    # Ninther de Tukey: mediana de las medianas de tres grupos de tres
+    return _median_of_three(keys,
+                            _median_of_three(keys, lo, lo + step, lo + 2 * step),   # Grupo del principio
+                            _median_of_three(keys, mid - step, mid, mid + step),    # Grupo del centro
+                            _median_of_three(keys, last - 2 * step, last - step, last))     # Grupo del final
+
+def _partition3(keys, items, lo, hi, p):    # Partición en tres (Dijkstra) del rango [lo, hi) alrededor de keys[p]
+    pivot = keys[p]     # Clave del pivote
+    lt, i, gt = lo, lo, hi  # [lo, lt) < pivote, [lt, i) == pivote, [gt, hi) > pivote
+    while i < gt:   # Mientras queden claves sin clasificar
+        key = keys[i]   # Clave actual
+        if key < pivot:     # Menor que el pivote: a la zona izquierda
+            _swap(keys, items, lt, i)   # Mover al final de la zona de menores
+            lt += 1     # Crece la zona de menores
+            i += 1  # Siguiente clave
+        elif pivot < key:   # Mayor que el pivote: a la zona derecha
+            gt -= 1     # Crece la zona de mayores
+            _swap(keys, items, i, gt)   # La clave que llega a i todavía no se ha clasificado
+        else:   # Igual al pivote: se queda en el centro
+            i += 1  # Siguiente clave
+    return lt, gt   # Límites de la zona de iguales, que ya no hace falta ordenar
+
+def _sift_down(keys, items, lo, root, end):     # Hunde la raíz de un montículo de máximos en [lo, end)
+    while True:     # Mientras el nodo tenga hijos
+        child = lo + 2 * (root - lo) + 1    # Hijo izquierdo
+        if child >= end:    # Sin hijos: fin
+            return  # El montículo está en orden
+        if child + 1 < end and keys[child] < keys[child + 1]:   # El hijo derecho es mayor
+            child += 1  # Se compara con el mayor de los hijos
+        if not keys[root] < keys[child]:    # La raíz ya es mayor o igual que sus hijos
+            return  # El montículo está en orden
+        _swap(keys, items, root, child)     # Subir al hijo mayor
+        root = child    # Seguir hundiendo desde el hijo
+
+def _heapsort(keys, items, lo, hi):     # Heapsort del rango [lo, hi): O(n log n) garantizado
+    for root in range((lo + hi) // 2 - 1, lo - 1, -1):  # Construir el montículo de abajo hacia arriba
+        _sift_down(keys, items, lo, root, hi)   # Hundir cada nodo interno
+    for end in range(hi - 1, lo, -1):   # Extraer el máximo una y otra vez
+        _swap(keys, items, lo, end)     # El máximo va al final de la zona sin ordenar
+        _sift_down(keys, items, lo, lo, end)    # Restaurar el montículo
+
+def _introsort(keys, items, lo, hi):    # Introsort iterativo del rango [lo, hi)
+    depth_limit = 2 * max(hi - lo, 1).bit_length()  # Profundidad máxima antes de pasar a heapsort
+    stack = [(lo, hi, depth_limit)]     # Pila explícita de rangos pendientes (sin recursión)
+    while stack:    # Mientras queden rangos por ordenar
+        lo, hi, depth = stack.pop()     # Siguiente rango
+        while hi - lo > INSERTION_CUTOFF:   # Rangos grandes: partir
+            if depth == 0:  # Demasiadas particiones malas: el pivote no está funcionando
+                _heapsort(keys, items, lo, hi)  # Heapsort evita el peor caso cuadrático
+                break   # El rango ya está ordenado
+            depth -= 1  # Una partición más en esta rama
+            lt, gt = _partition3(keys, items, lo, hi, _choose_pivot(keys, lo, hi))  # Partición en tres
+            # Se apila la parte más grande y se sigue con la más pequeña: la pila queda en O(log n)
+            if lt - lo < hi - gt:   # La parte izquierda es la más pequeña
+                stack.append((gt, hi, depth))   # Derecha pendiente
+                hi = lt     # Continuar con la izquierda
+            else:   # La parte derecha es la más pequeña
+                stack.append((lo, lt, depth))   # Izquierda pendiente
+                lo = gt     # Continuar con la derecha
+        else:   # El rango es pequeño (no se pasó a heapsort)
+            _insertion_sort(keys, items, lo, hi)    # Inserción en rangos cortos
+
+def quicksort(arr, key=None, lo=0, hi=None):    # QuickSort en su lugar (introsort) sobre una lista o un arreglo de NumPy
+    """
+    Ordena arr[lo:hi] en su lugar y devuelve arr. Con key= se ordena por
+    key(elemento), que se calcula una sola vez por elemento. No es estable.
+    """
+    if hi is None:  # Por defecto, hasta el final
+        hi = len(arr)   # Último índice (exclusivo)
+    if hi - lo < 2:     # Rangos de 0 o 1 elementos ya están ordenados
+        return arr  # Nada que hacer
+    if key is None:     # Sin key, se ordenan los propios elementos
+        _introsort(arr, None, lo, hi)   # Ordenar en su lugar
+        return arr  # Retorna el mismo arreglo, ya ordenado
+    items = list(arr[lo:hi])    # Elementos del rango
+    keys = [key(item) for item in items]    # Claves calculadas una vez
+    _introsort(keys, items, 0, len(items))  # Ordenar las claves moviendo sus elementos
+    arr[lo:hi] = items  # Copiar el rango ordenado de vuelta de una sola vez
+    return arr  # Retorna el mismo arreglo, ya ordenado
 
 if __name__ == "__main__":  # Punto de entrada del script
     datos = [33, 10, 55, 71, 29, 3, 18, 42] # Lista de datos a ordenar
     print("Lista original:", datos) # Imprime la lista original
     ordenada = quicksort(datos) # Ordena la lista usando quicksort
     print("Lista ordenada:", ordenada)  # Imprime la lista ordenada
-# Este código implementa el algoritmo de ordenamiento QuickSort de manera recursiva.
-# El algoritmo selecciona un pivote y divide la lista en tres partes: menores, iguales y mayores que el pivote.
-# Luego, ordena recursivamente las listas menores y mayores, y finalmente concatena las listas para obtener la lista ordenada.
-# Este código implementa el algoritmo de ordenamiento QuickSort de manera recursiva.
-# El algoritmo selecciona un pivote y divide la lista en tres partes: menores, iguales y mayores que el pivote.
-# Luego, ordena recursivamente las listas menores y mayores, y finalmente concatena las listas para obtener la lista ordenada.
-# Este código implementa el algoritmo de ordenamiento QuickSort de manera recursiva.
\ No newline at end of file
+    palabras = ["pera", "Uva", "manzana", "kiwi"]   # Palabras de ejemplo
+    print("Por longitud:", quicksort(palabras, key=len))    # Ordena por una clave calculada
+# Este código implementa QuickSort en su lugar al estilo introsort: pivote por mediana de tres
+# (o ninther en rangos grandes), partición en tres zonas para los valores repetidos, inserción en
+# rangos pequeños, una pila explícita en lugar de recursión y heapsort si la profundidad se dispara.
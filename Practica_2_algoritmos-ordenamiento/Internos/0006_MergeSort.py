@@ -1,40 +1,198 @@
-def merge_sort(arr): # Definir la función de ordenamiento por mezcla (Merge Sort)
-    
-    if len(arr) > 1:    # Verifica si el arreglo tiene más de un elemento
-        mid = len(arr) // 2 # Encuentra el punto medio del arreglo
-        left_half = arr[:mid]   # Divide el arreglo en dos mitades
-        right_half = arr[mid:]      # Divide el arreglo en dos mitades
-
-        # Recursively sort both halves  #   Ordena recursivamente ambas mitades
-        merge_sort(left_half)   # Ordena la mitad izquierda
-        merge_sort(right_half)  # Ordena la mitad derecha
-
-        # Merge the sorted halves   # Combina las dos mitades ordenadas
-        i = j = k = 0   # Inicializa los índices para las mitades y el arreglo original
-
-        # Copy data to temp arrays left_half[] and right_half[]
-        while i < len(left_half) and j < len(right_half):   # Mientras haya elementos en ambas mitades
-            if left_half[i] < right_half[j]:    # Compara los elementos de ambas mitades
-                arr[k] = left_half[i]   # Si el elemento de la mitad izquierda es menor
-                i += 1  # Incrementa el índice de la mitad izquierda
-            else:   # Si el elemento de la mitad derecha es menor o igual
-                arr[k] = right_half[j]  # Asigna el elemento de la mitad derecha al arreglo original
-                j += 1  # Incrementa el índice de la mitad derecha
-            k += 1  # Incrementa el índice del arreglo original
-
-        # Checking if any element was left  # Verifica si quedan elementos en alguna de las mitades
-        while i < len(left_half):   # Si quedan elementos en la mitad izquierda
-            arr[k] = left_half[i]   # Asigna el elemento restante al arreglo original
-            i += 1  # Incrementa el índice de la mitad izquierda
-            k += 1  # Incrementa el índice del arreglo original
-
-        while j < len(right_half):  # Si quedan elementos en la mitad derecha
-            arr[k] = right_half[j]  # Asigna el elemento restante al arreglo original
-            j += 1  # Incrementa el índice de la mitad derecha
-            k += 1  # Incrementa el índice del arreglo original
+from bisect import bisect_left, bisect_right     # Búsqueda binaria en C para el galope y la inserción
+
+MIN_GALLOP = 7  # Victorias seguidas de una corrida antes de pasar al modo galope
+
+def _min_run(n):    # Longitud mínima de corrida, como en Timsort (entre 32 y 64)
+    extra = 0   # Se vuelve 1 si alguno de los bits descartados está activo
+    while n >= 64:  # Quedarse con los 6 bits más altos de n
+        extra |= n & 1  # Recordar si se descarta un bit activo
+        n >>= 1     # Descartar el bit más bajo
+    return n + extra    # n / min_run queda cerca de una potencia de 2
+
+def _reverse(keys, items, lo, hi):  # Invierte el rango [lo, hi) de las claves (y de los elementos)
+    keys[lo:hi] = keys[lo:hi][::-1]     # Invertir las claves
+    if items is not None:   # Con key= los elementos acompañan a sus claves
+        items[lo:hi] = items[lo:hi][::-1]   # Invertir los elementos
+
+def _count_run(keys, items, lo, hi):    # Fin de la corrida natural que empieza en lo
+    run_hi = lo + 1     # Una corrida tiene al menos un elemento
+    if run_hi == hi:    # Último elemento
+        return hi   # Corrida de un elemento
+    run_hi += 1     # Las dos primeras claves deciden el sentido
+    if keys[lo + 1] < keys[lo]:     # Descendente estricta (estricta para no desordenar los iguales)
+        while run_hi < hi and keys[run_hi] < keys[run_hi - 1]:  # Mientras siga bajando
+            run_hi += 1     # Extender la corrida
+        _reverse(keys, items, lo, run_hi)   # Darle la vuelta para que quede ascendente
+    else:   # Ascendente (no decreciente)
+        while run_hi < hi and not keys[run_hi] < keys[run_hi - 1]:  # Mientras no baje
+            run_hi += 1     # Extender la corrida
+    return run_hi   # Fin (exclusivo) de la corrida
+
+def _binary_insertion_sort(keys, items, lo, hi, start):     # Inserción binaria estable de [start, hi) en [lo, start) ya ordenado
+    for i in range(start, hi):  # Cada elemento por insertar
+        key = keys[i]   # Clave a insertar
+        pos = bisect_right(keys, key, lo, i)    # Tras los iguales: conserva la estabilidad
+        if pos < i:     # Hay que desplazar
+            keys[pos + 1:i + 1] = keys[pos:i]   # Desplazar el bloque de una sola vez
+            keys[pos] = key     # Insertar la clave
+            if items is not None:   # Y su elemento
+                item = items[i]     # Elemento a insertar
+                items[pos + 1:i + 1] = items[pos:i]     # Desplazar los elementos
+                items[pos] = item   # Insertar el elemento
+
+def _merge_lo(keys, items, buf_keys, buf_items, lo, mid, hi):   # Fusión cuando la corrida izquierda es la más corta
+    n_a = mid - lo  # Longitud de la corrida izquierda
+    buf_keys[:n_a] = keys[lo:mid]   # Copiar la izquierda al búfer auxiliar
+    if items is not None:   # Y sus elementos
+        buf_items[:n_a] = items[lo:mid]     # Copiar los elementos
+    i, j, k = 0, mid, lo    # i recorre el búfer, j la corrida derecha, k el destino
+    wins_a = wins_b = 0     # Victorias seguidas de cada corrida
+    while i < n_a and j < hi:   # Mientras queden elementos en ambas
+        if keys[j] < buf_keys[i]:   # La derecha es estrictamente menor (a igualdad gana la izquierda: estable)
+            keys[k] = keys[j]   # Tomar de la derecha
+            if items is not None:   # Y su elemento
+                items[k] = items[j]     # Mover el elemento
+            j += 1  # Siguiente de la derecha
+            k += 1  # Siguiente destino
+            wins_b += 1     # La derecha suma una victoria
+            wins_a = 0  # Se corta la racha de la izquierda
+            if wins_b >= MIN_GALLOP:    # La derecha domina: galope
+                end = bisect_left(keys, buf_keys[i], j, hi)     # Todos los menores que la clave pendiente del búfer
+                count = end - j     # Cuántos se copian de un tirón
+                keys[k:k + count] = keys[j:end]     # Copiar el bloque
+                if items is not None:   # Y sus elementos
+                    items[k:k + count] = items[j:end]   # Copiar los elementos
+                j, k = end, k + count   # Avanzar
+                wins_b = 0  # Volver al modo normal
+        else:   # La izquierda es menor o igual
+            keys[k] = buf_keys[i]   # Tomar del búfer
+            if items is not None:   # Y su elemento
+                items[k] = buf_items[i]     # Mover el elemento
+            i += 1  # Siguiente del búfer
+            k += 1  # Siguiente destino
+            wins_a += 1     # La izquierda suma una victoria
+            wins_b = 0  # Se corta la racha de la derecha
+            if wins_a >= MIN_GALLOP:    # La izquierda domina: galope
+                end = bisect_right(buf_keys, keys[j], i, n_a)   # Todos los menores o iguales que la clave pendiente
+                count = end - i     # Cuántos se copian de un tirón
+                keys[k:k + count] = buf_keys[i:end]     # Copiar el bloque
+                if items is not None:   # Y sus elementos
+                    items[k:k + count] = buf_items[i:end]   # Copiar los elementos
+                i, k = end, k + count   # Avanzar
+                wins_a = 0  # Volver al modo normal
+    if i < n_a:     # Lo que queda del búfer va al final (lo que queda de la derecha ya está en su sitio)
+        keys[k:k + n_a - i] = buf_keys[i:n_a]   # Copiar el resto de claves
+        if items is not None:   # Y sus elementos
+            items[k:k + n_a - i] = buf_items[i:n_a]     # Copiar el resto de elementos
+
+def _merge_hi(keys, items, buf_keys, buf_items, lo, mid, hi):   # Fusión desde el final cuando la derecha es la más corta
+    n_b = hi - mid  # Longitud de la corrida derecha
+    buf_keys[:n_b] = keys[mid:hi]   # Copiar la derecha al búfer auxiliar
+    if items is not None:   # Y sus elementos
+        buf_items[:n_b] = items[mid:hi]     # Copiar los elementos
+    i, j, k = mid - 1, n_b - 1, hi - 1  # i recorre la izquierda, j el búfer, k el destino (de atrás hacia adelante)
+    wins_a = wins_b = 0     # Victorias seguidas de cada corrida
+    while i >= lo and j >= 0:   # Mientras queden elementos en ambas
+        if buf_keys[j] < keys[i]:   # La izquierda es estrictamente mayor (a igualdad va detrás la derecha: estable)
+            keys[k] = keys[i]   # Tomar de la izquierda
+            if items is not None:   # Y su elemento
+                items[k] = items[i]     # Mover el elemento
+            i -= 1  # Anterior de la izquierda
+            k -= 1  # Destino anterior
+            wins_a += 1     # La izquierda suma una victoria
+            wins_b = 0  # Se corta la racha de la derecha
+            if wins_a >= MIN_GALLOP:    # La izquierda domina: galope
+                start = bisect_right(keys, buf_keys[j], lo, i + 1)  # Todos los mayores que la clave pendiente del búfer
+                count = i + 1 - start   # Cuántos se copian de un tirón
+                keys[k - count + 1:k + 1] = keys[start:i + 1]   # Copiar el bloque
+                if items is not None:   # Y sus elementos
+                    items[k - count + 1:k + 1] = items[start:i + 1]     # Copiar los elementos
+                i, k = start - 1, k - count     # Retroceder
+                wins_a = 0  # Volver al modo normal
+        else:   # La derecha es mayor o igual
+            keys[k] = buf_keys[j]   # Tomar del búfer
+            if items is not None:   # Y su elemento
+                items[k] = buf_items[j]     # Mover el elemento
+            j -= 1  # Anterior del búfer
+            k -= 1  # Destino anterior
+            wins_b += 1     # La derecha suma una victoria
+            wins_a = 0  # Se corta la racha de la izquierda
+            if wins_b >= MIN_GALLOP:    # La derecha domina: galope
+                start = bisect_left(buf_keys, keys[i], 0, j + 1)    # Todos los mayores o iguales que la clave pendiente
+                count = j + 1 - start   # Cuántos se copian de un tirón
+                keys[k - count + 1:k + 1] = buf_keys[start:j + 1]   # Copiar el bloque
+                if items is not None:   # Y sus elementos
+                    items[k - count + 1:k + 1] = buf_items[start:j + 1]     # Copiar los elementos
+                j, k = start - 1, k - count     # Retroceder
+                wins_b = 0  # Volver al modo normal
+    if j >= 0:  # Lo que queda del búfer va al principio (lo que queda de la izquierda ya está en su sitio)
+        keys[lo:lo + j + 1] = buf_keys[:j + 1]  # Copiar el resto de claves
+        if items is not None:   # Y sus elementos
+            items[lo:lo + j + 1] = buf_items[:j + 1]    # Copiar el resto de elementos
+
+def _merge(keys, items, buf_keys, buf_items, lo, mid, hi):  # Fusiona las corridas adyacentes [lo, mid) y [mid, hi)
+    # Los primeros de la izquierda que no superan al primero de la derecha ya están en su lugar
+    lo = bisect_right(keys, keys[mid], lo, mid)     # Saltar ese prefijo
+    if lo == mid:   # La izquierda completa va antes que la derecha
+        return  # Ya están fusionadas
+    # Los últimos de la derecha que no son menores que el último de la izquierda también
+    hi = bisect_left(keys, keys[mid - 1], mid, hi)  # Descartar ese sufijo
+    if mid - lo <= hi - mid:    # El búfer guarda la corrida más corta
+        _merge_lo(keys, items, buf_keys, buf_items, lo, mid, hi)    # Fusión de adelante hacia atrás
+    else:   # La derecha es la más corta
+        _merge_hi(keys, items, buf_keys, buf_items, lo, mid, hi)    # Fusión de atrás hacia adelante
+
+def merge_sort(arr, key=None):  # Merge Sort ascendente (de abajo hacia arriba) estable y en su lugar
+    """
+    Ordena arr en su lugar de forma estable y devuelve arr. Aprovecha las
+    corridas ya ordenadas (ascendentes o descendentes) y usa un único búfer
+    auxiliar de n // 2 posiciones. Con key= se ordena por key(elemento),
+    que se calcula una sola vez por elemento.
+    """
+    n = len(arr)    # Número de elementos
+    if n < 2:   # 0 o 1 elementos ya están ordenados
+        return arr  # Nada que hacer
+    if key is None:     # Se ordenan los propios elementos
+        keys, items = arr, None     # Las claves son los elementos
+    else:   # Se ordenan las claves y los elementos las acompañan
+        keys, items = [key(item) for item in arr], list(arr)    # Claves calculadas una vez
+
+    # 1. Corridas naturales, extendidas por inserción binaria hasta min_run elementos
+    min_run = _min_run(n)   # Longitud mínima de corrida
+    bounds = [0]    # Límites de las corridas
+    lo = 0  # Inicio de la corrida actual
+    while lo < n:   # Mientras quede arreglo por recorrer
+        run_hi = _count_run(keys, items, lo, n)     # Fin de la corrida natural
+        if run_hi - lo < min_run:   # Corrida demasiado corta
+            forced = min(lo + min_run, n)   # Extenderla hasta min_run elementos
+            _binary_insertion_sort(keys, items, lo, forced, run_hi)     # Ordenar la extensión
+            run_hi = forced     # Nuevo fin de la corrida
+        bounds.append(run_hi)   # Registrar el límite
+        lo = run_hi     # Siguiente corrida
+
+    # 2. Fusiones de corridas adyacentes de dos en dos, nivel a nivel, con un solo búfer
+    buf_keys = [None] * (n // 2)    # Búfer auxiliar: la corrida más corta de una fusión nunca supera n // 2
+    buf_items = [None] * (n // 2) if items is not None else None    # Búfer de los elementos
+    while len(bounds) > 2:  # Mientras quede más de una corrida
+        merged = [0]    # Límites del siguiente nivel
+        for r in range(0, len(bounds) - 2, 2):  # Pares de corridas adyacentes
+            _merge(keys, items, buf_keys, buf_items, bounds[r], bounds[r + 1], bounds[r + 2])   # Fusionar el par
+            merged.append(bounds[r + 2])    # La fusión ocupa ambos rangos
+        if len(bounds) % 2 == 0:    # Número impar de corridas: la última pasa sin fusionar
+            merged.append(bounds[-1])   # Conservar su límite
+        bounds = merged     # Subir de nivel
+
+    if items is not None:   # Con key=, copiar los elementos ordenados de vuelta de una sola vez
+        arr[:] = items  # Mismo objeto lista, ahora ordenado
+    return arr  # Retorna el mismo arreglo, ya ordenado
 
 if __name__ == "__main__":  # Punto de entrada del script
     arr = [38, 27, 43, 3, 9, 82, 10]    # Lista de ejemplo para ordenar
     print("Original array:", arr)   # Imprime el arreglo original
     merge_sort(arr) # Llama a la función de ordenamiento por mezcla
-    print("Sorted array:", arr) # Imprime el arreglo ya ordenado
\ No newline at end of file
+    print("Sorted array:", arr) # Imprime el arreglo ya ordenado
+    registros = [("ana", 3), ("luis", 1), ("eva", 3), ("juan", 2)]  # Registros de ejemplo
+    print("Por puntaje (estable):", merge_sort(registros, key=lambda r: r[1]))  # Los empates conservan su orden
+# Este código implementa un Merge Sort de abajo hacia arriba al estilo Timsort: detecta las corridas ya
+# ordenadas, extiende las cortas con inserción binaria, las fusiona de dos en dos con un único búfer
+# auxiliar y galopa (búsqueda binaria) cuando una de las corridas gana muchas comparaciones seguidas.
@@ -1,44 +1,145 @@
-def counting_sort(arr, exp):    # Definir la función de ordenamiento por conteo para Radix Sort
-    n = len(arr)    # Obtener la longitud del arreglo
-    output = [0] * n    # Crear un arreglo de salida del mismo tamaño que arr
-    count = [0] * 10    # Crear un arreglo de conteo para los dígitos (0-9)
-
-    # Contar ocurrencias de dígitos en la posición actual (exp)
-    for i in range(n):      # Recorre cada elemento del arreglo
-        index = (arr[i] // exp) % 10    # Obtener el dígito en la posición exp
-        count[index] += 1   # Incrementar el conteo de ese dígito
-
-    # Cambiar count[i] para que contenga la posición real de este dígito en output[]
-    for i in range(1, 10):      # Recorre el arreglo de conteo
-        count[i] += count[i - 1]    # Acumular el conteo para posiciones
-
-    # Construir el arreglo de salida
-    i = n - 1   # Empezar desde el final del arreglo original
-    while i >= 0:   # Mientras haya elementos por procesar
-        index = (arr[i] // exp) % 10    # Obtener el dígito en la posición exp
-        output[count[index] - 1] = arr[i]   # Colocar el elemento en la posición correcta en output
-        count[index] -= 1   # Decrementar el conteo para ese dígito
-        i -= 1  # Mover al siguiente elemento en arr
-
-    # Copiar el arreglo de salida al arreglo original
-    for i in range(n):  # Recorre el arreglo de salida
-        arr[i] = output[i]  # Asigna los valores ordenados de output a arr
-
-def radix_sort(arr):    # Definir la función de ordenamiento Radix Sort
-    # Encontrar el número máximo para saber el número de dígitos  
-    max_num = max(arr) if arr else 0    # Obtener el valor máximo del arreglo, o 0 si está vacío
-
-    # Aplicar counting sort para cada dígito
-    exp = 1 # Inicializar el exponente para el dígito actual (1, 10, 100, ...)
-    while max_num // exp > 0:   # Mientras haya dígitos que procesar
-        counting_sort(arr, exp) # Llamar a counting_sort para ordenar por el dígito actual
-        exp *= 10   # Incrementar el exponente para el siguiente dígito
+from array import array   # Arreglos compactos de enteros de 64 bits (bloques de los ordenamientos externos)
+
+try:    # NumPy es opcional: sin él se usan las versiones en Python puro
+    import numpy as np  # Histogramas y reordenamientos vectorizados
+except ImportError:     # Si NumPy no está instalado
+    np = None   # Las funciones vectorizadas no están disponibles
+
+RADIX_BITS = (8, 16)    # Bits por dígito admitidos: base 256 o base 65536
+
+def _check_radix_bits(radix_bits):  # Validar el tamaño del dígito
+    if radix_bits not in RADIX_BITS:    # Sólo bytes o pares de bytes
+        raise ValueError(f"radix_bits debe ser uno de {RADIX_BITS}")    # Error si no es válido
+
+def counting_sort(arr, shift, radix_bits=8):    # Una pasada estable de Radix Sort sobre el dígito en la posición shift
+    mask = (1 << radix_bits) - 1    # Máscara para extraer un dígito de radix_bits bits
+    buckets = [[] for _ in range(1 << radix_bits)]  # Una cubeta por cada valor posible del dígito
+
+    # Repartir los elementos en las cubetas conservando su orden relativo (estabilidad)
+    for value in arr:   # Recorre cada elemento del arreglo
+        buckets[(value >> shift) & mask].append(value)  # Cubeta según el dígito actual
+
+    # Copiar las cubetas de vuelta al arreglo original de una sola vez
+    arr[:] = [value for bucket in buckets for value in bucket]  # Concatenación en orden de dígito
+
+def radix_sort(arr, radix_bits=8):  # Radix Sort LSD por bytes (o pares de bytes) que ordena arr en su lugar
+    _check_radix_bits(radix_bits)   # Validar el tamaño del dígito
+    if len(arr) < 2:    # Un arreglo vacío o de un elemento ya está ordenado
+        return  # No hay nada que hacer
+
+    types = set(map(type, arr))     # Tipos presentes en el arreglo
+    if not all(issubclass(t, int) for t in types):  # Hay elementos que no son enteros
+        if np is not None and types == {float}:     # Con NumPy los reales se ordenan por los bits del double
+            arr[:] = radix_sort_numpy(np.array(arr, dtype=np.float64), radix_bits).tolist()    # Versión vectorizada
+            return  # El arreglo ya quedó ordenado
+        raise TypeError("radix_sort ordena enteros (y listas de reales si NumPy está instalado); "
+                        f"se recibió {', '.join(sorted(t.__name__ for t in types))}")  # Error claro en lugar de convertir
+
+    if np is not None and -2 ** 63 <= min(arr) and max(arr) < 2 ** 63:  # Con NumPy y enteros de 64 bits
+        arr[:] = radix_sort_numpy(np.array(arr, dtype=np.int64), radix_bits).tolist()   # Versión vectorizada
+        return  # El arreglo ya quedó ordenado
+
+    # Los negativos se desplazan restando el mínimo: todas las claves quedan >= 0
+    low = min(arr)  # Valor mínimo del arreglo
+    if low != 0:    # Sólo hace falta desplazar si el mínimo no es 0
+        arr[:] = [value - low for value in arr]     # Claves no negativas con el mismo orden
+    bits = max(arr).bit_length()    # Bits significativos de la clave mayor
+
+    # Aplicar counting sort a cada dígito, del menos al más significativo
+    for shift in range(0, bits, radix_bits):    # Desplazamientos 0, 8, 16, ... (o 0, 16, 32, ...)
+        counting_sort(arr, shift, radix_bits)   # Ordenar de forma estable por el dígito actual
+
+    if low != 0:    # Deshacer el desplazamiento
+        arr[:] = [value + low for value in arr]     # Valores originales, ya ordenados
+
+def _sortable_keys(a):  # Claves sin signo cuyo orden coincide con el de los valores de a
+    if a.dtype.kind == 'u':     # Enteros sin signo: ya sirven como claves
+        return a.astype(np.uint64)  # Ampliar a 64 bits
+    if a.dtype.kind == 'i':     # Enteros con signo: se invierte el bit de signo
+        return a.astype(np.int64).view(np.uint64) ^ np.uint64(1 << 63)     # Los negativos quedan antes
+    if a.dtype.kind == 'f':     # Reales: se reinterpretan los bits del double IEEE 754
+        bits = a.astype(np.float64).view(np.uint64)     # Bits del double
+        negative = (bits >> np.uint64(63)).astype(bool)     # Números con el bit de signo activo
+        # Negativos: se invierten todos los bits; positivos: sólo el de signo
+        return np.where(negative, ~bits, bits | np.uint64(1 << 63))     # Claves ordenables
+    raise TypeError(f"radix_sort_numpy no admite el tipo {a.dtype}")    # Otros tipos no se admiten
+
+def radix_sort_numpy(a, radix_bits=8):  # Radix Sort LSD vectorizado sobre un arreglo de NumPy
+    _check_radix_bits(radix_bits)   # Validar el tamaño del dígito
+    if np is None:  # Esta versión necesita NumPy
+        raise ImportError("radix_sort_numpy necesita NumPy")    # Error si no está instalado
+    a = np.asarray(a)   # Aceptar también listas
+    if a.ndim != 1:     # Sólo arreglos de una dimensión
+        raise ValueError("radix_sort_numpy espera un arreglo de una dimensión")     # Error de forma
+    if len(a) < 2:  # Nada que ordenar
+        return a.copy()     # Copia para no devolver el mismo objeto
+
+    keys = _sortable_keys(a)    # Claves de 64 bits sin signo
+    values = a  # Valores que se reordenan junto con las claves
+    radix = 1 << radix_bits     # Número de cubetas (256 o 65536)
+    digit_type = np.uint8 if radix_bits == 8 else np.uint16     # Tipo justo para un dígito
+
+    # Todas las claves comparten los bits más altos en que coinciden el mínimo y el máximo;
+    # sólo hacen falta las pasadas hasta el bit más alto en que difieren
+    bits = int(keys.min() ^ keys.max()).bit_length()    # Bits que distinguen a las claves
+
+    for shift in range(0, bits, radix_bits):    # Un dígito por pasada, del menos significativo al más
+        digits = ((keys >> np.uint64(shift)) & np.uint64(radix - 1)).astype(digit_type)     # Dígito actual de cada clave
+        histogram = np.bincount(digits, minlength=radix)    # Histograma vectorizado de dígitos
+        if histogram.max() == len(digits):  # Todas las claves tienen el mismo dígito
+            continue    # La pasada no cambiaría el orden
+        # Reparto estable: para dígitos de 8 o 16 bits el argsort estable de NumPy es un counting sort
+        order = np.argsort(digits, kind='stable')   # Posición de destino de cada elemento
+        keys = keys[order]  # Reordenar las claves
+        values = values[order]  # Reordenar los valores de la misma forma
+    return values if values is not a else a.copy()  # Arreglo nuevo ordenado
+
+def radix_sort_strings(strings, cutoff=32):     # Radix Sort MSD para cadenas (str o bytes); devuelve una lista nueva
+    result = list(strings)  # Copia de trabajo
+    stack = [(0, len(result), 0)]   # Rangos pendientes: (inicio, fin, posición del carácter)
+
+    while stack:    # Mientras queden rangos por ordenar (iterativo para no agotar la pila de recursión)
+        lo, hi, depth = stack.pop()     # Siguiente rango; todas sus cadenas comparten los primeros depth caracteres
+        if hi - lo <= cutoff:   # Rangos pequeños: se ordenan por comparación
+            result[lo:hi] = sorted(result[lo:hi])   # sorted es estable y rápido en rangos cortos
+            continue    # Pasar al siguiente rango
+
+        finished = []   # Cadenas que terminan en esta posición (van primero)
+        buckets = {}    # Una cubeta por carácter en la posición depth
+        for s in result[lo:hi]:     # Recorre las cadenas del rango
+            if len(s) == depth:     # La cadena no tiene carácter en esta posición
+                finished.append(s)  # Un prefijo va antes que las cadenas más largas
+            else:   # La cadena sigue
+                buckets.setdefault(s[depth], []).append(s)  # Cubeta según el carácter actual
+
+        pos = lo + len(finished)    # Las terminadas ocupan el principio del rango
+        result[lo:pos] = finished   # Copiarlas en su lugar
+        for char in sorted(buckets):    # Cubetas en orden de carácter
+            bucket = buckets[char]  # Cadenas con ese carácter
+            result[pos:pos + len(bucket)] = bucket  # Copiar la cubeta en su lugar
+            if len(bucket) > 1:     # Una cubeta con varias cadenas se ordena por el siguiente carácter
+                stack.append((pos, pos + len(bucket), depth + 1))   # Rango pendiente
+            pos += len(bucket)  # Avanzar a la siguiente cubeta
+    return result   # Lista ordenada
+
+def sort_int64_block(block):    # Ordena un bloque de enteros de 64 bits (array('q') o lista) para las corridas externas
+    if np is None:  # Sin NumPy, el ordenamiento de Python (en C) es más rápido que un Radix Sort en Python puro
+        return array('q', sorted(block))    # Bloque ordenado
+    values = np.frombuffer(block, dtype=np.int64) if isinstance(block, array) else np.array(block, dtype=np.int64)     # Vista sin copia del bloque
+    result = array('q')     # Arreglo de salida
+    result.frombytes(radix_sort_numpy(values, 16 if len(values) >= 1 << 16 else 8).tobytes())  # Base 65536 en bloques grandes
+    return result   # Bloque ordenado
 
 # Ejemplo de uso
 if __name__ == "__main__":  # Punto de entrada del script
-    arr = [170, 45, 75, 90, 802, 24, 2, 66] # Lista de ejemplo para ordenar
+    arr = [170, -45, 75, 90, -802, 24, 2, 66]   # Lista de ejemplo para ordenar (con negativos)
     print("Arreglo original:", arr) # Imprime el arreglo original
     radix_sort(arr) # Llama a la función de ordenamiento Radix Sort
     print("Arreglo ordenado:", arr) # Imprime el arreglo ya ordenado
-# Este código implementa el algoritmo de ordenamiento Radix Sort utilizando Counting Sort como subrutina.
-# Radix Sort es un algoritmo eficiente para ordenar números enteros, especialmente cuando los números tienen un rango limitado.
\ No newline at end of file
+    words = ["banana", "ana", "bandera", "", "abeja", "ban"]    # Cadenas de ejemplo
+    print("Cadenas ordenadas:", radix_sort_strings(words))  # Radix Sort MSD para cadenas
+    if np is not None:  # Con NumPy también se ordenan reales
+        print("Reales ordenados:", radix_sort_numpy(np.array([2.5, -1.0, 0.0, -3.25, 1e9])))   # Claves de doubles
+# Este código implementa Radix Sort LSD por bytes (base 256 o 65536) con soporte para negativos.
+# Con NumPy los histogramas y los repartos de cada pasada se hacen de forma vectorizada y también
+# se ordenan reales; la versión MSD ordena cadenas carácter a carácter.
@@ -0,0 +1,218 @@
+"""
+Punto de entrada único para los ordenamientos internos de esta carpeta.
+
+    from adaptive_sort import sort
+    ordenada = sort(datos)                          # lista nueva, ordenada
+    ordenada, eleccion = sort(datos, with_strategy=True)
+    print(eleccion)                                 # algoritmo elegido y por qué
+
+sort() examina la entrada (tamaño, corridas ya ordenadas, proporción de
+repetidos y rango de los enteros) y la ordena con el algoritmo que mejor le
+va de los scripts 000N:
+
+- 'insertion' (0001): entradas diminutas (un descenso no dice cuánto se
+  desplaza cada elemento, así que la inserción no se usa para entradas
+  más largas aunque parezcan casi ordenadas: para ésas está la fusión).
+- 'radix' (0007): enteros sin key= con un rango pequeño (hasta 2 ** 16), que
+  se ordenan en una o dos pasadas de conteo por bytes, salvo que casi todos
+  sean repetidos.
+- 'merge' (0006): ordenamiento estable para key= (registros) y entradas
+  con pocas corridas (ascendentes o descendentes), que aprovecha y fusiona
+  con galope.
+- 'quick' (0005): el caso general, y las entradas sin key= con muchos
+  repetidos (HEAVY_DUPLICATES en la muestra) aunque sean enteros de rango
+  pequeño: la partición en tres aparta de una vez todas las copias del
+  pivote, así que con pocos valores distintos hace pocas pasadas y le gana
+  a las pasadas fijas de radix.
+
+Selección (0002), intercambio (0003) y árbol (0004) no se eligen nunca: los
+dos primeros son cuadráticos y el árbol es más lento que la fusión para
+ordenar una sola vez (SortedList de 0004 sirve para mantener datos ordenados).
+La elección se registra también con logging (nivel DEBUG).
+"""
+import importlib.util
+import logging
+import os
+import random
+import re
+from operator import lt
+
+logger = logging.getLogger(__name__)
+
+INSERTION = 'insertion'
+RADIX = 'radix'
+MERGE = 'merge'
+QUICK = 'quick'
+
+SCRIPTS = {
+    INSERTION: '0001_Insercion_(InsertionSort).py',
+    QUICK: '0005_QuickSort.py',
+    MERGE: '0006_MergeSort.py',
+    RADIX: '0007_RadixSort.py',
+}
+
+TINY = 32   # Hasta aquí siempre inserción
+RADIX_MIN_SIZE = 256    # Por debajo, el costo fijo de las pasadas no compensa
+RADIX_MAX_RANGE = 1 << 16   # Rango que cabe en dos pasadas de un byte
+FEW_RUNS_DIVISOR = 64   # "Pocas corridas": menos de n / 64
+DUPLICATE_SAMPLE = 1024     # Elementos de la muestra (a paso fijo) para estimar los repetidos
+HEAVY_DUPLICATES = 0.95     # Desde aquí (unos 50 valores distintos en la muestra) se elige quick
+
+_scripts = {}
+
+
+def load_script(filename: str):
+    """
+    Carga (una sola vez) un script de esta carpeta por nombre de archivo; los
+    scripts numerados no pueden importarse con import.
+    """
+    if filename not in _scripts:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        name = '_' + re.sub(r'\W', '_', os.path.splitext(filename)[0])
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _scripts[filename] = module
+    return _scripts[filename]
+
+
+class Profile:
+    """Características de la entrada que deciden el algoritmo."""
+
+    def __init__(self, size: int, descents: int, ascents: int, duplicate_ratio: float, int_range):
+        self.size = size
+        self.descents = descents  # Posiciones i con clave[i + 1] < clave[i]
+        self.ascents = ascents  # Posiciones i con clave[i] < clave[i + 1]
+        self.duplicate_ratio = duplicate_ratio  # Fracción de repetidos en una muestra
+        self.int_range = int_range  # max - min si todas las claves son enteros, si no None
+
+    @property
+    def runs(self) -> int:
+        """
+        Corridas monótonas aproximadas: las ascendentes, o las descendentes si
+        son menos (merge_sort invierte las descendentes sin compararlas más).
+        """
+        return min(self.descents, self.ascents) + 1 if self.size else 0
+
+    @property
+    def sortedness(self) -> float:
+        """1.0 si la entrada ya está ordenada; cerca de 0.5 si es aleatoria."""
+        return 1.0 - self.descents / (self.size - 1) if self.size > 1 else 1.0
+
+    def __repr__(self):
+        return (f"Profile(size={self.size}, runs={self.runs}, sortedness={self.sortedness:.2f}, "
+                f"duplicate_ratio={self.duplicate_ratio:.2f}, int_range={self.int_range})")
+
+
+class Choice:
+    """Algoritmo elegido, con el motivo y el perfil de la entrada."""
+
+    def __init__(self, strategy: str, reason: str, profile: Profile):
+        self.strategy = strategy
+        self.reason = reason
+        self.profile = profile
+
+    def __repr__(self):
+        return f"Choice({self.strategy!r}, {self.reason!r}, {self.profile!r})"
+
+    def __str__(self):
+        return f"{self.strategy}: {self.reason} ({self.profile})"
+
+
+def _duplicate_ratio(sample) -> float:
+    """Fracción de repetidos de la muestra; las claves no hashables (listas, dict) se comparan ordenadas."""
+    if not sample:
+        return 0.0
+    try:
+        distinct = len(set(sample))
+    except TypeError:
+        try:
+            ordered = sorted(sample)
+        except TypeError:   # Ni hashables ni comparables: sort() fallará igual que sorted()
+            return 0.0
+        distinct = 1 + sum(map(lt, ordered, ordered[1:]))
+    return 1.0 - distinct / len(sample)
+
+
+def profile(keys) -> Profile:
+    """
+    Perfil de una lista de claves: un recorrido en C para los descensos y el
+    rango, y una muestra a paso fijo (la elección es determinista) para los
+    repetidos.
+    """
+    n = len(keys)
+    descents = sum(map(lt, keys[1:], keys)) if n > 1 else 0
+    ascents = sum(map(lt, keys, keys[1:])) if n > 1 else 0
+    sample = keys if n <= DUPLICATE_SAMPLE else keys[::n // DUPLICATE_SAMPLE][:DUPLICATE_SAMPLE]
+    duplicate_ratio = _duplicate_ratio(sample)
+    int_range = None
+    if n and set(map(type, keys)) == {int}:  # bool y otras subclases de int no cuentan
+        int_range = max(keys) - min(keys)
+    return Profile(n, descents, ascents, duplicate_ratio, int_range)
+
+
+def choose_strategy(data, key=None) -> Choice:
+    """Elige el algoritmo para ordenar data (con key=, si se indica)."""
+    keys = list(data) if key is None else [key(item) for item in data]
+    return _choose(profile(keys), key is not None)
+
+
+def _choose(p: Profile, has_key: bool) -> Choice:
+    n = p.size
+    if p.runs <= max(1, n // FEW_RUNS_DIVISOR):
+        return Choice(MERGE, f"pocas corridas ({p.runs}) que se fusionan sin volver a ordenarlas", p)
+    if n <= TINY and not has_key:
+        return Choice(INSERTION, f"entrada diminuta (n <= {TINY})", p)
+    if not has_key and p.duplicate_ratio >= HEAVY_DUPLICATES:
+        return Choice(QUICK, f"muchos repetidos ({p.duplicate_ratio:.0%} de la muestra): "
+                             "la partición en tres agrupa las copias del pivote", p)
+    if not has_key and p.int_range is not None and n >= RADIX_MIN_SIZE and p.int_range < RADIX_MAX_RANGE:
+        return Choice(RADIX, f"enteros con rango pequeño ({p.int_range})", p)
+    if has_key:
+        return Choice(MERGE, "registros con key=: hace falta un orden estable", p)
+    return Choice(QUICK, "caso general", p)
+
+
+def sort(data, key=None, with_strategy: bool = False):
+    """
+    Devuelve una lista nueva con los elementos de data ordenados (por
+    key(elemento) si se indica; con key= el orden es estable).
+
+    Args:
+        data: Iterable con los elementos
+        key: Función de clave, como en sorted()
+        with_strategy: Devuelve también la elección (Choice) para registrarla
+
+    Returns:
+        La lista ordenada, o (lista, Choice) si with_strategy
+    """
+    items = list(data)
+    keys = items if key is None else [key(item) for item in items]
+    choice = _choose(profile(keys), key is not None)
+    logger.debug("sort: %s", choice)
+
+    if choice.strategy == INSERTION:
+        load_script(SCRIPTS[INSERTION]).insertion_sort(items)
+    elif choice.strategy == RADIX:
+        load_script(SCRIPTS[RADIX]).radix_sort(items, 8 if choice.profile.int_range < 256 else 16)
+    elif choice.strategy == MERGE:
+        load_script(SCRIPTS[MERGE]).merge_sort(items, key=key)
+    else:
+        load_script(SCRIPTS[QUICK]).quicksort(items)
+    return (items, choice) if with_strategy else items
+
+
+if __name__ == "__main__":
+    ejemplos = {
+        "diminuta": [5, 2, 9, 1],
+        "enteros en rango pequeño": [random.randint(0, 100) for _ in range(5000)],
+        "muchos repetidos": [random.choice((3, 70, 500, 9000)) for _ in range(5000)],
+        "casi ordenada": list(range(10000)) + [3],
+        "aleatoria": [random.random() for _ in range(5000)],
+    }
+    for nombre, datos in ejemplos.items():
+        ordenada, eleccion = sort(datos, with_strategy=True)
+        assert ordenada == sorted(datos)
+        print(f"{nombre}: {eleccion}")
+    registros = [("ana", 3), ("luis", 1), ("eva", 3)]
+    print(sort(registros, key=lambda r: r[1], with_strategy=True))
@@ -0,0 +1,249 @@
+"""
+Sample sort en paralelo para arreglos grandes en memoria.
+
+    from sample_sort import sample_sort
+    sample_sort(arreglo)                    # arreglo de NumPy (o lista), en su lugar
+    sample_sort(arreglo, workers=8)
+
+    python sample_sort.py -n 100000000 --max-workers 8    # tabla de escalado
+
+El arreglo se copia a un bloque de memoria compartida
+(multiprocessing.shared_memory) y los procesos trabajan sobre vistas de NumPy
+de ese bloque: entre procesos sólo viajan nombres, índices y las muestras,
+nunca los datos. Es un sample sort con muestreo regular (PSRS):
+
+1. Ordenamiento local: cada proceso ordena en su lugar un tramo contiguo y
+   devuelve una muestra regular de él (SAMPLES_PER_BUCKET por cubeta).
+2. Separadores: de las muestras juntas y ordenadas se toman buckets - 1
+   valores, con buckets = workers * BUCKETS_PER_WORKER para repartir mejor
+   la carga. Como los tramos ya están ordenados, la parte de cada tramo que
+   cae en cada cubeta es un segmento contiguo (searchsorted).
+3. Cubetas: se reparten entre los procesos (la más grande al menos
+   cargado); cada proceso copia a la posición final de cada cubeta, en un
+   segundo bloque compartido, sus segmentos de todos los tramos, y los
+   fusiona ordenándola con kind='stable' (timsort, que aprovecha las
+   corridas ya ordenadas). Como las cubetas quedan una tras otra en orden,
+   el resultado ya está concatenado; al final se copia al arreglo original.
+
+Por debajo de PARALLEL_THRESHOLD elementos, con un solo proceso o sin NumPy
+se usa el ordenamiento de un solo proceso (numpy.sort o list.sort).
+"""
+import argparse
+import heapq
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él no hay versión en paralelo
+    np = None
+
+PARALLEL_THRESHOLD = 1 << 23    # Por debajo, crear los procesos cuesta más que ordenar
+BUCKETS_PER_WORKER = 4
+SAMPLES_PER_BUCKET = 64
+
+
+def _attach(name: str, count: int, dtype: str):
+    """Abre el bloque compartido name como arreglo de count elementos de tipo dtype."""
+    # Los procesos del pool comparten el resource_tracker del principal, que
+    # es quien borra el bloque al terminar
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(count, dtype=dtype, buffer=shm.buf)
+
+
+def _sort_chunk(task) -> 'np.ndarray':
+    """Fase 1: ordena en su lugar el tramo [lo, hi) y devuelve una muestra regular."""
+    name, n, dtype, lo, hi, samples = task
+    shm, values = _attach(name, n, dtype)
+    try:
+        chunk = values[lo:hi]
+        chunk.sort()
+        return chunk[np.linspace(0, len(chunk) - 1, samples).astype(np.int64)].copy()
+    finally:
+        del values, chunk
+        shm.close()
+
+
+def _merge_buckets(task):
+    """Fase 3: copia los segmentos de cada cubeta a su posición en el destino y los fusiona."""
+    source_name, target_name, n, dtype, buckets = task
+    source_shm, source = _attach(source_name, n, dtype)
+    target_shm, target = _attach(target_name, n, dtype)
+    try:
+        for start, segments in buckets:
+            position = start
+            for lo, hi in segments:
+                target[position:position + hi - lo] = source[lo:hi]
+                position += hi - lo
+            if len(segments) > 1:
+                # Fusión de las corridas ordenadas: timsort sólo hace los merges
+                target[start:position].sort(kind='stable')
+    finally:
+        del source, target
+        source_shm.close()
+        target_shm.close()
+
+
+def choose_splitters(samples, buckets: int):
+    """buckets - 1 separadores repartidos de forma regular entre las muestras."""
+    samples = np.sort(samples)
+    return samples[np.linspace(0, len(samples), buckets + 1)[1:-1].astype(np.int64)]
+
+
+def _balance(sizes: Sequence[int], workers: int) -> List[List[int]]:
+    """Reparte las cubetas entre workers grupos: la más grande al grupo menos cargado."""
+    heap = [(0, worker) for worker in range(workers)]
+    groups = [[] for _ in range(workers)]
+    for bucket in sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True):
+        load, worker = heapq.heappop(heap)
+        groups[worker].append(bucket)
+        heapq.heappush(heap, (load + sizes[bucket], worker))
+    return [group for group in groups if group]
+
+
+def _ranges(n: int, parts: int) -> List[Tuple[int, int]]:
+    """Divide [0, n) en parts tramos contiguos de tamaño parecido."""
+    bounds = [n * i // parts for i in range(parts + 1)]
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+
+
+def _sequential_sort(arr):
+    if hasattr(arr, 'sort'):  # Listas y arreglos de NumPy
+        arr.sort()
+    elif isinstance(arr, array):  # A una rebanada de array sólo se asigna otro array
+        arr[:] = array(arr.typecode, sorted(arr))
+    else:
+        arr[:] = sorted(arr)
+    return arr
+
+
+def sample_sort(arr, workers: Optional[int] = None, threshold: int = PARALLEL_THRESHOLD):
+    """
+    Ordena arr en su lugar con un sample sort en workers procesos y devuelve arr.
+
+    Args:
+        arr: Arreglo de NumPy de una dimensión (números), lista o array.array
+             de números
+        workers: Número de procesos (por defecto, os.cpu_count())
+        threshold: Tamaño mínimo para ordenar en paralelo
+
+    Returns:
+        El mismo arr, ordenado
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError("workers debe ser al menos 1")
+    n = len(arr)
+    if np is None or workers == 1 or n < max(threshold, 2):
+        return _sequential_sort(arr)
+
+    values = arr if isinstance(arr, np.ndarray) else np.asarray(arr)
+    if values.ndim != 1 or values.dtype.kind not in 'iuf':
+        raise TypeError("sample_sort necesita un arreglo de números de una dimensión")
+    dtype = values.dtype.str
+    buckets = workers * BUCKETS_PER_WORKER
+
+    blocks = []
+    try:
+        for _ in range(2):
+            blocks.append(shared_memory.SharedMemory(create=True, size=values.nbytes))
+        source_shm, target_shm = blocks
+        np.ndarray(n, dtype=dtype, buffer=source_shm.buf)[:] = values
+        chunks = _ranges(n, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            samples = list(pool.map(_sort_chunk, [(source_shm.name, n, dtype, lo, hi,
+                                                   buckets * SAMPLES_PER_BUCKET) for lo, hi in chunks]))
+            splitters = choose_splitters(np.concatenate(samples), buckets)
+            # Límites de cada cubeta dentro de cada tramo ya ordenado
+            source = np.ndarray(n, dtype=dtype, buffer=source_shm.buf)
+            cuts = [[lo] + (lo + np.searchsorted(source[lo:hi], splitters)).tolist() + [hi]
+                    for lo, hi in chunks]
+            del source
+            segments = [[(cut[b], cut[b + 1]) for cut in cuts if cut[b] < cut[b + 1]] for b in range(buckets)]
+            sizes = [sum(hi - lo for lo, hi in bucket) for bucket in segments]
+            starts = [0, *accumulate(sizes[:-1])]
+            list(pool.map(_merge_buckets, [
+                (source_shm.name, target_shm.name, n, dtype,
+                 [(starts[b], segments[b]) for b in group if sizes[b]])
+                for group in _balance(sizes, workers)]))
+        result = np.ndarray(n, dtype=dtype, buffer=target_shm.buf)
+        if values is arr:
+            arr[:] = result
+        elif isinstance(arr, array):
+            # values se creó desde el búfer de arr: mismo tipo y ancho de elemento
+            arr[:] = array(arr.typecode, result.tobytes())
+        else:
+            arr[:] = result.tolist()
+        del result
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return arr
+
+
+def scaling(n: int, max_workers: Optional[int] = None, dtype: str = 'int64', seed: int = 0,
+            repeat: int = 3) -> List[dict]:
+    """
+    Mide sample_sort sobre n valores aleatorios con 1, 2, 4, ... hasta
+    max_workers procesos, junto a numpy.sort.
+
+    Returns:
+        Una fila por configuración: workers (0 para numpy.sort), el mejor
+        tiempo en segundos y la aceleración respecto de numpy.sort
+    """
+    if np is None:
+        raise ImportError("scaling necesita NumPy")
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    elif max_workers < 1:
+        raise ValueError("max_workers debe ser al menos 1")
+    rng = np.random.default_rng(seed)
+    if np.dtype(dtype).kind == 'f':
+        data = rng.random(n).astype(dtype)
+    else:
+        data = rng.integers(0, np.iinfo(dtype).max, n, dtype=dtype)
+    expected = np.sort(data)
+
+    counts = sorted({1 << i for i in range(max_workers.bit_length()) if 1 << i <= max_workers} | {max_workers})
+    rows = []
+    for workers in [0] + counts:
+        best = float('inf')
+        for _ in range(repeat):
+            copy = data.copy()
+            start = time.perf_counter()
+            if workers == 0:
+                copy.sort()
+            else:
+                sample_sort(copy, workers, threshold=0)
+            best = min(best, time.perf_counter() - start)
+        if not np.array_equal(copy, expected):
+            raise AssertionError(f"sample_sort con {workers} procesos no ordenó correctamente")
+        rows.append({'workers': workers, 'seconds': best})
+    for row in rows:
+        row['speedup'] = rows[0]['seconds'] / row['seconds']
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escalado de sample_sort con el número de procesos.")
+    parser.add_argument('-n', type=int, default=10_000_000, help="Elementos a ordenar")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--dtype', default='int64')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    # Comprobación de los tipos de entrada admitidos, con y sin procesos
+    datos = [(i * 7919) % 1000 - 500 for i in range(1000)]
+    for umbral in (0, PARALLEL_THRESHOLD):
+        for entrada in (list(datos), array('q', datos), array('d', datos)):
+            assert list(sample_sort(entrada, 2, umbral)) == sorted(datos), type(entrada).__name__
+    print(f"{'procesos':>10} {'tiempo (s)':>11} {'vs. numpy.sort':>15}")
+    for row in scaling(args.n, args.max_workers, args.dtype, repeat=args.repeat):
+        label = 'numpy.sort' if row['workers'] == 0 else row['workers']
+        print(f"{label:>10} {row['seconds']:>11.3f} {row['speedup']:>14.2f}x")
@@ -0,0 +1,377 @@
+"""
+Banco de pruebas de los ordenamientos internos y externos de esta práctica.
+
+    python benchmark.py                                  # todo, con los tamaños por defecto
+    python benchmark.py --suite internal --sizes 1000 100000 -o resultados.json
+    python benchmark.py -o nuevos.json --baseline resultados.json
+
+Cada ordenamiento se mide sobre varias distribuciones de entrada (uniforme,
+ordenada, inversa, con prefijo ordenado, dientes de sierra, pocos valores
+distintos, Zipf y "tubo de órgano", ver Externos/test_data.py) y varios
+tamaños, con los mismos datos (semilla fija) para todos. Por cada combinación se registra:
+
+- seconds: el mejor tiempo de repeat ejecuciones (sin instrumentar).
+- peak_memory: el pico de memoria de Python durante el ordenamiento
+  (tracemalloc, en una ejecución aparte).
+- comparisons: comparaciones entre elementos, contadas envolviendo cada
+  valor (sólo en los ordenamientos por comparación; None en radix, en
+  adaptive, que decide según el tipo de los valores, y en sample, que
+  trabaja sobre arreglos de NumPy).
+- temp_bytes: bytes escritos en archivos temporales por los ordenamientos
+  externos (contador wchar de /proc/self/io menos la salida; None si el
+  sistema no lo tiene).
+- ok: si la salida coincide con sorted().
+
+Los resultados se guardan en JSON con -o. Con --baseline se comparan con un
+archivo de resultados anterior: cualquier métrica que crezca más de la
+tolerancia (25 % por defecto) o una salida incorrecta se informa como
+regresión y el programa termina con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List, Optional, Sequence
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+for _folder in ('Internos', 'Externos'):
+    # Los módulos de cada carpeta se importan entre sí por nombre
+    if os.path.join(HERE, _folder) not in sys.path:
+        sys.path.insert(0, os.path.join(HERE, _folder))
+
+import adaptive_sort  # noqa: E402
+import sample_sort  # noqa: E402
+from external_sort import METHODS, external_sort  # noqa: E402
+from run_files import BINARY, iter_numbers, write_numbers  # noqa: E402
+from test_data import DISTRIBUTIONS, generate  # noqa: E402
+
+INTERNAL = 'internal'
+EXTERNAL = 'external'
+SUITES = (INTERNAL, EXTERNAL)
+
+# Script y función de cada ordenamiento interno; los que devuelven None ordenan en su lugar
+INTERNAL_SORTERS = {
+    'builtin': (None, 'sorted'),
+    'insertion': ('0001_Insercion_(InsertionSort).py', 'insertion_sort'),
+    'selection': ('0002_Selección_(SelectionSort).py', 'selection_sort'),
+    'intercambio': ('0003_Intercambio.py', 'intercambio_sort'),
+    'tree': ('0004_Ordenamiento_de_árbol.py', 'tree_sort'),
+    'quick': ('0005_QuickSort.py', 'quicksort'),
+    'merge': ('0006_MergeSort.py', 'merge_sort'),
+    'radix': ('0007_RadixSort.py', 'radix_sort'),
+    'adaptive': (None, 'adaptive'),
+    'sample': (None, 'sample_sort'),
+}
+QUADRATIC = ('insertion', 'selection', 'intercambio')
+QUADRATIC_MAX_SIZE = 5000   # Por encima, los cuadráticos tardan minutos y se omiten
+UNCOUNTED = ('radix', 'adaptive', 'sample')   # Sin comparaciones que contar
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_EXTERNAL_SIZES = (100000,)
+DEFAULT_CHUNK_SIZE = 10000  # Corridas pequeñas para que los externos hagan varias pasadas
+DEFAULT_TOLERANCE = 0.25
+TIME_FLOOR = 0.005  # Tiempos menores son ruido y no se comparan
+METRICS = ('seconds', 'peak_memory', 'comparisons', 'temp_bytes')
+
+
+class _Counted:
+    """Envuelve un valor y cuenta cada comparación que se hace con él."""
+    __slots__ = ('value',)
+    comparisons = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        _Counted.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        _Counted.comparisons += 1
+        return self.value > other.value
+
+    def __le__(self, other):
+        _Counted.comparisons += 1
+        return self.value <= other.value
+
+    def __ge__(self, other):
+        _Counted.comparisons += 1
+        return self.value >= other.value
+
+
+def internal_sorter(name: str) -> Callable[[list], list]:
+    """Función que ordena una lista con el ordenamiento interno name y devuelve el resultado."""
+    script, function = INTERNAL_SORTERS[name]
+    if name == 'builtin':
+        return sorted
+    if name == 'adaptive':
+        return adaptive_sort.sort
+    if name == 'sample':
+        return sample_sort.sample_sort
+    sort = getattr(adaptive_sort.load_script(script), function)
+
+    def run(data):
+        result = sort(data)
+        return data if result is None else result
+    return run
+
+
+def _bytes_written() -> Optional[int]:
+    """Bytes que el proceso ha pasado a write() (Linux), o None si no se puede saber."""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _best_time(run: Callable[[object], object], prepare: Callable[[], object], repeat: int) -> float:
+    """Mejor tiempo de repeat ejecuciones de run(prepare()); prepare no se mide."""
+    best = float('inf')
+    for _ in range(repeat):
+        arg = prepare()
+        start = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(run: Callable[[], object]):
+    """Ejecuta run() con tracemalloc y devuelve (resultado, pico de memoria en bytes)."""
+    tracemalloc.start()
+    try:
+        result = run()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_internal(name: str, data: List[int], expected: List[int], repeat: int) -> dict:
+    """Mide el ordenamiento interno name sobre una copia de data."""
+    sort = internal_sorter(name)
+    seconds = _best_time(sort, lambda: list(data), repeat)
+    copy = list(data)
+    result, peak = _peak_memory(lambda: sort(copy))
+    comparisons = None
+    if name not in UNCOUNTED:
+        wrapped = [_Counted(value) for value in data]
+        _Counted.comparisons = 0
+        sort(wrapped)
+        comparisons = _Counted.comparisons
+    return {'seconds': seconds, 'peak_memory': peak, 'comparisons': comparisons,
+            'temp_bytes': None, 'ok': list(result) == expected}
+
+
+def bench_external(method: str, input_path: str, expected: List[int], work: str,
+                   repeat: int, chunk_size: int) -> dict:
+    """Mide el método externo method sobre el archivo binario input_path."""
+    output = os.path.join(work, 'output.bin')
+
+    def run(_=None):
+        external_sort(input_path, output, method=method, input_format=BINARY, output_format=BINARY,
+                      chunk_size=chunk_size, temp_dir=work)
+
+    seconds = _best_time(run, lambda: None, repeat)
+    before = _bytes_written()
+    _, peak = _peak_memory(run)
+    after = _bytes_written()
+    temp_bytes = None
+    if before is not None and after is not None:
+        temp_bytes = max(0, after - before - os.path.getsize(output))
+    ok = list(iter_numbers(output, BINARY)) == expected
+    os.remove(output)
+    return {'seconds': seconds, 'peak_memory': peak, 'comparisons': None,
+            'temp_bytes': temp_bytes, 'ok': ok}
+
+
+def run_benchmarks(suites: Sequence[str] = SUITES, sorters: Optional[Sequence[str]] = None,
+                   distributions: Sequence[str] = DISTRIBUTIONS,
+                   sizes: Sequence[int] = DEFAULT_SIZES,
+                   external_sizes: Sequence[int] = DEFAULT_EXTERNAL_SIZES,
+                   repeat: int = 3, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   report: Optional[Callable[[dict], None]] = None) -> List[dict]:
+    """
+    Ejecuta el banco de pruebas y devuelve un resultado por combinación.
+
+    Args:
+        suites: 'internal' y/o 'external'
+        sorters: Ordenamientos a medir (nombres de INTERNAL_SORTERS o métodos
+                 externos); None para todos los de las suites elegidas
+        distributions: Distribuciones de entrada (ver DISTRIBUTIONS)
+        sizes, external_sizes: Tamaños de entrada de cada suite
+        repeat: Ejecuciones cronometradas por combinación (se guarda la mejor)
+        seed: Semilla de los datos
+        chunk_size: Tamaño de las corridas iniciales de los externos
+        report: Función a la que se pasa cada resultado en cuanto está listo
+
+    Returns:
+        Lista de diccionarios con suite, sorter, distribution, size, las
+        métricas de METRICS y ok (o skipped con el motivo)
+    """
+    plan = []
+    if INTERNAL in suites:
+        plan += [(INTERNAL, name, size) for size in sizes for name in INTERNAL_SORTERS]
+    if EXTERNAL in suites:
+        plan += [(EXTERNAL, name, size) for size in external_sizes for name in METHODS]
+    if sorters is not None:
+        unknown = set(sorters) - set(INTERNAL_SORTERS) - set(METHODS)
+        if unknown:
+            raise ValueError(f"Ordenamientos desconocidos: {', '.join(sorted(unknown))}")
+        plan = [entry for entry in plan if entry[1] in sorters]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as work:
+        for distribution in distributions:
+            for size in sorted({size for _, _, size in plan}):
+                entries = [(suite, name) for suite, name, n in plan if n == size]
+                data = generate(distribution, size, seed)
+                expected = sorted(data)
+                input_path = None
+                for suite, name in entries:
+                    row = {'suite': suite, 'sorter': name, 'distribution': distribution, 'size': size}
+                    if suite == INTERNAL and name in QUADRATIC and size > QUADRATIC_MAX_SIZE:
+                        row['skipped'] = f"cuadrático con más de {QUADRATIC_MAX_SIZE} elementos"
+                    elif suite == INTERNAL:
+                        row.update(bench_internal(name, data, expected, repeat))
+                    else:
+                        if input_path is None:
+                            input_path = os.path.join(work, 'input.bin')
+                            write_numbers(input_path, data, BINARY)
+                        row.update(bench_external(name, input_path, expected, work, repeat, chunk_size))
+                    results.append(row)
+                    if report is not None:
+                        report(row)
+    return results
+
+
+def _key(row: dict):
+    return row['suite'], row['sorter'], row['distribution'], row['size']
+
+
+def compare(results: Sequence[dict], baseline: Sequence[dict],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """
+    Compara results con los resultados de referencia baseline.
+
+    Returns:
+        Una entrada por regresión: la combinación, la métrica ('ok' si la
+        salida es incorrecta), el valor de referencia, el actual y su cociente
+    """
+    previous = {_key(row): row for row in baseline if 'skipped' not in row}
+    regressions = []
+    for row in results:
+        if 'skipped' in row:
+            continue
+        if not row['ok']:
+            regressions.append({**_label(row), 'metric': 'ok', 'baseline': True, 'current': False,
+                                'ratio': None})
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        for metric in METRICS:
+            before, now = old.get(metric), row.get(metric)
+            if before is None or now is None:
+                continue
+            if metric == 'seconds' and max(before, now) < TIME_FLOOR:
+                continue
+            if now > before * (1 + tolerance):
+                regressions.append({**_label(row), 'metric': metric, 'baseline': before, 'current': now,
+                                    'ratio': now / before if before else None})
+    return regressions
+
+
+def _label(row: dict) -> dict:
+    return {'suite': row['suite'], 'sorter': row['sorter'], 'distribution': row['distribution'],
+            'size': row['size']}
+
+
+def metadata(seed: int, repeat: int, chunk_size: int) -> dict:
+    """Datos del entorno que acompañan a los resultados."""
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'implementation': platform.python_implementation(), 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpu_count': os.cpu_count(), 'numpy': numpy_version,
+            'seed': seed, 'repeat': repeat, 'chunk_size': chunk_size}
+
+
+def _print_row(row: dict):
+    label = f"{row['suite']:>8} {row['sorter']:>12} {row['distribution']:>13} {row['size']:>9}"
+    if 'skipped' in row:
+        print(f"{label}  omitido: {row['skipped']}")
+        return
+    comparisons = '-' if row['comparisons'] is None else row['comparisons']
+    temp_bytes = '-' if row['temp_bytes'] is None else row['temp_bytes']
+    print(f"{label} {row['seconds']:>10.4f} {row['peak_memory']:>12} {comparisons:>12} "
+          f"{temp_bytes:>12} {'sí' if row['ok'] else 'NO':>3}", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mide los ordenamientos internos y externos.")
+    parser.add_argument('--suite', choices=SUITES + ('all',), default='all')
+    parser.add_argument('--sorters', nargs='+', metavar='NOMBRE',
+                        help=f"Subconjunto de: {', '.join(INTERNAL_SORTERS)}, {', '.join(METHODS)}")
+    parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS,
+                        default=DISTRIBUTIONS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="Tamaños de los ordenamientos internos")
+    parser.add_argument('--external-sizes', nargs='+', type=int, default=DEFAULT_EXTERNAL_SIZES,
+                        help="Tamaños de los ordenamientos externos")
+    parser.add_argument('--repeat', type=int, default=3, help="Ejecuciones cronometradas por combinación")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Tamaño de las corridas iniciales de los externos")
+    parser.add_argument('-o', '--output', help="Archivo JSON para guardar los resultados")
+    parser.add_argument('--baseline', help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Crecimiento relativo admitido antes de marcar una regresión")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat debe ser al menos 1")
+
+    suites = SUITES if args.suite == 'all' else (args.suite,)
+    if args.sorters and set(args.sorters) - set(INTERNAL_SORTERS) - set(METHODS):
+        parser.error(f"Ordenamientos desconocidos: "
+                     f"{', '.join(sorted(set(args.sorters) - set(INTERNAL_SORTERS) - set(METHODS)))}")
+    print(f"{'suite':>8} {'sorter':>12} {'distrib.':>13} {'n':>9} {'tiempo (s)':>10} "
+          f"{'memoria':>12} {'comparac.':>12} {'bytes temp.':>12} {'ok':>3}")
+    results = run_benchmarks(suites, args.sorters, args.distributions, args.sizes,
+                             args.external_sizes, args.repeat, args.seed, args.chunk_size,
+                             report=_print_row)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(args.seed, args.repeat, args.chunk_size), 'results': results},
+                      f, indent=2)
+        print(f"Resultados guardados en '{args.output}'")
+
+    failures = [row for row in results if not row.get('ok', True)]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+    else:
+        regressions = [{**_label(row), 'metric': 'ok'} for row in failures]
+    for regression in regressions:
+        detail = ''
+        if regression['metric'] != 'ok':
+            detail = f": {regression['baseline']} -> {regression['current']}"
+            if regression['ratio'] is not None:
+                detail += f" ({regression['ratio']:.2f}x)"
+        print(f"REGRESIÓN {regression['suite']} {regression['sorter']} {regression['distribution']} "
+              f"n={regression['size']} {regression['metric']}{detail}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())